@@ -0,0 +1,44 @@
+"""Add generated full-text search vectors and GIN indexes for tickets and comments
+
+Revision ID: 20260210_ticket_fts
+Revises: 20260201_perf_idx
+Create Date: 2026-02-10
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260210_ticket_fts"
+down_revision: Union[str, Sequence[str], None] = "20260201_perf_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of models.TICKET_SEARCH_DOCUMENT / COMMENT_SEARCH_DOCUMENT
+TICKET_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(ticket_id, '') || ' ' || coalesce(inc_number, '') || ' ' "
+    "|| coalesce(so_number, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(category, '') || ' ' || coalesce(customer_name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'C')"
+)
+COMMENT_DOCUMENT = "to_tsvector('english', coalesce(comment, ''))"
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table; run off-peak on large installs
+    op.execute(
+        f"ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({TICKET_DOCUMENT}) STORED"
+    )
+    op.execute(
+        f"ALTER TABLE ticket_comments ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({COMMENT_DOCUMENT}) STORED"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING gin (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ticket_comments_search_vector ON ticket_comments USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_ticket_comments_search_vector")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_search_vector")
+    op.execute("ALTER TABLE ticket_comments DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,56 @@
+"""Add trigram-indexed search_text columns for sites, field techs and companies
+
+Revision ID: 20260212_trgm_search
+Revises: 20260210_ticket_fts
+Create Date: 2026-02-12
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260212_trgm_search"
+down_revision: Union[str, Sequence[str], None] = "20260210_ticket_fts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the models' search_text expressions
+SEARCH_TEXT = {
+    "sites": ("site_id", "location", "city", "state", "brand", "ip_address"),
+    "field_techs": ("name", "tech_number", "phone", "email", "city", "state"),
+    "field_tech_companies": ("company_name", "city", "state", "region"),
+}
+
+
+def _expression(columns) -> str:
+    return "lower(" + " || ' ' || ".join(f"coalesce({c}, '')" for c in columns) + ")"
+
+
+def upgrade() -> None:
+    # pg_trgm is a trusted extension (PostgreSQL 13+), so the database owner can create it.
+    # Without it the columns still work for LIKE filtering, just without index support.
+    op.execute(
+        "DO $$ BEGIN CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+        "EXCEPTION WHEN insufficient_privilege THEN "
+        "RAISE NOTICE 'pg_trgm not created: ask a database admin to run CREATE EXTENSION pg_trgm'; END $$"
+    )
+    for table, columns in SEARCH_TEXT.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_text text "
+            f"GENERATED ALWAYS AS ({_expression(columns)}) STORED"
+        )
+    op.execute(
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN "
+        "CREATE INDEX IF NOT EXISTS ix_sites_search_text_trgm ON sites USING gin (search_text gin_trgm_ops); "
+        "CREATE INDEX IF NOT EXISTS ix_field_techs_search_text_trgm ON field_techs USING gin (search_text gin_trgm_ops); "
+        "CREATE INDEX IF NOT EXISTS ix_field_tech_companies_search_text_trgm "
+        "ON field_tech_companies USING gin (search_text gin_trgm_ops); "
+        "END IF; END $$"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_field_tech_companies_search_text_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_field_techs_search_text_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_sites_search_text_trgm")
+    for table in SEARCH_TEXT:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_text")
@@ -0,0 +1,38 @@
+"""Add search_documents table backing global search
+
+Revision ID: 20260214_search_documents
+Revises: 20260212_trgm_search
+Create Date: 2026-02-14
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260214_search_documents"
+down_revision: Union[str, Sequence[str], None] = "20260212_trgm_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are written by the application on flush; fill existing data with rebuild_search_index.py
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS search_documents ("
+        "entity_type varchar NOT NULL, "
+        "entity_id varchar NOT NULL, "
+        "display varchar NOT NULL, "
+        "body text NOT NULL, "
+        "updated_at timestamp NOT NULL DEFAULT now(), "
+        "search_vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED, "
+        "PRIMARY KEY (entity_type, entity_id))"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_search_documents_search_vector ON search_documents USING gin (search_vector)")
+    op.execute(
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN "
+        "CREATE INDEX IF NOT EXISTS ix_search_documents_body_trgm ON search_documents USING gin (body gin_trgm_ops); "
+        "END IF; END $$"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS search_documents")
@@ -0,0 +1,23 @@
+"""Add tickets.version for optimistic concurrency on ticket transitions
+
+Revision ID: 20260216_ticket_version
+Revises: 20260214_search_documents
+Create Date: 2026-02-16
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260216_ticket_version"
+down_revision: Union[str, Sequence[str], None] = "20260214_search_documents"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog (PostgreSQL 11+), so this does not rewrite the table
+    op.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS version")
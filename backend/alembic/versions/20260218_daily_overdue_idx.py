@@ -0,0 +1,39 @@
+"""Add indexes for the daily dashboard summary (overdue bucket, per-ticket counts)
+
+Revision ID: 20260218_overdue_idx
+Revises: 20260216_ticket_version
+Create Date: 2026-02-18
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260218_overdue_idx"
+down_revision: Union[str, Sequence[str], None] = "20260216_ticket_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Overdue bucket: unfinished tickets only. The predicate must match crud.DAILY_DONE_STATUSES
+    # word for word, or the planner cannot use the index.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_overdue ON tickets (date_scheduled, date_created) "
+        "WHERE status NOT IN ('completed', 'closed', 'approved')"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tickets_date_scheduled ON tickets (date_scheduled)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tickets_date_created_unscheduled ON tickets (date_created) WHERE date_scheduled IS NULL")
+
+    # comment_count / open_task_count / total_minutes group the child tables by ticket
+    op.execute("CREATE INDEX IF NOT EXISTS ix_ticket_comments_ticket_id ON ticket_comments (ticket_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tasks_ticket_id_status ON tasks (ticket_id, status)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_time_entries_ticket_id ON time_entries (ticket_id) INCLUDE (duration_minutes)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_time_entries_ticket_id")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_ticket_id_status")
+    op.execute("DROP INDEX IF EXISTS ix_ticket_comments_ticket_id")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_date_created_unscheduled")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_date_scheduled")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_overdue")
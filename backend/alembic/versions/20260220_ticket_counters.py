@@ -0,0 +1,75 @@
+"""Add trigger-maintained ticket_counters for O(1) dashboard badge counts
+
+Revision ID: 20260220_ticket_counters
+Revises: 20260218_overdue_idx
+Create Date: 2026-02-20
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260220_ticket_counters"
+down_revision: Union[str, Sequence[str], None] = "20260218_overdue_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of models.TICKET_COUNTER_KEY / TICKET_COUNTER_COLUMNS / TICKET_COUNTER_SLOTS
+KEY = (
+    "coalesce(status::text, ''), coalesce(type::text, ''), coalesce(priority::text, ''), "
+    "coalesce(assigned_user_id, ''), coalesce(onsite_tech_id, '')"
+)
+COLUMNS = "status, type, priority, assigned_user_id, onsite_tech_id"
+SLOTS = 8
+
+
+def _upsert(deltas: str) -> str:
+    return (
+        f"INSERT INTO ticket_counters AS c ({COLUMNS}, slot, n) "
+        f"SELECT {COLUMNS}, pg_backend_pid() % {SLOTS}, sum(delta) "
+        f"FROM ({deltas}) AS d ({COLUMNS}, delta) "
+        f"GROUP BY {COLUMNS} HAVING sum(delta) <> 0 ORDER BY {COLUMNS} "
+        f"ON CONFLICT ({COLUMNS}, slot) DO UPDATE SET n = c.n + excluded.n"
+    )
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS ticket_counters ("
+        "status varchar NOT NULL, type varchar NOT NULL, priority varchar NOT NULL, "
+        "assigned_user_id varchar NOT NULL, onsite_tech_id varchar NOT NULL, slot smallint NOT NULL, "
+        "n bigint NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (status, type, priority, assigned_user_id, onsite_tech_id, slot))"
+    )
+    op.execute(f"""CREATE OR REPLACE FUNCTION ticket_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_upsert(f"SELECT {KEY}, 1 FROM new_rows")};
+    ELSIF TG_OP = 'DELETE' THEN
+        {_upsert(f"SELECT {KEY}, -1 FROM old_rows")};
+    ELSE
+        {_upsert(f"SELECT {KEY}, 1 FROM new_rows UNION ALL SELECT {KEY}, -1 FROM old_rows")};
+    END IF;
+    RETURN NULL;
+END $$""")
+    # Block ticket writes until the triggers exist and the counters are seeded
+    op.execute("LOCK TABLE tickets IN SHARE ROW EXCLUSIVE MODE")
+    for name, event, tables in (
+        ("insert", "INSERT", "NEW TABLE AS new_rows"),
+        ("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        ("delete", "DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(f"DROP TRIGGER IF EXISTS ticket_counters_{name} ON tickets")
+        op.execute(
+            f"CREATE TRIGGER ticket_counters_{name} AFTER {event} ON tickets REFERENCING {tables} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION ticket_counters_apply()"
+        )
+    op.execute("DELETE FROM ticket_counters")
+    op.execute(f"INSERT INTO ticket_counters ({COLUMNS}, slot, n) SELECT {KEY}, 0, count(*) FROM tickets GROUP BY 1, 2, 3, 4, 5")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS ticket_counters_delete ON tickets")
+    op.execute("DROP TRIGGER IF EXISTS ticket_counters_update ON tickets")
+    op.execute("DROP TRIGGER IF EXISTS ticket_counters_insert ON tickets")
+    op.execute("DROP FUNCTION IF EXISTS ticket_counters_apply()")
+    op.execute("DROP TABLE IF EXISTS ticket_counters")
@@ -0,0 +1,39 @@
+"""Add the SLA scan indexes and tickets.sla_escalate_at
+
+Revision ID: 20260222_sla_due_idx
+Revises: 20260220_ticket_counters
+Create Date: 2026-02-22
+"""
+
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "20260222_sla_due_idx"
+down_revision: Union[str, Sequence[str], None] = "20260220_ticket_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # When the SLA scan next raises a ticket's escalation_level (NULL at its rule's last level)
+    op.execute("ALTER TABLE tickets ADD COLUMN IF NOT EXISTS sla_escalate_at TIMESTAMP WITHOUT TIME ZONE")
+
+    # The expressions and predicates must match crud.get_sla_scan_rows (crud._sla_due,
+    # crud.RESOLVED_STATUSES) word for word, or the planner cannot use the indexes.
+    # Unresolved tickets not yet alerted, by due time:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_sla_due ON tickets "
+        "((created_at + sla_target_hours * interval '1 hour')) "
+        "WHERE status NOT IN ('completed', 'closed', 'approved', 'archived') AND escalation_notified IS NOT TRUE"
+    )
+    # Alerted tickets with a level still to come, by when it comes:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tickets_sla_escalate_at ON tickets (sla_escalate_at) "
+        "WHERE status NOT IN ('completed', 'closed', 'approved', 'archived') AND escalation_notified IS TRUE"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tickets_sla_escalate_at")
+    op.execute("DROP INDEX IF EXISTS ix_tickets_sla_due")
+    op.execute("ALTER TABLE tickets DROP COLUMN IF EXISTS sla_escalate_at")
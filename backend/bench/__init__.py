@@ -0,0 +1,9 @@
+"""
+Load-test harness for hot API paths.
+
+Run against a locally started app + Postgres, e.g.:
+
+    python -m bench --base-url http://localhost:8000 --users 20 --duration 60
+
+See bench/__main__.py for options and bench/baseline.json for the committed baseline.
+"""
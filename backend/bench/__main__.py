@@ -0,0 +1,125 @@
+"""
+Command line entry point: python -m bench [options]
+
+Exits with status 1 when any step regresses beyond the configured thresholds
+compared to the baseline file (see bench/stats.py:compare_to_baseline), and with
+status 2 when the baseline is missing or covers none of the steps of a journey that
+ran, since nothing was checked.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from bench.journeys import JOURNEYS
+from bench.loadgen import run_load
+from bench.stats import compare_to_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(prog="python -m bench", description="Load-test the ticketing API hot paths.")
+    p.add_argument("--base-url", default=os.getenv("BENCH_BASE_URL", "http://localhost:8000"))
+    p.add_argument("--email", default=os.getenv("BENCH_EMAIL"))
+    p.add_argument("--password", default=os.getenv("BENCH_PASSWORD"))
+    p.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    p.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    p.add_argument("--think-time", type=float, default=0.0, help="Max random pause between journeys (s)")
+    p.add_argument("--journeys", default=",".join(JOURNEYS),
+                   help=f"Comma-separated subset of: {', '.join(JOURNEYS)}")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--baseline", default=DEFAULT_BASELINE)
+    p.add_argument("--latency-threshold", type=float, default=0.20,
+                   help="Allowed fractional p95/p99 growth per step")
+    p.add_argument("--throughput-threshold", type=float, default=0.20,
+                   help="Allowed fractional throughput drop per step")
+    p.add_argument("--error-rate-threshold", type=float, default=0.01,
+                   help="Allowed absolute error-rate increase per step")
+    p.add_argument("--output", help="Write full results JSON to this path")
+    p.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with this run")
+    args = p.parse_args(argv)
+    if not args.email or not args.password:
+        p.error("--email/--password (or BENCH_EMAIL/BENCH_PASSWORD) are required")
+    return args
+
+
+def _print_table(steps):
+    header = f"{'step':<34}{'reqs':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, s in sorted(steps.items()):
+        print(f"{name:<34}{s['requests']:>7}{s['errors']:>6}{s['throughput_rps']:>9.2f}"
+              f"{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}{s['p99_ms']:>9.2f}")
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    journeys = [j.strip() for j in args.journeys.split(",") if j.strip()]
+    stats, wall = asyncio.run(run_load(
+        args.base_url, args.email, args.password,
+        users=args.users, duration=args.duration, journeys=journeys,
+        seed=args.seed, think_time=args.think_time,
+    ))
+
+    steps = {name: s.summary(wall) for name, s in stats.items()}
+    result = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {"users": args.users, "duration": args.duration, "journeys": journeys,
+                   "think_time": args.think_time, "seed": args.seed},
+        "wall_seconds": round(wall, 2),
+        "steps": steps,
+    }
+    _print_table(steps)
+    for name, s in sorted(stats.items()):
+        for sample in s.error_samples:
+            print(f"  {name} error: {sample}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+            fh.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNO BASELINE at {args.baseline}: nothing was checked. "
+              f"Record one on the reference machine with --update-baseline.")
+        return 2
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("config", {}).get("users") not in (None, args.users):
+        print(f"Warning: baseline was recorded with {baseline['config']['users']} users, this run used {args.users}.")
+
+    # Only compare journeys that ran in this invocation
+    base_steps = {k: v for k, v in baseline.get("steps", {}).items() if k.split(".")[0] in journeys}
+    uncovered = sorted({name.split(".")[0] for name in steps} - {name.split(".")[0] for name in base_steps})
+    if uncovered:
+        print(f"\nNO BASELINE for journeys {', '.join(uncovered)} in {args.baseline}: they were not checked. "
+              f"Record one on the reference machine with --update-baseline.")
+    regressions = compare_to_baseline(
+        steps, base_steps,
+        latency_threshold=args.latency_threshold,
+        throughput_threshold=args.throughput_threshold,
+        error_rate_threshold=args.error_rate_threshold,
+    )
+    if regressions:
+        print("\nREGRESSIONS:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    if uncovered:
+        return 2
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
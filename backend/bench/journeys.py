@@ -0,0 +1,147 @@
+"""
+Scripted user journeys for the load generator.
+
+Each journey is an async function taking a BenchSession and issuing the same requests
+the frontend does for that screen or action. Every request is recorded under a
+"<journey>.<step>" name so results can be compared step by step.
+"""
+
+import random
+import time
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from bench.stats import StepStats
+
+
+def _now_ms() -> float:
+    return time.perf_counter() * 1000.0
+
+
+class BenchContext:
+    """Shared state discovered once at startup (token, sample IDs)."""
+
+    def __init__(self, token: str, site_ids: List[str], ticket_ids: List[str], search_terms: List[str]):
+        self.token = token
+        self.site_ids = site_ids
+        self.ticket_ids = ticket_ids
+        self.search_terms = search_terms
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class BenchSession:
+    """One virtual user: an httpx client plus the shared per-step statistics."""
+
+    def __init__(self, client: httpx.AsyncClient, ctx: BenchContext, stats: Dict[str, StepStats],
+                 rng: random.Random):
+        self.client = client
+        self.ctx = ctx
+        self.stats = stats
+        self.rng = rng
+
+    async def request(self, step: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Issue a request and record its latency under `step`. Returns None on transport errors.
+
+        Only 2xx counts as success: redirects are not followed, so a 3xx (e.g. a missing trailing
+        slash) would otherwise time a redirect instead of the endpoint."""
+        headers = {**self.ctx.headers, **kwargs.pop("headers", {})}
+        start = _now_ms()
+        try:
+            resp = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self._stats(step).record(_now_ms() - start, False, f"{type(e).__name__}: {e}")
+            return None
+        ok = resp.is_success
+        self._stats(step).record(_now_ms() - start, ok, None if ok else f"{resp.status_code} {url}")
+        return resp
+
+    def _stats(self, step: str) -> StepStats:
+        if step not in self.stats:
+            self.stats[step] = StepStats(step)
+        return self.stats[step]
+
+
+async def dashboard_refresh(s: BenchSession):
+    """Dispatcher daily dashboard: daily board plus active ticket/shipment lists and counts."""
+    today = date.today().isoformat()
+    await s.request("dashboard_refresh.daily", "GET", f"/tickets/daily/{today}")
+    await s.request("dashboard_refresh.tickets", "GET", "/tickets/", params={"status": "active", "limit": 50})
+    await s.request("dashboard_refresh.tickets_count", "GET", "/tickets/count", params={"status": "active"})
+    await s.request("dashboard_refresh.shipments", "GET", "/shipments/", params={"limit": 50})
+    await s.request("dashboard_refresh.shipments_count", "GET", "/shipments/count")
+
+
+async def ticket_detail(s: BenchSession):
+    """Open a ticket: detail, comments, time entries and linked shipments."""
+    if not s.ctx.ticket_ids:
+        return
+    ticket_id = s.rng.choice(s.ctx.ticket_ids)
+    await s.request("ticket_detail.get", "GET", f"/tickets/{ticket_id}")
+    await s.request("ticket_detail.comments", "GET", f"/tickets/{ticket_id}/comments")
+    await s.request("ticket_detail.time_entries", "GET", f"/tickets/{ticket_id}/time-entries/")
+    await s.request("ticket_detail.shipments", "GET", "/shipments/",
+                    params={"ticket_id": ticket_id, "limit": 200, "skip": 0})
+
+
+async def claim_complete(s: BenchSession):
+    """Create a ticket, claim it and complete it."""
+    if not s.ctx.site_ids:
+        return
+    resp = await s.request("claim_complete.create", "POST", "/tickets/", json={
+        "site_id": s.rng.choice(s.ctx.site_ids),
+        "type": "inhouse",
+        "status": "open",
+        "notes": "bench: claim/complete journey",
+    })
+    if resp is None or not resp.is_success:
+        return
+    ticket_id = resp.json()["ticket_id"]
+    await s.request("claim_complete.claim", "PUT", f"/tickets/{ticket_id}/claim", json={})
+    await s.request("claim_complete.complete", "PUT", f"/tickets/{ticket_id}/complete", json={})
+
+
+async def shipment_create(s: BenchSession):
+    """Create a shipment against an existing ticket and site."""
+    if not s.ctx.site_ids:
+        return
+    payload = {
+        "site_id": s.rng.choice(s.ctx.site_ids),
+        "what_is_being_shipped": "bench: replacement parts",
+        "items": [],
+    }
+    if s.ctx.ticket_ids:
+        payload["ticket_id"] = s.rng.choice(s.ctx.ticket_ids)
+    await s.request("shipment_create.create", "POST", "/shipments/", json=payload)
+
+
+async def map_load(s: BenchSession):
+    """Field tech map: companies with techs and ZIP coordinates."""
+    await s.request("map_load.companies", "GET", "/fieldtech-companies/",
+                    params={"for_map": "true", "include_techs": "true", "limit": 500})
+
+
+async def global_search(s: BenchSession):
+    """Type a term one keystroke at a time into global search and the site autocomplete."""
+    term = s.rng.choice(s.ctx.search_terms) if s.ctx.search_terms else "a"
+    for i in range(1, min(len(term), 4) + 1):
+        prefix = term[:i]
+        await s.request("global_search.search", "GET", "/search", params={"q": prefix})
+        await s.request("global_search.site_lookup", "GET", "/sites/lookup", params={"prefix": prefix, "limit": 20})
+
+
+Journey = Callable[[BenchSession], Awaitable[None]]
+
+# Relative weights roughly follow dispatcher traffic: dashboards and detail views dominate.
+JOURNEYS: Dict[str, tuple] = {
+    "dashboard_refresh": (dashboard_refresh, 30),
+    "ticket_detail": (ticket_detail, 25),
+    "claim_complete": (claim_complete, 10),
+    "shipment_create": (shipment_create, 5),
+    "map_load": (map_load, 10),
+    "global_search": (global_search, 20),
+}
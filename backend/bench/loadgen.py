@@ -0,0 +1,66 @@
+"""
+Asyncio load generator: N virtual users loop over weighted journeys for a fixed duration.
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench.journeys import JOURNEYS, BenchContext, BenchSession
+from bench.stats import StepStats
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    """Log in once and share the token; /login is rate limited per IP."""
+    resp = await client.post("/login", data={"username": email, "password": password})
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def discover(client: httpx.AsyncClient, token: str, sample_size: int = 50) -> BenchContext:
+    """Pick existing site and ticket IDs to drive read journeys."""
+    headers = {"Authorization": f"Bearer {token}"}
+    sites = (await client.get("/sites/", params={"limit": sample_size}, headers=headers)).json()
+    tickets = (await client.get("/tickets/", params={"limit": sample_size}, headers=headers)).json()
+    site_ids = [s["site_id"] for s in sites] if isinstance(sites, list) else []
+    ticket_ids = [t["ticket_id"] for t in tickets] if isinstance(tickets, list) else []
+    terms = sorted({sid[:4] for sid in site_ids if sid}) or ["a"]
+    return BenchContext(token, site_ids, ticket_ids, terms)
+
+
+async def _virtual_user(client: httpx.AsyncClient, ctx: BenchContext, stats: Dict[str, StepStats],
+                        journeys: List[str], deadline: float, seed: int, think_time: float):
+    rng = random.Random(seed)
+    session = BenchSession(client, ctx, stats, rng)
+    funcs = [JOURNEYS[name][0] for name in journeys]
+    weights = [JOURNEYS[name][1] for name in journeys]
+    while time.monotonic() < deadline:
+        await rng.choices(funcs, weights=weights)[0](session)
+        if think_time > 0:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+
+async def run_load(base_url: str, email: str, password: str, users: int = 10, duration: float = 30.0,
+                   journeys: Optional[List[str]] = None, seed: int = 1, think_time: float = 0.0,
+                   timeout: float = 30.0):
+    """Run the load test. Returns (per-step StepStats, wall-clock seconds)."""
+    journeys = journeys or list(JOURNEYS)
+    unknown = [name for name in journeys if name not in JOURNEYS]
+    if unknown:
+        raise ValueError(f"Unknown journeys: {', '.join(unknown)}")
+
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        token = await login(client, email, password)
+        ctx = await discover(client, token)
+        stats: Dict[str, StepStats] = {}
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _virtual_user(client, ctx, stats, journeys, deadline, seed + i, think_time)
+            for i in range(users)
+        ))
+        return stats, time.monotonic() - started
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark helpers: timed repetitions with warm-up, summary statistics and a
+JSON history so a change to a query or schema can be compared to earlier runs.
+
+Used by tests/test_benchmarks.py (opt-in with RUN_BENCHMARKS=1).
+"""
+
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from bench.stats import percentile
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "micro_history.json")
+# Entries kept per benchmark in the history file
+HISTORY_LIMIT = 50
+
+
+def measure(func: Callable[[], Any], warmup: int = 3, repeat: int = 20,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Run func `warmup` times untimed, then `repeat` timed runs. setup() runs before each call, untimed."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "p95_ms": round(percentile(samples, 0.95), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+class BenchmarkHistory:
+    """Per-benchmark list of past results stored in one JSON file."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY):
+        self.path = path
+        self.data: Dict[str, List[Dict[str, Any]]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                self.data = json.load(fh)
+
+    def baseline_median(self, name: str, window: int = 5) -> Optional[float]:
+        """Median of the medians of the last `window` recorded runs."""
+        entries = self.data.get(name, [])[-window:]
+        if not entries:
+            return None
+        return statistics.median(e["median_ms"] for e in entries)
+
+    def record(self, name: str, stats: Dict[str, float], threshold: float = 0.25,
+               label: Optional[str] = None) -> Optional[str]:
+        """Append a result; returns a regression message if the median grew beyond threshold."""
+        base = self.baseline_median(name)
+        regression = None
+        if base and stats["median_ms"] > base * (1 + threshold):
+            regression = (f"{name}: median {stats['median_ms']:.3f} ms > recent baseline "
+                          f"{base:.3f} ms (+{threshold:.0%})")
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "label": label,
+            "regression": regression is not None,
+            **stats,
+        }
+        self.data.setdefault(name, []).append(entry)
+        self.data[name] = self.data[name][-HISTORY_LIMIT:]
+        return regression
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(self.data, fh, indent=2, sort_keys=True)
+            fh.write("\n")
@@ -0,0 +1,84 @@
+"""
+Latency statistics and baseline comparison for load-test results.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..1) of unsorted values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered)) - 1))
+    return ordered[idx]
+
+
+@dataclass
+class StepStats:
+    """Latencies and error count for one named journey step."""
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    error_samples: List[str] = field(default_factory=list)
+
+    def record(self, elapsed_ms: float, ok: bool, detail: Optional[str] = None):
+        self.latencies_ms.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+            if detail and len(self.error_samples) < 5:
+                self.error_samples.append(detail)
+
+    def summary(self, wall_seconds: float) -> Dict[str, float]:
+        count = len(self.latencies_ms)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            "p50_ms": round(percentile(self.latencies_ms, 0.50), 2),
+            "p95_ms": round(percentile(self.latencies_ms, 0.95), 2),
+            "p99_ms": round(percentile(self.latencies_ms, 0.99), 2),
+            "max_ms": round(max(self.latencies_ms), 2) if count else 0.0,
+        }
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    latency_threshold: float = 0.20,
+    throughput_threshold: float = 0.20,
+    error_rate_threshold: float = 0.01,
+) -> List[str]:
+    """Return human-readable regressions of results against baseline step summaries.
+
+    A step regresses when its p95 or p99 grows by more than latency_threshold (fraction),
+    its throughput drops by more than throughput_threshold, or its error rate rises by
+    more than error_rate_threshold (absolute). Steps missing from the baseline are ignored.
+    """
+    regressions = []
+    for step, base in sorted(baseline.items()):
+        current = results.get(step)
+        if current is None:
+            regressions.append(f"{step}: missing from results")
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            base_val = base.get(metric) or 0.0
+            cur_val = current.get(metric) or 0.0
+            if base_val > 0 and cur_val > base_val * (1 + latency_threshold):
+                regressions.append(
+                    f"{step}: {metric} {cur_val:.2f} > baseline {base_val:.2f} (+{latency_threshold:.0%})"
+                )
+        base_rps = base.get("throughput_rps") or 0.0
+        cur_rps = current.get("throughput_rps") or 0.0
+        if base_rps > 0 and cur_rps < base_rps * (1 - throughput_threshold):
+            regressions.append(
+                f"{step}: throughput {cur_rps:.2f} rps < baseline {base_rps:.2f} (-{throughput_threshold:.0%})"
+            )
+        base_err = base.get("error_rate") or 0.0
+        cur_err = current.get("error_rate") or 0.0
+        if cur_err > base_err + error_rate_threshold:
+            regressions.append(f"{step}: error rate {cur_err:.2%} > baseline {base_err:.2%}")
+    return regressions
@@ -1,9 +1,17 @@
-from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import and_, or_, desc, asc, case, update, func
+from sqlalchemy.orm import Session, joinedload, selectinload, aliased
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, String, and_, tuple_, any_, column, literal_column, values as sa_values, or_, desc, asc, case, cast, update, insert, func, select, text, literal, union, union_all, inspect as sa_inspect
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects.postgresql import ARRAY
 import models, schemas
+from settings import settings
+from utils.count_cache import count_cache
+from utils import search_index
+from utils.audit_writer import audit_writer
 import uuid
 from datetime import date, datetime, timezone
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 
 # =============================================================================
 # OPTIMIZED CRUD OPERATIONS WITH PROPER EAGER LOADING
@@ -171,47 +179,70 @@ def get_site(db: Session, site_id: str):
         selectinload(models.Site.site_equipment)
     ).filter(models.Site.site_id == site_id).first()
 
-def get_sites(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, search: Optional[str] = None):
-    """Get sites with pagination, optional region and search filtering"""
-    query = db.query(models.Site)
+# Substring search on sites, field techs and companies matches each table's generated,
+# lowercased search_text column (trigram GIN indexed when pg_trgm is installed).
+_trgm_available: Optional[bool] = None
+
+def _has_trgm(db: Session) -> bool:
+    """Whether the pg_trgm extension is installed (checked once per process)."""
+    global _trgm_available
+    if _trgm_available is None:
+        found = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+        _trgm_available = found is not None
+    return _trgm_available
+
+def _like_escape(search: str) -> str:
+    """Lowercased search term with LIKE wildcards escaped (use escape="/")."""
+    return search.strip().lower().replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+def _search_match(column, search: str):
+    """Case-insensitive substring match of search against a search_text column."""
+    return column.like(f"%{_like_escape(search)}%", escape="/")
+
+def _search_rank(db: Session, column, search: str):
+    """Relevance of a search_text match (higher first): trigram word similarity, else match position."""
+    term = search.strip().lower()
+    if _has_trgm(db):
+        return func.word_similarity(term, column)
+    # Earlier match ranks higher; rows matched through a related table rank last
+    return -func.coalesce(func.nullif(func.strpos(column, term), 0), 1_000_000)
+
+def _site_filters(region: Optional[str] = None, search: Optional[str] = None) -> list:
+    """WHERE clauses shared by the site list and count queries"""
+    clauses = []
     if region:
-        query = query.filter(models.Site.region == region)
+        clauses.append(models.Site.region == region)
     if search:
-        like = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Site.site_id.ilike(like),
-                models.Site.location.ilike(like),
-                models.Site.city.ilike(like),
-                models.Site.state.ilike(like),
-                models.Site.brand.ilike(like),
-                models.Site.ip_address.ilike(like),
-            )
-        )
-        # Prioritize prefix matches on site_id for better Autocomplete behavior
+        # site_id, location, city, state, brand, ip_address
+        clauses.append(_search_match(models.Site.search_text, search))
+    return clauses
+
+def _site_order(db: Session, search: Optional[str] = None) -> list:
+    if search:
+        # Prioritize prefix matches on site_id for better Autocomplete behavior, then similarity
         prefix = f"{search}%"
         order_first = case((models.Site.site_id.ilike(prefix), 0), else_=1)
-        return query.order_by(order_first.asc(), models.Site.site_id.asc()).offset(skip).limit(limit).all()
-    return query.order_by(models.Site.site_id.asc()).offset(skip).limit(limit).all()
+        return [order_first.asc(), desc(_search_rank(db, models.Site.search_text, search)), models.Site.site_id.asc()]
+    return [models.Site.site_id.asc()]
+
+def get_sites(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, search: Optional[str] = None):
+    """Get sites with pagination, optional region and search filtering"""
+    query = db.query(models.Site).filter(*_site_filters(region, search))
+    return query.order_by(*_site_order(db, search)).offset(skip).limit(limit).all()
+
+def get_sites_rows(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None,
+                   search: Optional[str] = None) -> List[dict]:
+    """Core-row equivalent of get_sites"""
+    stmt = _row_select(models.Site, []).where(*_site_filters(region, search))
+    stmt = stmt.order_by(*_site_order(db, search)).offset(skip).limit(limit)
+    return _nest_rows(db.execute(stmt), [])
 
 def count_sites(db: Session, region: Optional[str] = None, search: Optional[str] = None) -> int:
     """Count sites with optional filters"""
-    query = db.query(models.Site)
-    if region:
-        query = query.filter(models.Site.region == region)
-    if search:
-        like = f"%{search}%"
-        query = query.filter(
-            or_(
-                models.Site.site_id.ilike(like),
-                models.Site.location.ilike(like),
-                models.Site.city.ilike(like),
-                models.Site.state.ilike(like),
-                models.Site.brand.ilike(like),
-                models.Site.ip_address.ilike(like),
-            )
-        )
-    return query.count()
+    return count_cache.get_or_compute(
+        "sites", {"region": region, "search": search},
+        lambda: db.query(models.Site).filter(*_site_filters(region, search)).count(),
+    )
 
 def update_site(db: Session, site_id: str, site: schemas.SiteCreate):
     """Update site with optimized query"""
@@ -251,6 +282,7 @@ def delete_site(db: Session, site_id: str):
             db.query(models.InventoryTransaction).filter(models.InventoryTransaction.shipment_item_id.in_(shipment_item_ids)).delete(synchronize_session=False)
         db.query(models.ShipmentItem).filter(models.ShipmentItem.shipment_id.in_(shipment_ids)).delete(synchronize_session=False)
         db.query(models.Shipment).filter(models.Shipment.shipment_id.in_(shipment_ids)).delete(synchronize_session=False)
+        search_index.remove(db, "shipment", shipment_ids)
     # 3) Delete tickets and their children
     ticket_ids = [t.ticket_id for t in db.query(models.Ticket).filter(models.Ticket.site_id == site_id).all()]
     for tid in ticket_ids:
@@ -266,33 +298,21 @@ def delete_site(db: Session, site_id: str):
 # ID GENERATION FUNCTIONS
 # =============================================================================
 
+def next_ticket_id_expr(year: Optional[int] = None):
+    """SQL expression for the next YYYY-NNNNNN ticket id, so an INSERT can compute it server-side."""
+    year_prefix = f"{year or datetime.now(timezone.utc).year}-"
+    T = models.Ticket
+    last = select(func.max(T.ticket_id)).where(
+        T.ticket_id.like(f"{year_prefix}%"),
+        T.ticket_id.op("~")(r"^\d{4}-\d+$"),
+    ).scalar_subquery()
+    # Format: YYYY-NNNNNN (6 digits, can handle up to 999,999 tickets per year)
+    number = func.coalesce(cast(func.substr(last, len(year_prefix) + 1), Integer), 0) + 1
+    return func.concat(year_prefix, func.lpad(cast(number, String), 6, "0"))
+
 def generate_ticket_id(db: Session) -> str:
     """Generate a sequential ticket ID in format: YYYY-NNNNNN"""
-    from datetime import datetime, timezone
-    
-    current_year = datetime.now(timezone.utc).year
-    year_prefix = str(current_year)
-    
-    # Get the highest ticket number for this year
-    latest_ticket = db.query(models.Ticket).filter(
-        models.Ticket.ticket_id.like(f"{year_prefix}-%")
-    ).order_by(models.Ticket.ticket_id.desc()).first()
-    
-    if latest_ticket:
-        # Extract the number part and increment
-        try:
-            last_number = int(latest_ticket.ticket_id.split('-')[1])
-            new_number = last_number + 1
-        except (ValueError, IndexError):
-            new_number = 1
-    else:
-        # First ticket of the year
-        new_number = 1
-    
-    # Format: YYYY-NNNNNN (6 digits, can handle up to 999,999 tickets per year)
-    ticket_id = f"{year_prefix}-{new_number:06d}"
-    
-    return ticket_id
+    return db.execute(select(next_ticket_id_expr())).scalar_one()
 
 def generate_sequential_id(db: Session, model, id_field: str, prefix: str, digits: int = 6) -> str:
     """
@@ -330,12 +350,16 @@ def generate_sequential_id(db: Session, model, id_field: str, prefix: str, digit
     
     return new_id
 
-def create_ticket(db: Session, ticket: schemas.TicketCreate):
-    """Create ticket with optimized query"""
+def create_ticket(db: Session, ticket: schemas.TicketCreate, user_id: Optional[str] = None) -> dict:
+    """Create a ticket and its ticket_create audit row; returns the ticket shaped like TicketOut.
+
+    One statement: INSERT ... RETURNING * as a CTE (ticket_id and defaults computed in
+    the database), the audit row inserted from that CTE, and a SELECT joining the site,
+    users and tech. The search document goes in the same transaction; one commit.
+    """
     from timezone_utils import get_eastern_today
     
-    db_ticket = models.Ticket(
-        ticket_id=generate_ticket_id(db),
+    values = dict(
         site_id=ticket.site_id,
         inc_number=ticket.inc_number,
         so_number=ticket.so_number,
@@ -402,10 +426,27 @@ def create_ticket(db: Session, ticket: schemas.TicketCreate):
         follow_up_date=ticket.follow_up_date,
         follow_up_notes=ticket.follow_up_notes
     )
-    db.add(db_ticket)
-    db.commit()
-    db.refresh(db_ticket)
-    return db_ticket
+    table = models.Ticket.__table__
+    inserted = (
+        insert(table)
+        .values(ticket_id=next_ticket_id_expr(), **values)
+        .returning(*(c for c in table.columns if c.computed is None))
+        .cte("inserted")
+    )
+    audit = dict(
+        audit_id=str(uuid.uuid4()), ticket_id=None, user_id=user_id or ticket.last_updated_by,
+        change_time=datetime.now(timezone.utc), field_changed="ticket_create", old_value=None,
+        new_value=lambda source: func.concat("Ticket ", source.c.ticket_id, " created"),
+    )
+    try:
+        rows = _ticket_write_rows(db, inserted, {models.TicketAudit: [audit]})
+        search_index.refresh_rows(db, "ticket", rows)
+        _attach_company_techs(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows[0]
 
 def get_ticket(db: Session, ticket_id: str):
     """Get ticket with all related data eager loaded"""
@@ -431,29 +472,81 @@ def get_ticket_for_response(db: Session, ticket_id: str):
         joinedload(models.Ticket.claimed_user),
     ).filter(models.Ticket.ticket_id == ticket_id).first()
 
-def get_tickets(db: Session, skip: int = 0, limit: int = 100, 
-                status: Optional[str] = None, 
-                priority: Optional[str] = None,
-                assigned_user_id: Optional[str] = None,
-                site_id: Optional[str] = None,
-                ticket_type: Optional[str] = None,
-                search: Optional[str] = None,
-                include_related: bool = True):
-    """Get tickets with comprehensive filtering and eager loading"""
-    query = db.query(models.Ticket)
-    if include_related:
-        query = query.options(
-            joinedload(models.Ticket.site),
-            joinedload(models.Ticket.assigned_user),
-            joinedload(models.Ticket.claimed_user),
-            joinedload(models.Ticket.onsite_tech)
-        )
-    
-    # Apply filters
+# =============================================================================
+# CORE ROW READ PATH
+# Read-only list endpoints can skip the ORM (identity map, instrumentation,
+# from_attributes validation): select() all columns of an entity plus
+# "relation__column" labelled columns of outer-joined relations, then nest the
+# flat RowMapping into the same dict shape the ORM objects serialize to.
+# =============================================================================
+
+def _entity_columns(entity, prefix: Optional[str] = None) -> list:
+    """Mapped columns of a model or aliased model, optionally labelled "prefix__column".
+
+    Generated columns (search vectors) are not part of any API shape and are skipped.
+    """
+    table_columns = [c for c in sa_inspect(entity).mapper.local_table.columns if c.computed is None]
+    columns = [getattr(entity, c.key) for c in table_columns]
+    if prefix:
+        columns = [col.label(f"{prefix}__{c.key}") for col, c in zip(columns, table_columns)]
+    return columns
+
+def _row_select(base, relations) -> Select:
+    """select() of base columns plus each (name, entity, onclause) relation, outer joined."""
+    columns = _entity_columns(base)
+    for name, entity, _ in relations:
+        columns += _entity_columns(entity, name)
+    stmt = select(*columns).select_from(base)
+    for _, entity, onclause in relations:
+        stmt = stmt.outerjoin(entity, onclause)
+    return stmt
+
+def _nest_rows(result, relations) -> List[dict]:
+    """Turn "a__b__col" labels into nested dicts; relations whose key column is NULL become None.
+
+    relations is a list of (path, key_column) with parents before children, e.g.
+    [("onsite_tech", "field_tech_id"), ("onsite_tech__company", "company_id")].
+    """
+    rows = []
+    for mapping in result.mappings():
+        row = {}
+        for key, value in mapping.items():
+            parts = key.split("__")
+            target = row
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        for path, key_column in reversed(relations):
+            parts = path.split("__")
+            parent = row
+            for part in parts[:-1]:
+                parent = parent.get(part) if parent else None
+            if parent and parent.get(parts[-1]) is not None and parent[parts[-1]].get(key_column) is None:
+                parent[parts[-1]] = None
+        rows.append(row)
+    return rows
+
+# Full-text search: text search configuration for parsing queries and building headlines
+SEARCH_CONFIG = "english"
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=8, MaxFragments=2"
+
+def _text_query(term: str):
+    """websearch_to_tsquery() for user input: supports "phrases", OR and -exclusions, never raises."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, term)
+
+def _ticket_filters(status: Optional[str] = None,
+                    priority: Optional[str] = None,
+                    assigned_user_id: Optional[str] = None,
+                    site_id: Optional[str] = None,
+                    ticket_type: Optional[str] = None,
+                    search: Optional[str] = None,
+                    onsite_tech_id: Optional[str] = None) -> list:
+    """WHERE clauses shared by the ticket list, count and projection queries"""
+    clauses = []
     if status:
         # Support logical "active" status by excluding terminal states
         if status == 'active':
-            query = query.filter(~models.Ticket.status.in_([
+            clauses.append(~models.Ticket.status.in_([
                 models.TicketStatus.completed,
                 models.TicketStatus.closed,
                 models.TicketStatus.approved,
@@ -463,75 +556,319 @@ def get_tickets(db: Session, skip: int = 0, limit: int = 100,
             # Compare against enum when possible; fall back to string
             try:
                 enum_status = models.TicketStatus(status)
-                query = query.filter(models.Ticket.status == enum_status)
+                clauses.append(models.Ticket.status == enum_status)
             except Exception:
-                query = query.filter(models.Ticket.status == status)
+                clauses.append(models.Ticket.status == status)
     if priority:
-        query = query.filter(models.Ticket.priority == priority)
+        clauses.append(models.Ticket.priority == priority)
     if assigned_user_id:
-        query = query.filter(models.Ticket.assigned_user_id == assigned_user_id)
+        clauses.append(models.Ticket.assigned_user_id == assigned_user_id)
     if site_id:
-        query = query.filter(models.Ticket.site_id == site_id)
+        clauses.append(models.Ticket.site_id == site_id)
     if ticket_type:
-        query = query.filter(models.Ticket.type == ticket_type)
+        clauses.append(models.Ticket.type == ticket_type)
+    if onsite_tech_id:
+        clauses.append(models.Ticket.onsite_tech_id == onsite_tech_id)
     if search:
         clean = search.strip()
-        like_any = f"%{clean}%"
         like_prefix = f"{clean}%"
-        query = query.filter(or_(
+        clauses.append(or_(
             # Prefix search is index-friendly for identifiers
             models.Ticket.ticket_id.ilike(like_prefix),
             models.Ticket.site_id.ilike(like_prefix),
             models.Ticket.inc_number.ilike(like_prefix),
             models.Ticket.so_number.ilike(like_prefix),
-            # Keep contains search for notes
-            models.Ticket.notes.ilike(like_any)
+            # Words in notes, category and customer name via the GIN-indexed search vector
+            models.Ticket.search_vector.bool_op("@@")(_text_query(clean)),
         ))
-    
+    return clauses
+
+def get_tickets(db: Session, skip: int = 0, limit: int = 100, 
+                status: Optional[str] = None, 
+                priority: Optional[str] = None,
+                assigned_user_id: Optional[str] = None,
+                site_id: Optional[str] = None,
+                ticket_type: Optional[str] = None,
+                search: Optional[str] = None,
+                include_related: bool = True):
+    """Get tickets with comprehensive filtering and eager loading"""
+    query = db.query(models.Ticket)
+    if include_related:
+        query = query.options(
+            joinedload(models.Ticket.site),
+            joinedload(models.Ticket.assigned_user),
+            joinedload(models.Ticket.claimed_user),
+            joinedload(models.Ticket.onsite_tech)
+        )
+    query = query.filter(*_ticket_filters(status, priority, assigned_user_id, site_id, ticket_type, search))
     return query.order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit).all()
 
+# Columns returned by GET /tickets/?view=list (what the ticket list screens render)
+TICKET_LIST_FIELDS = (
+    "ticket_id", "site_id", "inc_number", "so_number", "type", "status", "priority",
+    "assigned_user_id", "onsite_tech_id", "claimed_by", "date_created", "created_at",
+    "date_scheduled", "date_closed", "claimed_at", "check_in_time", "check_out_time",
+    "end_time", "approved_at", "notes_excerpt", "site", "assigned_user", "claimed_user", "onsite_tech",
+)
+# Related objects a projection can ask for (and their key column); only display columns are joined
+TICKET_PROJECTION_RELATIONS = {
+    "site": "site_id", "assigned_user": "user_id", "claimed_user": "user_id", "onsite_tech": "field_tech_id",
+}
+NOTES_EXCERPT_CHARS = 160
+
+def ticket_projection_fields() -> set:
+    """Field names accepted by get_ticket_rows(fields=...)"""
+    columns = {c.key for c in models.Ticket.__table__.columns if c.computed is None}
+    return columns | set(TICKET_PROJECTION_RELATIONS) | {"notes_excerpt"}
+
+def _ticket_projection(fields):
+    """(columns, outer joins, nesting relations) for a get_ticket_rows-style projection."""
+    ticket = models.Ticket.__table__
+    wanted = [f for f in fields if f in ticket.c and f != "ticket_id"]
+    columns = [ticket.c.ticket_id] + [ticket.c[f] for f in wanted]
+    if "notes_excerpt" in fields:
+        columns.append(func.substr(ticket.c.notes, 1, NOTES_EXCERPT_CHARS).label("notes_excerpt"))
+
+    joins = []
+    if "site" in fields:
+        columns += [models.Site.site_id.label("site__site_id"), models.Site.location.label("site__location"),
+                    models.Site.brand.label("site__brand"), models.Site.city.label("site__city"),
+                    models.Site.state.label("site__state")]
+        joins.append((models.Site, models.Site.site_id == models.Ticket.site_id))
+    for rel, fk in (("assigned_user", models.Ticket.assigned_user_id), ("claimed_user", models.Ticket.claimed_by)):
+        if rel in fields:
+            user = aliased(models.User, name=rel)
+            columns += [user.user_id.label(f"{rel}__user_id"), user.name.label(f"{rel}__name")]
+            joins.append((user, user.user_id == fk))
+    if "onsite_tech" in fields:
+        columns += [models.FieldTech.field_tech_id.label("onsite_tech__field_tech_id"),
+                    models.FieldTech.name.label("onsite_tech__name"),
+                    models.FieldTech.phone.label("onsite_tech__phone")]
+        joins.append((models.FieldTech, models.FieldTech.field_tech_id == models.Ticket.onsite_tech_id))
+
+    relations = [(rel, key) for rel, key in TICKET_PROJECTION_RELATIONS.items() if rel in fields]
+    return columns, joins, relations
+
+def _projection_select(columns, joins) -> Select:
+    stmt = select(*columns).select_from(models.Ticket)
+    for target, onclause in joins:
+        stmt = stmt.outerjoin(target, onclause)
+    return stmt
+
+def get_ticket_rows(db: Session, fields, skip: int = 0, limit: int = 100,
+                    status: Optional[str] = None,
+                    priority: Optional[str] = None,
+                    assigned_user_id: Optional[str] = None,
+                    site_id: Optional[str] = None,
+                    ticket_type: Optional[str] = None,
+                    search: Optional[str] = None) -> List[dict]:
+    """Get a column projection of tickets as plain dicts (Core select, no ORM objects).
+
+    Relations in `fields` join only their display columns and come back as small nested
+    dicts; notes_excerpt is the first NOTES_EXCERPT_CHARS characters of notes.
+    """
+    columns, joins, relations = _ticket_projection(fields)
+    stmt = _projection_select(columns, joins)
+    stmt = stmt.where(*_ticket_filters(status, priority, assigned_user_id, site_id, ticket_type, search))
+    stmt = stmt.order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit)
+    return _nest_rows(db.execute(stmt), relations)
+
+def get_tickets_rows(db: Session, skip: int = 0, limit: int = 100,
+                     status: Optional[str] = None,
+                     priority: Optional[str] = None,
+                     assigned_user_id: Optional[str] = None,
+                     site_id: Optional[str] = None,
+                     ticket_type: Optional[str] = None,
+                     search: Optional[str] = None) -> List[dict]:
+    """Core-row equivalent of get_tickets: dicts shaped like schemas.TicketOut input.
+
+    Site, users, onsite tech and the tech's company come from one outer-joined select;
+    the company tech lists (FieldTechCompanyOut.techs) from one extra IN query.
+    """
+    stmt = _row_select(models.Ticket, _ticket_row_relations(models.Ticket))
+    stmt = stmt.where(*_ticket_filters(status, priority, assigned_user_id, site_id, ticket_type, search))
+    stmt = stmt.order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit)
+    rows = _nest_rows(db.execute(stmt), TICKET_ROW_NESTING)
+    _attach_company_techs(db, rows)
+    return rows
+
+def _ticket_row_relations(ticket) -> list:
+    """(name, entity, onclause) joins that give a ticket row the TicketOut shape."""
+    assigned = aliased(models.User, name="assigned_user")
+    claimed = aliased(models.User, name="claimed_user")
+    return [
+        ("site", models.Site, models.Site.site_id == ticket.site_id),
+        ("assigned_user", assigned, assigned.user_id == ticket.assigned_user_id),
+        ("claimed_user", claimed, claimed.user_id == ticket.claimed_by),
+        ("onsite_tech", models.FieldTech, models.FieldTech.field_tech_id == ticket.onsite_tech_id),
+        ("onsite_tech__company", models.FieldTechCompany,
+         models.FieldTechCompany.company_id == models.FieldTech.company_id),
+    ]
+
+TICKET_ROW_NESTING = [
+    ("site", "site_id"), ("assigned_user", "user_id"), ("claimed_user", "user_id"),
+    ("onsite_tech", "field_tech_id"), ("onsite_tech__company", "company_id"),
+]
+
+def _attach_company_techs(db: Session, rows: List[dict]):
+    """Fill onsite_tech.company.techs (FieldTechCompanyOut.techs) with one IN query."""
+    companies = {}
+    for row in rows:
+        company = row["onsite_tech"] and row["onsite_tech"]["company"]
+        if company:
+            company["techs"] = []
+            companies.setdefault(company["company_id"], []).append(company)
+    if companies:
+        techs = select(*_entity_columns(models.FieldTech)).where(models.FieldTech.company_id.in_(list(companies)))
+        for tech in db.execute(techs).mappings():
+            for company in companies[tech["company_id"]]:
+                company["techs"].append(dict(tech))
+
 def count_tickets(db: Session,
                   status: Optional[str] = None,
                   priority: Optional[str] = None,
                   assigned_user_id: Optional[str] = None,
                   site_id: Optional[str] = None,
                   ticket_type: Optional[str] = None,
-                  search: Optional[str] = None) -> int:
-    query = db.query(models.Ticket)
-    if status:
-        if status == 'active':
-            query = query.filter(~models.Ticket.status.in_([
-                models.TicketStatus.completed,
-                models.TicketStatus.closed,
-                models.TicketStatus.approved,
-                models.TicketStatus.archived,
-            ]))
-        else:
-            try:
-                enum_status = models.TicketStatus(status)
-                query = query.filter(models.Ticket.status == enum_status)
-            except Exception:
-                query = query.filter(models.Ticket.status == status)
+                  search: Optional[str] = None,
+                  onsite_tech_id: Optional[str] = None) -> int:
+    """Count tickets matching the list filters.
+
+    Filters on counter dimensions only (status including "active", priority, type, assignee,
+    onsite tech) are answered from ticket_counters; site_id or search fall back to count(*).
+    """
+    if settings.TICKET_COUNTERS_ENABLED and not site_id and not (search and search.strip()):
+        return _count_from_counters(db, status, priority, assigned_user_id, ticket_type, onsite_tech_id)
+    count, _ = ticket_list_watermark(db, status, priority, assigned_user_id, site_id, ticket_type, search,
+                                     onsite_tech_id)
+    return count
+
+def _count_from_counters(db: Session, status=None, priority=None, assigned_user_id=None,
+                         ticket_type=None, onsite_tech_id=None) -> int:
+    C = models.TicketCounter
+    clauses = []
+    if status == 'active':
+        clauses.append(C.status.notin_(RESOLVED_STATUSES))
+    elif status:
+        clauses.append(C.status == status)
     if priority:
-        query = query.filter(models.Ticket.priority == priority)
-    if assigned_user_id:
-        query = query.filter(models.Ticket.assigned_user_id == assigned_user_id)
-    if site_id:
-        query = query.filter(models.Ticket.site_id == site_id)
+        clauses.append(C.priority == priority)
     if ticket_type:
-        query = query.filter(models.Ticket.type == ticket_type)
-    if search:
-        clean = search.strip()
-        like_any = f"%{clean}%"
-        like_prefix = f"{clean}%"
-        query = query.filter(or_(
-            models.Ticket.ticket_id.ilike(like_prefix),
-            models.Ticket.site_id.ilike(like_prefix),
-            models.Ticket.inc_number.ilike(like_prefix),
-            models.Ticket.so_number.ilike(like_prefix),
-            models.Ticket.notes.ilike(like_any)
-        ))
-    return query.count()
+        clauses.append(C.type == ticket_type)
+    if assigned_user_id:
+        clauses.append(C.assigned_user_id == assigned_user_id)
+    if onsite_tech_id:
+        clauses.append(C.onsite_tech_id == onsite_tech_id)
+    return int(db.execute(select(func.coalesce(func.sum(C.n), 0)).where(*clauses)).scalar_one())
+
+def estimate_count_tickets(db: Session, **filters) -> Tuple[int, bool]:
+    """(count, exact) for count_tickets' filters; see _estimated_count.
+
+    Counter-covered filters are already cheap and exact, so they skip the estimate.
+    """
+    if settings.TICKET_COUNTERS_ENABLED and not filters.get("site_id") and not (filters.get("search") or "").strip():
+        return count_tickets(db, **filters), True
+    clauses = _ticket_filters(**filters)
+    return _estimated_count(db, models.Ticket, clauses, lambda: count_tickets(db, **filters))
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement; executes to the plan as parsed JSON."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def _estimated_count(db: Session, model, clauses: list, exact: Callable[[], int]) -> Tuple[int, bool]:
+    """(count, exact) from planner statistics instead of a scan.
+
+    Unfiltered counts read pg_class.reltuples (as of the last ANALYZE/VACUUM); filtered counts
+    take the row estimate of the plan for the filtered rows. Estimates below
+    COUNT_ESTIMATE_EXACT_BELOW, or for tables never analyzed, are replaced by exact().
+    """
+    if clauses:
+        plan = db.execute(Explain(select(literal(1)).select_from(model).where(*clauses))).scalar_one()
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+    else:
+        estimate = db.execute(
+            select(cast(column("reltuples"), BigInteger)).select_from(text("pg_class"))
+            .where(column("oid") == func.to_regclass(model.__tablename__))
+        ).scalar()
+    if estimate is None or estimate < max(settings.COUNT_ESTIMATE_EXACT_BELOW, 0):
+        return exact(), True
+    return estimate, False
+
+def reconcile_ticket_counters(db: Session) -> Optional[int]:
+    """Check ticket_counters against tickets and rebuild it if they differ; returns how many keys
+    had drifted (0 leaves the table alone), or None if another worker is already reconciling.
+
+    The check is one GROUP BY over tickets without the counters lock (triggers update both tables
+    in the same transaction, so one statement sees them agree). Only on drift does it take the
+    lock, which ticket writes wait on, and check again before rebuilding.
+    """
+    if not db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('ticket_counters'))")).scalar():
+        db.rollback()
+        return None
+    key, cols = models.TICKET_COUNTER_KEY, models.TICKET_COUNTER_COLUMNS
+    drift_query = text(
+        f"SELECT count(*) FROM (SELECT {key}, count(*) FROM tickets GROUP BY 1, 2, 3, 4, 5) AS a ({cols}, n) "
+        f"FULL JOIN (SELECT {cols}, sum(n) AS n FROM ticket_counters GROUP BY {cols}) AS c USING ({cols}) "
+        f"WHERE coalesce(a.n, 0) <> coalesce(c.n, 0)"
+    )
+    drift = db.execute(drift_query).scalar_one()
+    if drift:
+        db.execute(text("LOCK TABLE ticket_counters IN EXCLUSIVE MODE"))
+        drift = db.execute(drift_query).scalar_one()
+    if drift:
+        for statement in models.TICKET_COUNTER_SEED:
+            db.execute(text(statement))
+    db.commit()
+    return drift
+
+def ticket_list_watermark(db: Session,
+                          status: Optional[str] = None,
+                          priority: Optional[str] = None,
+                          assigned_user_id: Optional[str] = None,
+                          site_id: Optional[str] = None,
+                          ticket_type: Optional[str] = None,
+                          search: Optional[str] = None,
+                          onsite_tech_id: Optional[str] = None):
+    """(row count, latest change as ISO string) for the filtered ticket set; feeds counts and ETags."""
+    def compute():
+        changed = func.coalesce(models.Ticket.last_updated_at, models.Ticket.created_at)
+        stmt = select(func.count(), func.max(changed)).select_from(models.Ticket).where(
+            *_ticket_filters(status, priority, assigned_user_id, site_id, ticket_type, search, onsite_tech_id)
+        )
+        count, latest = db.execute(stmt).one()
+        return [count, latest.isoformat() if latest is not None else None]
+
+    filters = dict(status=status, priority=priority, assigned_user_id=assigned_user_id,
+                   site_id=site_id, ticket_type=ticket_type, search=search, onsite_tech_id=onsite_tech_id)
+    count, latest = count_cache.get_or_compute("tickets", filters, compute)
+    return count, latest
+
+def ticket_detail_watermark(db: Session, ticket_id: str):
+    """Ticket change time plus comment/time entry/attachment/audit watermarks, or None if missing."""
+    tid = models.Ticket.ticket_id
+
+    def child(model, *cols):
+        return [
+            select(agg).where(model.ticket_id == tid).correlate(models.Ticket).scalar_subquery()
+            for agg in (func.count(), *(func.max(c) for c in cols))
+        ]
+
+    stmt = select(
+        func.coalesce(models.Ticket.last_updated_at, models.Ticket.created_at),
+        *child(models.TicketComment, models.TicketComment.updated_at),
+        *child(models.TimeEntry, models.TimeEntry.created_at),
+        *child(models.TicketAttachment, models.TicketAttachment.uploaded_at),
+        *child(models.TicketAudit, models.TicketAudit.change_time),
+    ).where(tid == ticket_id)
+    row = db.execute(stmt).first()
+    return tuple(row) if row is not None else None
 
 def update_ticket(db: Session, ticket_id: str, ticket: schemas.TicketUpdate):
     """Update ticket with optimized query"""
@@ -539,8 +876,8 @@ def update_ticket(db: Session, ticket_id: str, ticket: schemas.TicketUpdate):
     if not db_ticket:
         return None
     
-    # Update fields dynamically
-    for field, value in ticket.model_dump(exclude_unset=True).items():
+    # Update fields dynamically (version is bumped by the UPDATE itself, never copied from input)
+    for field, value in ticket.model_dump(exclude_unset=True, exclude={"version"}).items():
         if hasattr(db_ticket, field) and value is not None:
             setattr(db_ticket, field, value)
     
@@ -548,6 +885,163 @@ def update_ticket(db: Session, ticket_id: str, ticket: schemas.TicketUpdate):
     db.refresh(db_ticket)
     return db_ticket
 
+# Ticket state transitions: read only the columns RBAC and derived values need, then apply the
+# change, its audit rows and any child rows in one conditional UPDATE ... RETURNING statement.
+class StaleTicketError(Exception):
+    """The ticket was changed or deleted after its guard row was read."""
+
+TICKET_GUARD_COLUMNS = ("ticket_id", "status", "assigned_user_id", "claimed_by", "version",
+                        "start_time", "claimed_at", "check_in_time", "created_at",
+                        "priority", "onsite_tech_id", "date_scheduled")
+
+def get_ticket_guard(db: Session, ticket_id: str):
+    """Columns ticket transitions check (RBAC, current status, timer start), or None if missing"""
+    T = models.Ticket
+    stmt = select(*(getattr(T, c) for c in TICKET_GUARD_COLUMNS)).where(T.ticket_id == ticket_id)
+    return db.execute(stmt).mappings().first()
+
+def get_ticket_guards(db: Session, ticket_ids: List[str]) -> dict:
+    """Guard columns for many tickets in one query, keyed by ticket_id (missing ids are absent)"""
+    T = models.Ticket
+    stmt = select(*(getattr(T, c) for c in TICKET_GUARD_COLUMNS)).where(
+        T.ticket_id == any_(literal(list(ticket_ids), ARRAY(String)))
+    )
+    return {row["ticket_id"]: row for row in db.execute(stmt).mappings()}
+
+def _audit_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+def _insert_from(written, model, rows: List[dict]):
+    """INSERT ... SELECT of literal rows, one per row of the written CTE (so none if it matched nothing).
+
+    ticket_id comes from the CTE; a callable value is given the CTE and returns an expression.
+    """
+    table = model.__table__
+    names = list(rows[0])
+    selects = []
+    for row in rows:
+        values = [
+            written.c.ticket_id if name == "ticket_id" else
+            row[name](written) if callable(row[name]) else
+            cast(literal(None), table.c[name].type) if row[name] is None else
+            literal(row[name], table.c[name].type)
+            for name in names
+        ]
+        selects.append(select(*values).select_from(written))
+    source = selects[0] if len(selects) == 1 else union_all(*selects)
+    return insert(table).from_select(names, source)
+
+def _ticket_write_rows(db: Session, written, inserts: dict, ctes=()) -> List[dict]:
+    """Execute a ticket write CTE (INSERT/UPDATE ... RETURNING) with its child inserts; TicketOut-shaped rows."""
+    ticket = aliased(models.Ticket, written, name="ticket")
+    stmt = _row_select(ticket, _ticket_row_relations(ticket))
+    for i, (model, rows) in enumerate(inserts.items()):
+        stmt = stmt.add_cte(_insert_from(written, model, rows).cte(f"insert_{i}"))
+    if ctes:
+        stmt = stmt.add_cte(*ctes)
+    return _nest_rows(db.execute(stmt), TICKET_ROW_NESTING)
+
+def mutate_ticket(db: Session, guard, values: dict, user_id: str, audits=(), child_rows=()) -> dict:
+    """Apply values to the ticket read as guard; returns the updated ticket shaped like TicketOut.
+
+    One statement: UPDATE tickets ... WHERE ticket_id = :id AND version = :guard_version
+    RETURNING * as a CTE, audit rows (field, old, new) and child_rows ((model, row) with
+    ticket_id filled in) inserted from that CTE, and a SELECT joining the site, users and
+    tech. Commits on success. Raises StaleTicketError if the version moved since the guard
+    read, in which case nothing was written.
+    """
+    table = models.Ticket.__table__
+    now = datetime.now(timezone.utc)
+    changes = {k: v for k, v in values.items() if k in table.c}
+    changes.update(version=table.c.version + 1, last_updated_by=user_id, last_updated_at=now)
+    updated = (
+        update(table)
+        .where(table.c.ticket_id == guard["ticket_id"], table.c.version == guard["version"])
+        .values(changes)
+        .returning(*(c for c in table.columns if c.computed is None))
+        .cte("updated")
+    )
+
+    inserts = {}
+    for field, old, new in audits:
+        inserts.setdefault(models.TicketAudit, []).append(dict(
+            audit_id=str(uuid.uuid4()), ticket_id=None, user_id=user_id, change_time=now,
+            field_changed=field, old_value=_audit_value(old), new_value=_audit_value(new),
+        ))
+    for model, row in child_rows:
+        inserts.setdefault(model, []).append({**row, "ticket_id": None})
+
+    try:
+        rows = _ticket_write_rows(db, updated, inserts)
+        if not rows:
+            raise StaleTicketError(guard["ticket_id"])
+        if search_index.touches("ticket", changes):
+            search_index.refresh_rows(db, "ticket", rows)
+        _attach_company_techs(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows[0]
+
+def bulk_mutate_tickets(db: Session, guards: List, values: dict, user_id: str, audits=()) -> List[dict]:
+    """Apply the same values to every ticket read as guards; returns the updated tickets shaped like TicketOut.
+
+    One statement, like mutate_ticket: UPDATE tickets ... FROM unnest(:ids, :versions)
+    matching each ticket at its guard version, RETURNING * as a CTE. Audit rows
+    (ticket_id, field, old, new) come from a VALUES list joined to that CTE. Tickets
+    that changed since the guard read are neither updated nor audited, and are missing
+    from the result. Commits on success.
+    """
+    if not guards:
+        return []
+    table = models.Ticket.__table__
+    now = datetime.now(timezone.utc)
+    changes = {k: v for k, v in values.items() if k in table.c}
+    changes.update(version=table.c.version + 1, last_updated_by=user_id, last_updated_at=now)
+    guard = func.unnest(
+        literal([g["ticket_id"] for g in guards], ARRAY(String)),
+        literal([g["version"] for g in guards], ARRAY(Integer)),
+    ).table_valued(column("ticket_id", String), column("version", Integer)).render_derived(name="guard")
+    updated = (
+        update(table)
+        .where(table.c.ticket_id == guard.c.ticket_id, table.c.version == guard.c.version)
+        .values(changes)
+        .returning(*(c for c in table.columns if c.computed is None))
+        .cte("updated")
+    )
+
+    ctes = []
+    if audits:
+        audit_table = models.TicketAudit.__table__
+        audit_rows = sa_values(
+            column("audit_id", String), column("ticket_id", String), column("field_changed", String),
+            column("old_value", String), column("new_value", String), name="audit_rows",
+        ).data([
+            (str(uuid.uuid4()), ticket_id, field, _audit_value(old), _audit_value(new))
+            for ticket_id, field, old, new in audits
+        ])
+        source = select(
+            audit_rows.c.audit_id, audit_rows.c.ticket_id,
+            literal(user_id, audit_table.c.user_id.type), literal(now, audit_table.c.change_time.type),
+            audit_rows.c.field_changed, audit_rows.c.old_value, audit_rows.c.new_value,
+        ).select_from(audit_rows.join(updated, updated.c.ticket_id == audit_rows.c.ticket_id))
+        names = ["audit_id", "ticket_id", "user_id", "change_time", "field_changed", "old_value", "new_value"]
+        ctes.append(insert(audit_table).from_select(names, source).cte("audit_insert"))
+
+    try:
+        rows = _ticket_write_rows(db, updated, {}, ctes)
+        if rows and search_index.touches("ticket", changes):
+            search_index.refresh_rows(db, "ticket", rows)
+        _attach_company_techs(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
+
 def delete_ticket(db: Session, ticket_id: str):
     """Delete ticket with optimized cascade deletion"""
     db_ticket = db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).first()
@@ -571,6 +1065,7 @@ def delete_ticket(db: Session, ticket_id: str):
     # Finally delete the ticket using a bulk delete to avoid ORM relationship updates
     try:
         db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).delete(synchronize_session=False)
+        search_index.remove(db, "ticket", [ticket_id])
         db.commit()
     except Exception:
         db.rollback()
@@ -618,54 +1113,76 @@ def get_shipment(db: Session, shipment_id: str):
         selectinload(models.Shipment.shipment_items).joinedload(models.ShipmentItem.item)
     ).filter(models.Shipment.shipment_id == shipment_id).first()
 
-def get_shipments(db: Session, skip: int = 0, limit: int = 100, 
-                  site_id: Optional[str] = None,
-                  ticket_id: Optional[str] = None,
-                  search: Optional[str] = None):
-    """Get shipments with filtering and eager loading"""
-    query = db.query(models.Shipment).options(
-        joinedload(models.Shipment.site),
-        joinedload(models.Shipment.ticket)
-    )
-    
+def _shipment_filters(site_id: Optional[str] = None,
+                      ticket_id: Optional[str] = None,
+                      search: Optional[str] = None) -> list:
+    """WHERE clauses shared by the shipment list and count queries"""
+    clauses = []
     if site_id:
-        query = query.filter(models.Shipment.site_id == site_id)
+        clauses.append(models.Shipment.site_id == site_id)
     if ticket_id:
-        query = query.filter(models.Shipment.ticket_id == ticket_id)
+        clauses.append(models.Shipment.ticket_id == ticket_id)
     if search:
         like = f"%{search}%"
-        query = query.filter(or_(
+        clauses.append(or_(
             models.Shipment.shipment_id.ilike(like),
             models.Shipment.tracking_number.ilike(like),
             models.Shipment.return_tracking.ilike(like),
             models.Shipment.what_is_being_shipped.ilike(like),
             models.Shipment.site_id.ilike(like)
         ))
-    
+    return clauses
+
+def get_shipments(db: Session, skip: int = 0, limit: int = 100, 
+                  site_id: Optional[str] = None,
+                  ticket_id: Optional[str] = None,
+                  search: Optional[str] = None):
+    """Get shipments with filtering and eager loading"""
+    query = db.query(models.Shipment).options(
+        joinedload(models.Shipment.site),
+        joinedload(models.Shipment.ticket)
+    )
+    query = query.filter(*_shipment_filters(site_id, ticket_id, search))
     return query.order_by(desc(models.Shipment.date_created)).offset(skip).limit(limit).all()
 
+def get_shipments_rows(db: Session, skip: int = 0, limit: int = 100,
+                       site_id: Optional[str] = None,
+                       ticket_id: Optional[str] = None,
+                       search: Optional[str] = None) -> List[dict]:
+    """Core-row equivalent of get_shipments (shipment columns plus nested site and ticket columns)"""
+    stmt = _row_select(models.Shipment, [
+        ("site", models.Site, models.Site.site_id == models.Shipment.site_id),
+        ("ticket", models.Ticket, models.Ticket.ticket_id == models.Shipment.ticket_id),
+    ])
+    stmt = stmt.where(*_shipment_filters(site_id, ticket_id, search))
+    stmt = stmt.order_by(desc(models.Shipment.date_created)).offset(skip).limit(limit)
+    return _nest_rows(db.execute(stmt), [("site", "site_id"), ("ticket", "ticket_id")])
+
 def count_shipments(db: Session,
                     site_id: Optional[str] = None,
                     ticket_id: Optional[str] = None,
                     search: Optional[str] = None,
                     include_archived: bool = True) -> int:
-    query = db.query(models.Shipment)
-    if site_id:
-        query = query.filter(models.Shipment.site_id == site_id)
-    if ticket_id:
-        query = query.filter(models.Shipment.ticket_id == ticket_id)
-    if search:
-        like = f"%{search}%"
-        query = query.filter(or_(
-            models.Shipment.shipment_id.ilike(like),
-            models.Shipment.tracking_number.ilike(like),
-            models.Shipment.return_tracking.ilike(like),
-            models.Shipment.what_is_being_shipped.ilike(like),
-            models.Shipment.site_id.ilike(like)
-        ))
+    def compute():
+        query = db.query(models.Shipment).filter(*_shipment_filters(site_id, ticket_id, search))
+        if not include_archived:
+            query = query.filter(models.Shipment.archived.is_(False))
+        return query.count()
+
+    filters = dict(site_id=site_id, ticket_id=ticket_id, search=search, include_archived=include_archived)
+    return count_cache.get_or_compute("shipments", filters, compute)
+
+def estimate_count_shipments(db: Session,
+                             site_id: Optional[str] = None,
+                             ticket_id: Optional[str] = None,
+                             search: Optional[str] = None,
+                             include_archived: bool = True) -> Tuple[int, bool]:
+    """(count, exact) for count_shipments' filters; see _estimated_count."""
+    clauses = _shipment_filters(site_id, ticket_id, search)
     if not include_archived:
-        query = query.filter(models.Shipment.archived.is_(False))
-    return query.count()
+        clauses.append(models.Shipment.archived.is_(False))
+    return _estimated_count(db, models.Shipment, clauses, lambda: count_shipments(
+        db, site_id=site_id, ticket_id=ticket_id, search=search, include_archived=include_archived))
 
 def get_shipments_by_site(db: Session, site_id: str):
     """Get all shipments for a specific site with eager loading"""
@@ -817,20 +1334,16 @@ def get_field_tech_companies(
         query = query.filter(models.FieldTechCompany.state == state)
     if city:
         query = query.filter(func.lower(models.FieldTechCompany.city) == city.lower())
+    order = [models.FieldTechCompany.company_name]
     if search:
-        like = f"%{search.strip()}%"
-        # Search by company fields and associated tech fields
-        query = query.outerjoin(models.FieldTechCompany.techs).filter(or_(
-            models.FieldTechCompany.company_name.ilike(like),
-            models.FieldTechCompany.city.ilike(like),
-            models.FieldTechCompany.state.ilike(like),
-            models.FieldTechCompany.region.ilike(like),
-            models.FieldTech.name.ilike(like),
-            models.FieldTech.phone.ilike(like),
-            models.FieldTech.tech_number.ilike(like),
-            models.FieldTech.email.ilike(like),
-        )).distinct()
-    return query.order_by(models.FieldTechCompany.company_name).offset(skip).limit(limit).all()
+        # Company fields, or any of its techs' fields (EXISTS instead of join + DISTINCT)
+        tech_match = select(models.FieldTech.field_tech_id).where(
+            models.FieldTech.company_id == models.FieldTechCompany.company_id,
+            _search_match(models.FieldTech.search_text, search),
+        ).correlate(models.FieldTechCompany).exists()
+        query = query.filter(or_(_search_match(models.FieldTechCompany.search_text, search), tech_match))
+        order.insert(0, desc(_search_rank(db, models.FieldTechCompany.search_text, search)))
+    return query.order_by(*order).offset(skip).limit(limit).all()
 
 def update_field_tech_company(db: Session, company_id: str, company: schemas.FieldTechCompanyCreate):
     """Update company; region derived from state."""
@@ -900,23 +1413,42 @@ def get_field_tech(db: Session, field_tech_id: str):
         selectinload(models.FieldTech.onsite_tickets)
     ).filter(models.FieldTech.field_tech_id == field_tech_id).first()
 
-def get_field_techs(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, company_id: Optional[str] = None, search: Optional[str] = None):
-    """Get field techs with optional region, company, and search (tech name, company name, city, state, phone)."""
-    query = db.query(models.FieldTech).options(joinedload(models.FieldTech.company))
+def _field_tech_filters(region: Optional[str] = None, company_id: Optional[str] = None,
+                        search: Optional[str] = None) -> list:
+    """WHERE clauses for field tech lists; search matches the tech or its company"""
+    clauses = []
     if region:
-        query = query.filter(models.FieldTech.region == region)
+        clauses.append(models.FieldTech.region == region)
     if company_id:
-        query = query.filter(models.FieldTech.company_id == company_id)
+        clauses.append(models.FieldTech.company_id == company_id)
     if search:
-        like = f"%{search}%"
-        query = query.outerjoin(models.FieldTech.company).filter(or_(
-            models.FieldTech.name.ilike(like),
-            models.FieldTech.phone.ilike(like),
-            models.FieldTech.city.ilike(like),
-            models.FieldTech.state.ilike(like),
-            models.FieldTechCompany.company_name.ilike(like),
-        ))
-    return query.order_by(models.FieldTech.name).offset(skip).limit(limit).all()
+        company_match = select(models.FieldTechCompany.company_id).where(
+            models.FieldTechCompany.company_id == models.FieldTech.company_id,
+            _search_match(models.FieldTechCompany.search_text, search),
+        ).correlate(models.FieldTech).exists()
+        clauses.append(or_(_search_match(models.FieldTech.search_text, search), company_match))
+    return clauses
+
+def _field_tech_order(db: Session, search: Optional[str] = None) -> list:
+    if search:
+        return [desc(_search_rank(db, models.FieldTech.search_text, search)), models.FieldTech.name]
+    return [models.FieldTech.name]
+
+def get_field_techs(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None, company_id: Optional[str] = None, search: Optional[str] = None):
+    """Get field techs with optional region, company, and search (tech name, number, phone, email, city, state, or company)."""
+    query = db.query(models.FieldTech).options(joinedload(models.FieldTech.company))
+    query = query.filter(*_field_tech_filters(region, company_id, search))
+    return query.order_by(*_field_tech_order(db, search)).offset(skip).limit(limit).all()
+
+def get_field_techs_rows(db: Session, skip: int = 0, limit: int = 100, region: Optional[str] = None,
+                         company_id: Optional[str] = None, search: Optional[str] = None) -> List[dict]:
+    """Core-row equivalent of get_field_techs (tech columns plus nested company columns)"""
+    stmt = _row_select(models.FieldTech, [
+        ("company", models.FieldTechCompany, models.FieldTechCompany.company_id == models.FieldTech.company_id),
+    ])
+    stmt = stmt.where(*_field_tech_filters(region, company_id, search))
+    stmt = stmt.order_by(*_field_tech_order(db, search)).offset(skip).limit(limit)
+    return _nest_rows(db.execute(stmt), [("company", "company_id")])
 
 def update_field_tech(db: Session, field_tech_id: str, tech: schemas.FieldTechCreate):
     """Update field tech with optimized query."""
@@ -1169,22 +1701,6 @@ def get_inventory_item_by_barcode(db: Session, barcode: str):
     return db.query(models.InventoryItem).filter(models.InventoryItem.barcode == barcode).first()
 
 # Audit CRUD - Optimized
-def create_ticket_audit(db: Session, audit: schemas.TicketAuditCreate):
-    """Create audit log entry with optimized query"""
-    db_audit = models.TicketAudit(
-        audit_id=str(uuid.uuid4()),
-        ticket_id=audit.ticket_id,
-        user_id=audit.user_id,
-        change_time=audit.change_time,
-        field_changed=audit.field_changed,
-        old_value=audit.old_value,
-        new_value=audit.new_value
-    )
-    db.add(db_audit)
-    db.commit()
-    db.refresh(db_audit)
-    return db_audit
-
 def get_ticket_audit(db: Session, audit_id: str):
     """Get audit log entry with related data eager loaded"""
     return db.query(models.TicketAudit).options(
@@ -1269,32 +1785,122 @@ def delete_sla_rule(db: Session, rule_id: str):
     db.commit()
     return db_rule
 
-def get_matching_sla_rule(db: Session, ticket_type, customer_impact, business_priority):
-    """Get the most specific SLA rule that matches the ticket criteria - Optimized"""
-    # Use a single query with proper ordering
-    return db.query(models.SLARule).filter(
-        models.SLARule.is_active == True,
-        or_(
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact == customer_impact,
-                models.SLARule.business_priority == business_priority
-            ),
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact == customer_impact,
-                models.SLARule.business_priority.is_(None)
-            ),
-            and_(
-                models.SLARule.ticket_type == ticket_type,
-                models.SLARule.customer_impact.is_(None),
-                models.SLARule.business_priority.is_(None)
-            )
+def get_active_sla_rules(db: Session) -> List[dict]:
+    """Active SLA rules as plain rows, for utils.sla_engine's in-memory matcher."""
+    R = models.SLARule
+    stmt = select(
+        R.rule_id, R.name, R.ticket_type, R.customer_impact, R.business_priority,
+        R.sla_target_hours, R.sla_breach_hours, R.escalation_levels,
+    ).where(R.is_active.is_(True)).order_by(R.created_at)
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def _missing_sla_hours(ticket_ids: Optional[List[str]]) -> list:
+    T = models.Ticket
+    clauses = [or_(T.sla_target_hours.is_(None), T.sla_breach_hours.is_(None))]
+    if ticket_ids is not None:
+        clauses.append(T.ticket_id == any_(literal(list(ticket_ids), ARRAY(String))))
+    return clauses
+
+def get_missing_sla_hour_keys(db: Session, ticket_ids: Optional[List[str]] = None) -> List[tuple]:
+    """Distinct (type, customer_impact, business_priority) of tickets lacking SLA hours
+    (of ticket_ids, or of all tickets)."""
+    T = models.Ticket
+    stmt = select(T.type, T.customer_impact, T.business_priority).where(*_missing_sla_hours(ticket_ids)).distinct()
+    return [tuple(row) for row in db.execute(stmt)]
+
+def fill_sla_hours(db: Session, key: tuple, target_hours: Optional[int], breach_hours: Optional[int],
+                   ticket_ids: Optional[List[str]] = None) -> int:
+    """Set the missing SLA hours of the tickets with this (type, impact, priority) key; None
+    takes the column default, as an ORM insert would. Leaves version alone; does not commit."""
+    T = models.Ticket
+    ticket_type, impact, priority = key
+    values = {"version": T.version, "last_updated_at": T.last_updated_at}  # not an edit: skip the onupdate bumps
+    for column, hours in (("sla_target_hours", target_hours), ("sla_breach_hours", breach_hours)):
+        default = T.__table__.c[column].default.arg
+        values[column] = func.coalesce(getattr(T, column), hours if hours is not None else default)
+    stmt = update(T).where(
+        *_missing_sla_hours(ticket_ids),
+        T.type.is_not_distinct_from(ticket_type),
+        T.customer_impact.is_not_distinct_from(impact),
+        T.business_priority.is_not_distinct_from(priority),
+    ).values(values).execution_options(synchronize_session=False)
+    return db.execute(stmt).rowcount
+
+def _sla_due():
+    """Ticket SLA due time. Written exactly like the ix_tickets_sla_due expression so the planner uses it."""
+    return models.Ticket.created_at + models.Ticket.sla_target_hours * literal_column("interval '1 hour'")
+
+def try_sla_scan_lock(db: Session) -> bool:
+    """Take the transaction-scoped advisory lock that lets one worker at a time run the SLA scan."""
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('sla_scan'))")).scalar())
+
+def get_sla_scan_rows(db: Session, horizon: datetime, now: datetime) -> List[dict]:
+    """Unresolved tickets the SLA scan has to look at: not yet alerted and due before horizon
+    (ix_tickets_sla_due), or alerted and past their sla_escalate_at (ix_tickets_sla_escalate_at).
+
+    Both branches repeat their index's expression and predicate word for word so the
+    planner can use it. Tickets at their last level have no sla_escalate_at and are not read.
+    """
+    T = models.Ticket
+    due = _sla_due()
+    columns = (
+        T.ticket_id, T.site_id, T.assigned_user_id, T.type, T.customer_impact, T.business_priority,
+        T.created_at, T.sla_target_hours, T.sla_breach_hours, T.escalation_level, T.escalation_notified,
+        due.label("due_at"),
+    )
+    unresolved = T.status.notin_(RESOLVED_STATUSES)
+    stmt = union_all(
+        select(*columns).where(unresolved, T.escalation_notified.isnot(True), due <= horizon),
+        select(*columns).where(unresolved, T.escalation_notified.is_(True), T.sla_escalate_at <= now),
+    )
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def escalate_sla_tickets(db: Session, changes: List[tuple]) -> List[dict]:
+    """Apply (ticket_id, level, escalate_at, alert) from the SLA scan and mark the tickets notified; commits.
+
+    One statement: UPDATE tickets ... FROM unnest(:ids, :levels, :escalate_at, :alerts),
+    skipping tickets resolved meanwhile and never lowering a level. Returns the updated
+    tickets' ticket_id, escalation_level, site_id, assigned_user_id, due_at and alert.
+    """
+    table = models.Ticket.__table__
+    if not changes:
+        db.commit()
+        return []
+    ids, levels, escalate_at, alerts = (list(c) for c in zip(*changes))
+    esc = func.unnest(
+        literal(ids, ARRAY(String)),
+        literal(levels, ARRAY(Integer)),
+        literal(escalate_at, ARRAY(DateTime)),
+        literal(alerts, ARRAY(Boolean)),
+    ).table_valued(
+        column("ticket_id", String), column("level", Integer), column("escalate_at", DateTime),
+        column("alert", Boolean),
+    ).render_derived(name="esc")
+    current = func.coalesce(table.c.escalation_level, 0)
+    stmt = (
+        update(table)
+        .where(
+            table.c.ticket_id == esc.c.ticket_id,
+            table.c.status.notin_(RESOLVED_STATUSES),
+            current <= esc.c.level,
+        )
+        .values(
+            escalation_level=esc.c.level,
+            escalation_notified=True,
+            sla_escalate_at=esc.c.escalate_at,
+            version=table.c.version + 1,
+            last_updated_at=datetime.now(timezone.utc),
         )
-    ).order_by(
-        desc(models.SLARule.business_priority.isnot(None)),
-        desc(models.SLARule.customer_impact.isnot(None))
-    ).first()
+        .returning(table.c.ticket_id, table.c.escalation_level, table.c.site_id, table.c.assigned_user_id,
+                   _sla_due().label("due_at"), esc.c.alert)
+    )
+    try:
+        rows = [dict(row) for row in db.execute(stmt).mappings()]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return rows
 
 # Time Entry CRUD - Optimized
 def create_time_entry(db: Session, time_entry_data: dict):
@@ -1540,44 +2146,112 @@ def get_daily_tickets(db: Session, date: date = None, ticket_type: str = None,
     
     # Filter by date: Show tickets scheduled for this date OR overdue from past
     if date:
-        query = query.filter(
-            or_(
-                # Tickets scheduled for this date
-                models.Ticket.date_scheduled == date,
-                # Unscheduled tickets created today
-                and_(
-                    models.Ticket.date_created == date,
-                    models.Ticket.date_scheduled.is_(None)
-                ),
-                # Overdue tickets from previous days (not completed/approved)
-                and_(
-                    or_(
-                        models.Ticket.date_scheduled < date,
-                        and_(
-                            models.Ticket.date_created < date,
-                            models.Ticket.date_scheduled.is_(None)
-                        )
-                    ),
-                    models.Ticket.status.notin_(['completed', 'closed', 'approved'])
-                )
-            )
-        )
+        query = query.filter(or_(*_daily_buckets(date).values()))
+    query = query.filter(*_daily_filters(ticket_type, priority, status, assigned_user_id))
     
-    # Apply additional filters
+    # Order by: overdue first, then by scheduled date, then by creation
+    return query.order_by(*DAILY_ORDER).all()
+
+# Daily dashboard buckets. Overdue excludes finished tickets; keep DAILY_DONE_STATUSES in
+# step with the ix_tickets_overdue partial index (migration 20260218_overdue_idx) so the
+# planner can prove the index applies.
+DAILY_BUCKETS = ("scheduled", "unscheduled", "overdue")
+DAILY_DONE_STATUSES = ("completed", "closed", "approved")
+DAILY_ORDER = (models.Ticket.date_scheduled.asc().nullsfirst(), desc(models.Ticket.created_at), models.Ticket.ticket_id)
+
+def _daily_buckets(day: date) -> dict:
+    T = models.Ticket
+    return {
+        # Tickets scheduled for this date
+        "scheduled": T.date_scheduled == day,
+        # Unscheduled tickets created that day
+        "unscheduled": and_(T.date_created == day, T.date_scheduled.is_(None)),
+        # Unfinished tickets from previous days
+        "overdue": and_(
+            or_(T.date_scheduled < day, and_(T.date_created < day, T.date_scheduled.is_(None))),
+            T.status.notin_(DAILY_DONE_STATUSES),
+        ),
+    }
+
+def _daily_filters(ticket_type=None, priority=None, status=None, assigned_user_id=None) -> list:
+    T = models.Ticket
+    clauses = []
     if ticket_type:
-        query = query.filter(models.Ticket.type == ticket_type)
+        clauses.append(T.type == ticket_type)
     if priority:
-        query = query.filter(models.Ticket.priority == priority)
+        clauses.append(T.priority == priority)
     if status:
-        query = query.filter(models.Ticket.status == status)
+        clauses.append(T.status == status)
     if assigned_user_id:
-        query = query.filter(models.Ticket.assigned_user_id == assigned_user_id)
-    
-    # Order by: overdue first, then by scheduled date, then by creation
-    return query.order_by(
-        models.Ticket.date_scheduled.asc().nullsfirst(),
-        desc(models.Ticket.created_at)
-    ).all()
+        clauses.append(T.assigned_user_id == assigned_user_id)
+    return clauses
+
+def _with_child_counts(rows) -> Select:
+    """Select rows (a CTE of projection rows) with comment_count, open_task_count and
+    total_minutes, grouped over just those rows' ticket ids."""
+    ids = select(rows.c.ticket_id)
+    C, K, E = models.TicketComment, models.Task, models.TimeEntry
+    comments = (select(C.ticket_id, func.count().label("n")).where(C.ticket_id.in_(ids))
+                .group_by(C.ticket_id).subquery("comment_counts"))
+    tasks = (select(K.ticket_id, func.count().label("n"))
+             .where(K.ticket_id.in_(ids), K.status != models.TaskStatus.completed)
+             .group_by(K.ticket_id).subquery("open_task_counts"))
+    minutes = (select(E.ticket_id, func.sum(E.duration_minutes).label("n")).where(E.ticket_id.in_(ids))
+               .group_by(E.ticket_id).subquery("time_totals"))
+    return (
+        select(
+            rows,
+            func.coalesce(comments.c.n, 0).label("comment_count"),
+            func.coalesce(tasks.c.n, 0).label("open_task_count"),
+            func.coalesce(minutes.c.n, 0).label("total_minutes"),
+        )
+        .select_from(rows)
+        .outerjoin(comments, comments.c.ticket_id == rows.c.ticket_id)
+        .outerjoin(tasks, tasks.c.ticket_id == rows.c.ticket_id)
+        .outerjoin(minutes, minutes.c.ticket_id == rows.c.ticket_id)
+    )
+
+def get_daily_bucket_rows(db: Session, day: date, bucket: str, skip: int = 0, limit: int = 100,
+                          ticket_type: str = None, priority: str = None, status: str = None,
+                          assigned_user_id: str = None) -> dict:
+    """One page of a daily dashboard bucket as TICKET_LIST_FIELDS rows plus per-ticket
+    comment_count, open_task_count and total_minutes.
+
+    One statement: the page (with the bucket total as a window count) is a CTE, and the
+    counts come from grouped subqueries over just that page's ticket ids.
+    """
+    columns, joins, relations = _ticket_projection(TICKET_LIST_FIELDS)
+    columns += [
+        func.count().over().label("bucket_total"),
+        func.row_number().over(order_by=DAILY_ORDER).label("position"),
+    ]
+    page = (
+        _projection_select(columns, joins)
+        .where(_daily_buckets(day)[bucket], *_daily_filters(ticket_type, priority, status, assigned_user_id))
+        .order_by(*DAILY_ORDER).offset(skip).limit(limit)
+        .cte("page")
+    )
+    rows = _nest_rows(db.execute(_with_child_counts(page).order_by(page.c.position)), relations)
+    total = rows[0]["bucket_total"] if rows else 0
+    if not rows and skip:
+        total = db.execute(
+            select(func.count()).select_from(models.Ticket)
+            .where(_daily_buckets(day)[bucket], *_daily_filters(ticket_type, priority, status, assigned_user_id))
+        ).scalar_one()
+    for row in rows:
+        del row["bucket_total"], row["position"]
+    return {"items": rows, "total": total, "skip": skip, "limit": limit}
+
+def get_daily_board_rows(db: Session, day: Optional[date] = None, ticket_ids=None) -> List[dict]:
+    """Daily summary rows (as in get_daily_bucket_rows) for every ticket on day's board, or
+    for the given tickets regardless of date. Unordered; feeds utils.daily_board."""
+    columns, joins, relations = _ticket_projection(TICKET_LIST_FIELDS)
+    stmt = _projection_select(columns, joins)
+    if ticket_ids is not None:
+        stmt = stmt.where(models.Ticket.ticket_id == any_(literal(list(ticket_ids), ARRAY(String))))
+    if day is not None:
+        stmt = stmt.where(or_(*_daily_buckets(day).values()))
+    return _nest_rows(db.execute(_with_child_counts(stmt.cte("board"))), relations)
 
 # Ticket Cost Management - Optimized
 def update_ticket_costs(db: Session, ticket_id: str, cost_data: dict):
@@ -1597,22 +2271,103 @@ def update_ticket_costs(db: Session, ticket_id: str, cost_data: dict):
     return db_ticket
 
 # Search and Filtering - Optimized
-def search_tickets(db: Session, search_term: str, skip: int = 0, limit: int = 100):
-    """Search tickets with full-text search and eager loading"""
-    query = db.query(models.Ticket).options(
-        joinedload(models.Ticket.site),
-        joinedload(models.Ticket.assigned_user),
-        joinedload(models.Ticket.onsite_tech)
-    ).filter(
-        or_(
-            models.Ticket.notes.ilike(f'%{search_term}%'),
-            models.Ticket.ticket_id.ilike(f'%{search_term}%'),
-            models.Site.location.ilike(f'%{search_term}%'),
-            models.Site.brand.ilike(f'%{search_term}%')
+def search_tickets(db: Session, search_term: str, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Ranked full-text search over tickets and their comments, with highlighted snippets.
+
+    Candidates come from the GIN-indexed search vectors (websearch syntax: quoted phrases,
+    OR, -exclusions), identifier prefixes and the site's search_text. Rows are ordered by
+    ts_rank (identifier prefix hits first), then newest first. `snippet` wraps matched
+    terms in <mark></mark>; every other character is raw ticket/comment text, so clients
+    must escape it before rendering as HTML.
+    """
+    term = (search_term or "").strip()
+    if not term:
+        return []
+    T, C = models.Ticket, models.TicketComment
+    query = _text_query(term)
+    prefix = f"{term}%"
+
+    ticket_match = T.search_vector.bool_op("@@")(query)
+    id_match = or_(T.ticket_id.ilike(prefix), T.inc_number.ilike(prefix), T.so_number.ilike(prefix))
+    candidates = union(
+        select(T.ticket_id).where(ticket_match),
+        select(T.ticket_id).where(id_match),
+        select(C.ticket_id).where(C.search_vector.bool_op("@@")(query)),
+        select(T.ticket_id).join(models.Site, models.Site.site_id == T.site_id)
+        .where(_search_match(models.Site.search_text, term)),
+    ).subquery("candidates")
+    # Best-matching comment per ticket
+    comment_hits = (
+        select(C.ticket_id, C.comment_id, func.ts_rank(C.search_vector, query).label("rank"))
+        .where(C.search_vector.bool_op("@@")(query))
+        .order_by(C.ticket_id, desc("rank"))
+        .distinct(C.ticket_id)
+        .subquery("comment_hits")
+    )
+    rank = func.greatest(
+        case((ticket_match, func.ts_rank(T.search_vector, query)), else_=0.0),
+        func.coalesce(comment_hits.c.rank, 0.0),
+        case((id_match, 1.0), else_=0.0),
+    ).label("rank")
+    page = (
+        select(T.ticket_id, comment_hits.c.comment_id, rank)
+        .select_from(candidates)
+        .join(T, T.ticket_id == candidates.c.ticket_id)
+        .outerjoin(comment_hits, comment_hits.c.ticket_id == T.ticket_id)
+        .order_by(desc("rank"), desc(T.created_at))
+        .offset(skip)
+        .limit(limit)
+        .subquery("page")
+    )
+    # Headlines are computed for the returned page only
+    snippet = case(
+        (ticket_match, func.ts_headline(SEARCH_CONFIG, func.coalesce(T.notes, ""), query, SNIPPET_OPTIONS)),
+        (C.comment_id.isnot(None), func.ts_headline(SEARCH_CONFIG, C.comment, query, SNIPPET_OPTIONS)),
+        else_=None,
+    )
+    stmt = (
+        select(
+            T.ticket_id, T.status, T.priority, T.type, T.site_id, T.inc_number, T.so_number, T.created_at,
+            models.Site.location.label("site_location"), models.Site.brand.label("site_brand"),
+            page.c.rank,
+            case((or_(ticket_match, id_match), "ticket"), (C.comment_id.isnot(None), "comment"),
+                 else_="site").label("matched_in"),
+            snippet.label("snippet"),
         )
+        .select_from(page)
+        .join(T, T.ticket_id == page.c.ticket_id)
+        .outerjoin(models.Site, models.Site.site_id == T.site_id)
+        .outerjoin(C, C.comment_id == page.c.comment_id)
+        .order_by(desc(page.c.rank), desc(T.created_at))
     )
-    
-    return query.order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit).all()
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+def global_search(db: Session, search_term: str, per_type: int = 10) -> List[dict]:
+    """Ranked matches from search_documents, at most per_type rows per entity type.
+
+    A document matches on a body substring (trigram indexed) or on its words (websearch
+    syntax). Within each type, exact then prefix entity_id hits come first, then similarity.
+    """
+    term = (search_term or "").strip()
+    if not term:
+        return []
+    D = models.SearchDocument
+    entity_id = func.lower(D.entity_id)
+    tier = case((entity_id == term.lower(), 0), (entity_id.like(f"{_like_escape(term)}%", escape="/"), 1), else_=2)
+    score = _search_rank(db, D.body, term)
+    position = func.row_number().over(partition_by=D.entity_type, order_by=(tier, desc(score), D.entity_id))
+    matches = select(
+        D.entity_type, D.entity_id, D.display, score.label("rank"), position.label("position"),
+    ).where(or_(
+        _search_match(D.body, term),
+        D.search_vector.bool_op("@@")(func.websearch_to_tsquery("simple", term)),
+    )).subquery()
+    rows = db.execute(
+        select(matches.c.entity_type, matches.c.entity_id, matches.c.display, matches.c.rank)
+        .where(matches.c.position <= per_type)
+        .order_by(matches.c.entity_type, matches.c.position)
+    ).mappings().all()
+    return [dict(r) for r in rows]
 
 def get_tickets_by_status(db: Session, status: str, skip: int = 0, limit: int = 100):
     """Get tickets by status with eager loading"""
@@ -1647,56 +2402,115 @@ def get_tickets_by_site(db: Session, site_id: str, skip: int = 0, limit: int = 1
     ).filter(models.Ticket.site_id == site_id).order_by(desc(models.Ticket.created_at)).offset(skip).limit(limit).all()
 
 # Statistics and Analytics - Optimized
-def get_ticket_statistics(db: Session, start_date: date = None, end_date: date = None):
-    """Get ticket statistics with optimized queries"""
-    query = db.query(models.Ticket)
-    
+# Statuses that count as resolved in statistics
+RESOLVED_STATUSES = ("completed", "closed", "approved", "archived")
+# Dimensions of the statistics breakdown, in grouping() bit order (first = most significant)
+STAT_DIMENSIONS = ("status", "priority", "type", "assigned_user_id")
+
+def _resolution_hours():
+    """Hours from creation to resolution (resolution_time, else end of work); NULL while unresolved."""
+    T = models.Ticket
+    resolved = func.coalesce(T.resolution_time, T.end_time)
+    return func.extract("epoch", resolved - T.created_at) / 3600.0
+
+def _date_created_range(start_date: date = None, end_date: date = None) -> list:
+    clauses = []
     if start_date:
-        query = query.filter(models.Ticket.date_created >= start_date)
+        clauses.append(models.Ticket.date_created >= start_date)
     if end_date:
-        query = query.filter(models.Ticket.date_created <= end_date)
-    
-    # Get counts by status
-    status_counts = {}
-    for status in ['open', 'in_progress', 'pending', 'closed', 'cancelled']:
-        status_counts[status] = query.filter(models.Ticket.status == status).count()
-    
-    # Get counts by priority
-    priority_counts = {}
-    for priority in ['low', 'medium', 'high', 'urgent']:
-        priority_counts[priority] = query.filter(models.Ticket.priority == priority).count()
-    
-    # Get counts by type
-    type_counts = {}
-    for ticket_type in ['inhouse', 'onsite', 'projects', 'misc']:
-        type_counts[ticket_type] = query.filter(models.Ticket.type == ticket_type).count()
-    
+        clauses.append(models.Ticket.date_created <= end_date)
+    return clauses
+
+def get_ticket_statistics(db: Session, start_date: date = None, end_date: date = None) -> dict:
+    """Ticket counts and average resolution time by status, priority, type and assignee, plus
+    the full status x priority x type x assignee breakdown, for tickets created in the range.
+
+    One GROUP BY GROUPING SETS query; grouping() tells each row's set apart, so a NULL
+    assignee is not confused with the per-status or grand-total rows. Results are cached
+    per date range in the count cache ("ticket_stats") until the next ticket write.
+    """
+    return count_cache.get_or_compute(
+        "ticket_stats", {"start_date": start_date, "end_date": end_date},
+        lambda: _compute_ticket_statistics(db, start_date, end_date),
+    )
+
+def _compute_ticket_statistics(db: Session, start_date: date = None, end_date: date = None) -> dict:
+    T = models.Ticket
+    dims = [getattr(T, d) for d in STAT_DIMENSIONS]
+    hours = _resolution_hours()
+    stmt = (
+        select(
+            *dims,
+            func.grouping(*dims).label("grouping"),
+            func.count().label("count"),
+            func.count(hours).label("resolved"),
+            func.avg(hours).label("hours"),
+        )
+        .where(*_date_created_range(start_date, end_date))
+        .group_by(func.grouping_sets(*(tuple_(d) for d in dims), tuple_(*dims), tuple_()))
+    )
+
+    def measures(row) -> dict:
+        avg = round(float(row.hours), 2) if row.hours is not None else None
+        return {"count": row.count, "resolved": row.resolved, "average_resolution_hours": avg}
+
+    width = len(dims)
+    by_dimension = {d: {} for d in STAT_DIMENSIONS}
+    breakdown = []
+    totals = {"count": 0, "resolved": 0, "average_resolution_hours": None}
+    for row in db.execute(stmt):
+        values = {d: getattr(getattr(row, d), "value", getattr(row, d)) for d in STAT_DIMENSIONS}
+        if row.grouping == 0:
+            breakdown.append({**values, **measures(row)})
+        elif row.grouping == (1 << width) - 1:
+            totals = measures(row)
+        else:
+            # Exactly one dimension is grouped: its bit is the only zero
+            index = next(i for i in range(width) if not row.grouping & (1 << (width - 1 - i)))
+            name = STAT_DIMENSIONS[index]
+            key = values[name] if values[name] is not None else "unassigned"
+            by_dimension[name][key] = measures(row)
+
+    def counts(name, enum_cls):
+        # Every enum value appears, with zero for values no ticket in the range has
+        return {member.value: by_dimension[name].get(member.value, {}).get("count", 0) for member in enum_cls}
+
     return {
-        'status_counts': status_counts,
-        'priority_counts': priority_counts,
-        'type_counts': type_counts,
-        'total_tickets': query.count()
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "total_tickets": totals["count"],
+        "resolved_tickets": totals["resolved"],
+        "average_resolution_hours": totals["average_resolution_hours"],
+        "status_counts": counts("status", models.TicketStatus),
+        "priority_counts": counts("priority", models.TicketPriority),
+        "type_counts": counts("type", models.TicketType),
+        "by_status": by_dimension["status"],
+        "by_priority": by_dimension["priority"],
+        "by_type": by_dimension["type"],
+        "by_assignee": by_dimension["assigned_user_id"],
+        "breakdown": breakdown,
     }
 
 def get_user_statistics(db: Session, user_id: str, start_date: date = None, end_date: date = None):
-    """Get user statistics with optimized queries"""
-    query = db.query(models.Ticket).filter(models.Ticket.assigned_user_id == user_id)
-    
-    if start_date:
-        query = query.filter(models.Ticket.date_created >= start_date)
-    if end_date:
-        query = query.filter(models.Ticket.date_created <= end_date)
-    
+    """Get ticket totals and average resolution hours for one assignee (single query).
+
+    closed_tickets counts status closed only and open_tickets open, in_progress and pending,
+    unlike the RESOLVED_STATUSES split of get_ticket_statistics.
+    """
+    T = models.Ticket
+    row = db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(T.status == "closed").label("closed"),
+            func.count().filter(T.status.in_(["open", "in_progress", "pending"])).label("open"),
+            func.avg(_resolution_hours()).label("hours"),
+        ).where(T.assigned_user_id == user_id, *_date_created_range(start_date, end_date))
+    ).one()
     return {
-        'total_tickets': query.count(),
-        'closed_tickets': query.filter(models.Ticket.status == 'closed').count(),
-        'open_tickets': query.filter(models.Ticket.status.in_(['open', 'in_progress', 'pending'])).count(),
-        'average_resolution_time': db.query(models.Ticket).filter(
-            models.Ticket.assigned_user_id == user_id,
-            models.Ticket.resolution_time.isnot(None)
-        ).with_entities(
-            db.func.avg(models.Ticket.resolution_time)
-        ).scalar() or 0
+        'total_tickets': row.total,
+        'closed_tickets': row.closed,
+        'open_tickets': row.open,
+        'average_resolution_time': round(float(row.hours), 2) if row.hours is not None else 0
     }
 
 # =============================================================================
@@ -1704,20 +2518,20 @@ def get_user_statistics(db: Session, user_id: str, start_date: date = None, end_
 # =============================================================================
 
 def create_ticket_audit(db: Session, audit: schemas.TicketAuditCreate):
-    """Create an audit log entry"""
-    db_audit = models.TicketAudit(
-        audit_id=str(uuid.uuid4()),
+    """Queue an audit log entry for the batched writer (utils/audit_writer.py); returns the row dict.
+
+    The entry is not part of db's transaction: it is written shortly after, whether or not
+    the caller commits. Writes that must commit atomically with their audit insert it
+    themselves (see create_ticket, mutate_ticket, create_audit_log).
+    """
+    return audit_writer.write(
         ticket_id=audit.ticket_id,
         user_id=audit.user_id,
-        change_time=audit.change_time or datetime.now(timezone.utc),
         field_changed=audit.field_changed,
         old_value=audit.old_value,
-        new_value=audit.new_value
+        new_value=audit.new_value,
+        change_time=audit.change_time,
     )
-    db.add(db_audit)
-    db.commit()
-    db.refresh(db_audit)
-    return db_audit
 
 def get_audit(db: Session, audit_id: str):
     """Get a specific audit log entry with user details"""
@@ -1735,6 +2549,15 @@ def get_audits(db: Session, skip: int = 0, limit: int = 100):
         .limit(limit)\
         .all()
 
+def count_audits(db: Session, estimate: bool = False) -> Tuple[int, bool]:
+    """(audit log entries, exact); estimate=True reads planner statistics (see _estimated_count)."""
+    def exact():
+        return db.query(models.TicketAudit).count()
+
+    if estimate:
+        return _estimated_count(db, models.TicketAudit, [], exact)
+    return exact(), True
+
 def get_ticket_audits(db: Session, ticket_id: str):
     """Get audit log entries for a specific ticket"""
     return db.query(models.TicketAudit)\
@@ -23,14 +23,35 @@ from settings import settings
 os.environ.setdefault("SECRET_KEY", settings.SECRET_KEY)
 
 from utils.main_utils import verify_password, create_access_token, APILatencyTracker, timer_ms
+from utils.request_timing import (
+    TimedJSONResponse,
+    TimedRoute,
+    begin_request_timing,
+    end_request_timing,
+    install_sql_timing,
+    traced_span,
+)
+from utils.tracing import TraceSampler, route_key
+from utils.count_cache import count_cache
+from utils.prefix_index import typeahead
+from utils.daily_board import daily_board
+from utils.sla_engine import sla_engine
+from utils import main_utils
+from utils.audit_writer import audit_writer
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
+install_sql_timing(engine)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ticketing")
 latency_tracker = APILatencyTracker(max_samples_per_key=600)
+trace_sampler = TraceSampler(
+    slowest_per_route=settings.TRACE_SLOWEST_PER_ROUTE,
+    sample_per_route=settings.TRACE_SAMPLE_PER_ROUTE,
+    export_path=settings.TRACE_EXPORT_PATH,
+)
 
 # Redis connection for WebSocket broadcasting (async client)
 redis_client: Redis | None = None
@@ -47,18 +68,104 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Async Redis connection failed: {e}. WebSocket broadcasting will be disabled.")
         redis_client = None
+
+    await asyncio.to_thread(_build_typeahead_indexes)
+    listener = asyncio.create_task(_typeahead_listener()) if redis_client else None
+    reconciler = None
+    if settings.TICKET_COUNTERS_ENABLED and settings.TICKET_COUNTERS_RECONCILE_SECONDS > 0:
+        reconciler = asyncio.create_task(_ticket_counter_reconciler())
+    sla_scanner = None
+    if settings.SLA_ENGINE_ENABLED and settings.SLA_SCAN_SECONDS > 0:
+        sla_scanner = asyncio.create_task(_sla_scanner())
     
     yield
     
+    if listener:
+        listener.cancel()
+    if reconciler:
+        reconciler.cancel()
+    if sla_scanner:
+        sla_scanner.cancel()
+    await asyncio.to_thread(audit_writer.close)
     if redis_client:
         await redis_client.aclose()
 
+def _build_typeahead_indexes():
+    """Warm the typeahead prefix indexes; on failure they build on first lookup instead."""
+    db = SessionLocal()
+    try:
+        typeahead.build_all(db)
+        logger.info(f"Typeahead indexes built ({typeahead.stats()['memory_bytes']} bytes)")
+    except Exception as e:
+        logger.warning(f"Typeahead index build failed: {e}")
+    finally:
+        db.close()
+
+async def _typeahead_listener():
+    """Mark typeahead indexes stale, daily board rows dirty and SLA rules stale on changes broadcast by other workers."""
+    try:
+        pubsub = redis_client.pubsub()
+        await pubsub.subscribe("websocket_updates")
+        async for message in pubsub.listen():
+            if message and message.get("type") == "message":
+                typeahead.mark_stale_for_broadcast(message.get("data"))
+                daily_board.apply_broadcast(message.get("data"))
+                sla_engine.apply_broadcast(message.get("data"))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Typeahead listener stopped: {e}; indexes rely on the periodic DB check")
+
+async def _ticket_counter_reconciler():
+    """Periodically check ticket_counters, rebuilding it after writes that bypass the triggers (e.g. TRUNCATE)."""
+    while True:
+        await asyncio.sleep(settings.TICKET_COUNTERS_RECONCILE_SECONDS)
+        try:
+            await asyncio.to_thread(_reconcile_ticket_counters)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"ticket_counters reconciliation failed: {e}")
+
+def _reconcile_ticket_counters():
+    db = SessionLocal()
+    try:
+        drift = crud.reconcile_ticket_counters(db)
+        if drift:
+            logger.warning(f"ticket_counters: {drift} keys had drifted from tickets; rebuilt")
+    finally:
+        db.close()
+
+async def _sla_scanner():
+    """Periodically escalate at-risk tickets and broadcast the alerts (see utils/sla_engine.py)."""
+    while True:
+        await asyncio.sleep(settings.SLA_SCAN_SECONDS)
+        try:
+            messages = await asyncio.to_thread(_scan_sla)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"SLA scan failed: {e}")
+            continue
+        for message in messages:
+            # Same path as request writes: bump caches and mark board rows here, publish to all workers
+            main_utils._enqueue_broadcast(None, message)
+
+def _scan_sla():
+    db = SessionLocal()
+    try:
+        return sla_engine.scan(db)
+    finally:
+        db.close()
+
 app = FastAPI(
     title="Ticketing System API",
     description="A comprehensive ticketing system for field operations",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
+app.router.route_class = TimedRoute
 
 
 def _latency_bucket(request: Request) -> str:
@@ -90,11 +197,30 @@ app.add_middleware(
 @app.middleware("http")
 async def latency_middleware(request: Request, call_next):
     start = timer_ms()
-    response = await call_next(request)
+    timings, timings_token = begin_request_timing()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request_timing(timings_token)
     elapsed_ms = timer_ms() - start
     bucket = _latency_bucket(request)
     latency_tracker.record(bucket, elapsed_ms)
+    timings.add_span("middleware", timings.started_ms, timings.started_ms + elapsed_ms)
+    trace_sampler.record(
+        route_key(request),
+        request.method,
+        request.url.path,
+        request.url.query,
+        response.status_code,
+        elapsed_ms,
+        list(timings.spans),
+    )
     response.headers["X-Response-Time-Ms"] = f"{elapsed_ms:.2f}"
+    response.headers["Server-Timing"] = timings.server_timing(elapsed_ms)
+    origin = request.headers.get("origin")
+    if origin and origin in settings.CORS_ORIGINS:
+        # Lets the browser expose Server-Timing to the cross-origin frontend
+        response.headers["Timing-Allow-Origin"] = origin
     if elapsed_ms > 1200:
         logger.warning(
             "slow_request method=%s path=%s bucket=%s elapsed_ms=%.2f",
@@ -106,7 +232,7 @@ async def latency_middleware(request: Request, call_next):
     return response
 
 # Include routers
-from routers import tickets, users, sites, shipments, fieldtechs, fieldtech_companies, tasks, equipment, inventory, sla, audit, logging, search
+from routers import tickets, users, sites, shipments, fieldtechs, fieldtech_companies, tasks, equipment, inventory, sla, audit, logging, search, stats
 
 app.include_router(tickets.router)
 app.include_router(users.router)
@@ -121,6 +247,7 @@ app.include_router(sla.router)
 app.include_router(audit.router)
 app.include_router(logging.router)
 app.include_router(search.router)
+app.include_router(stats.router)
 
 # Import authentication from auth module (SECRET_KEY already set above)
 from utils.auth import get_current_user, require_role, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, rate_limit, rate_limit_public
@@ -128,16 +255,17 @@ from utils.auth import get_current_user, require_role, SECRET_KEY, ALGORITHM, AC
 # Override _enqueue_broadcast with redis_client access
 def _enqueue_broadcast(background_tasks: BackgroundTasks, message: str):
     """Enqueue a WebSocket broadcast message"""
-    if background_tasks:
-        background_tasks.add_task(broadcast_message, message)
-    else:
-        # If no background tasks available, broadcast directly (for testing)
-        import asyncio
-        try:
-            asyncio.create_task(broadcast_message(message))
-        except RuntimeError:
-            # No event loop running, skip broadcast
-            logger.warning(f"No background tasks available, skipping broadcast: {message}")
+    with traced_span("broadcast.enqueue"):
+        if background_tasks:
+            background_tasks.add_task(broadcast_message, message)
+        else:
+            # If no background tasks available, broadcast directly (for testing)
+            import asyncio
+            try:
+                asyncio.create_task(broadcast_message(message))
+            except RuntimeError:
+                # No event loop running, skip broadcast
+                logger.warning(f"No background tasks available, skipping broadcast: {message}")
 
 async def broadcast_message(message: str):
     """Broadcast a message to all WebSocket connections"""
@@ -447,6 +575,80 @@ def get_latency_baseline(
         "summary": latency_tracker.summary(),
     }
 
+@app.get("/ops/traces")
+def get_trace_exemplars(
+    route: Optional[str] = None,
+    include_sample: bool = True,
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Retained request traces per route: the slowest N plus a random sample.
+
+    Without `route`, returns a per-route summary; pass e.g. `route=GET /fieldtech-companies/`
+    to get the full span lists.
+    """
+    if route is None:
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "routes": trace_sampler.summary(),
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "traces": trace_sampler.traces(route=route, include_sample=include_sample),
+    }
+
+@app.get("/ops/count-cache")
+def get_count_cache_stats(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Count cache backend and per-table hit ratio for this worker."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **count_cache.stats(),
+    }
+
+@app.get("/ops/typeahead")
+def get_typeahead_stats(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Typeahead prefix index sizes, memory use and rebuild counts for this worker."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **typeahead.stats(),
+    }
+
+@app.get("/ops/audit-writer")
+def get_audit_writer_stats(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Batched audit writer queue depth, flush counts and failures for this worker."""
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        **audit_writer.stats(),
+    }
+
+@app.get("/ops/sla")
+def get_sla_engine_stats(
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """SLA rules held by this worker and at-risk scan counters."""
+    return {"generated_at": datetime.now(timezone.utc).isoformat(), **sla_engine.stats()}
+
+@app.get("/ops/daily-board")
+def get_daily_board_stats(
+    verify: Optional[str] = Query(None, description="YYYY-MM-DD: compare that date's board with the database now"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
+):
+    """Daily board snapshots held by this worker, with incremental update and rebuild counts."""
+    out = {"generated_at": datetime.now(timezone.utc).isoformat()}
+    if verify:
+        try:
+            day = datetime.strptime(verify, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        out["verify"] = {"date": verify, **daily_board.verify(db, day)}
+    return {**out, **daily_board.stats()}
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Text, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, BigInteger, SmallInteger, Float, Date, DateTime, ForeignKey, Text, Enum, Boolean, Computed, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 import enum
 from datetime import datetime, timezone
@@ -41,9 +42,17 @@ class User(Base):
     audits = relationship('TicketAudit', back_populates='user')
     inventory_transactions = relationship('InventoryTransaction', back_populates='user')
 
+def _search_text(*columns: str) -> str:
+    """Generated column SQL for substring search: lowercased, space-joined columns.
+
+    Trigram GIN indexed (migration 20260212_trgm_search) so LIKE '%term%' can use an index.
+    """
+    return "lower(" + " || ' ' || ".join(f"coalesce({c}, '')" for c in columns) + ")"
+
 class FieldTechCompany(Base):
     """One company address; techs under this company use this address for map."""
     __tablename__ = 'field_tech_companies'
+    __mapper_args__ = {"eager_defaults": False}
     company_id = Column(String, primary_key=True, index=True)
     company_name = Column(String, nullable=False)
     company_number = Column(String)
@@ -55,10 +64,12 @@ class FieldTechCompany(Base):
     notes = Column(Text)
     service_radius_miles = Column(Integer)  # Default service area radius from this address (e.g. 50, 100)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    search_text = deferred(Column(Text, Computed(_search_text("company_name", "city", "state", "region"), persisted=True)))
     techs = relationship('FieldTech', back_populates='company', foreign_keys='FieldTech.company_id')
 
 class FieldTech(Base):
     __tablename__ = 'field_techs'
+    __mapper_args__ = {"eager_defaults": False}
     field_tech_id = Column(String, primary_key=True, index=True)
     company_id = Column(String, ForeignKey('field_tech_companies.company_id'))  # Optional: tech belongs to company
     name = Column(String, nullable=False)
@@ -72,11 +83,14 @@ class FieldTech(Base):
     zip = Column(String)
     notes = Column(Text)
     service_radius_miles = Column(Integer)  # How far this tech will travel from company address (overrides company default)
+    search_text = deferred(Column(Text, Computed(
+        _search_text("name", "tech_number", "phone", "email", "city", "state"), persisted=True)))
     company = relationship('FieldTechCompany', back_populates='techs', foreign_keys=[company_id])
     onsite_tickets = relationship('Ticket', back_populates='onsite_tech')
 
 class Site(Base):
     __tablename__ = 'sites'
+    __mapper_args__ = {"eager_defaults": False}
     site_id = Column(String, primary_key=True, index=True)
     ip_address = Column(String)
     location = Column(String)
@@ -96,6 +110,8 @@ class Site(Base):
     phone_types = Column(String)
     network_equipment = Column(String)
     additional_equipment = Column(String)
+    search_text = deferred(Column(Text, Computed(
+        _search_text("site_id", "location", "city", "state", "brand", "ip_address"), persisted=True)))
     equipment = relationship('Equipment', back_populates='site')
     site_equipment = relationship('SiteEquipment', back_populates='site')
     tickets = relationship('Ticket', back_populates='site')
@@ -136,8 +152,20 @@ class TicketPriority(enum.Enum):
     critical = 'critical'
     emergency = 'emergency'
 
+# Generated tsvector expressions. Identifiers are indexed with the 'simple' configuration
+# (no stemming); free text with 'english'. Weights rank identifier hits above notes.
+TICKET_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(ticket_id, '') || ' ' || coalesce(inc_number, '') || ' ' "
+    "|| coalesce(so_number, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(category, '') || ' ' || coalesce(customer_name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(notes, '')), 'C')"
+)
+COMMENT_SEARCH_DOCUMENT = "to_tsvector('english', coalesce(comment, ''))"
+
 class Ticket(Base):
     __tablename__ = 'tickets'
+    # Don't RETURN the generated search_vector on INSERT; it is only read by search queries
+    __mapper_args__ = {"eager_defaults": False}
     ticket_id = Column(String, primary_key=True, index=True)
     site_id = Column(String, ForeignKey('sites.site_id'), nullable=False)
     inc_number = Column(String)
@@ -157,7 +185,8 @@ class Ticket(Base):
     color_flag = Column(String)
     special_flag = Column(String)
     last_updated_by = Column(String, ForeignKey('users.user_id'))
-    last_updated_at = Column(DateTime)
+    last_updated_at = Column(DateTime, onupdate=lambda: datetime.now(timezone.utc))  # Bumped on every UPDATE; list/detail ETags read it
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))  # Optimistic concurrency token
     
     # New Ticket Type System Fields
     claimed_by = Column(String, ForeignKey('users.user_id'))  # In-house tech who claimed ticket
@@ -186,6 +215,7 @@ class Ticket(Base):
     resolution_time = Column(DateTime)  # When ticket was resolved
     escalation_level = Column(Integer, default=0)  # Current escalation level
     escalation_notified = Column(Boolean, default=False)  # Whether escalation was notified
+    sla_escalate_at = Column(DateTime)  # When the SLA scan next raises escalation_level; NULL at the rule's last level
     customer_impact = Column(Enum(ImpactLevel), default=ImpactLevel.medium)
     business_priority = Column(Enum(BusinessPriority), default=BusinessPriority.medium)
     
@@ -212,6 +242,9 @@ class Ticket(Base):
     follow_up_required = Column(Boolean, default=False)  # Whether follow-up is needed
     follow_up_date = Column(Date)  # When to follow up
     follow_up_notes = Column(Text)  # Follow-up notes
+
+    # Full-text search document (GIN indexed, see migration 20260210_ticket_fts); never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(TICKET_SEARCH_DOCUMENT, persisted=True)))
     
     # Relationships
     site = relationship('Site', back_populates='tickets')
@@ -340,6 +373,7 @@ class Task(Base):
 
 class TicketComment(Base):
     __tablename__ = 'ticket_comments'
+    __mapper_args__ = {"eager_defaults": False}
     comment_id = Column(String, primary_key=True, index=True)
     ticket_id = Column(String, ForeignKey('tickets.ticket_id'))
     user_id = Column(String, ForeignKey('users.user_id'))
@@ -347,6 +381,7 @@ class TicketComment(Base):
     is_internal = Column(Boolean, default=False)  # Internal note vs customer visible
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    search_vector = deferred(Column(TSVECTOR, Computed(COMMENT_SEARCH_DOCUMENT, persisted=True)))
     ticket = relationship('Ticket', back_populates='comments')
     user = relationship('User')
 
@@ -410,6 +445,88 @@ class TicketAttachment(Base):
     ticket = relationship('Ticket', back_populates='attachments')
     user = relationship('User')
 
+class SearchDocument(Base):
+    """One row per searchable entity for GET /search, maintained by utils.search_index on flush."""
+    __tablename__ = 'search_documents'
+    __mapper_args__ = {"eager_defaults": False}
+    entity_type = Column(String, primary_key=True)  # ticket, site, user, inventory, field_tech, shipment
+    entity_id = Column(String, primary_key=True)
+    display = Column(String, nullable=False)
+    body = Column(Text, nullable=False)  # lowercased searchable fields, trigram indexed
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('simple', body)", persisted=True)))
+
+# Per-dimension ticket counts for dashboard badges (crud.count_tickets). Statement-level
+# triggers fold each INSERT/UPDATE/DELETE on tickets into one upsert per distinct key, in
+# key order. Each key is spread over TICKET_COUNTER_SLOTS rows (picked by backend pid) so
+# concurrent writers rarely wait on the same row; readers sum the slots. NULL dimensions
+# are stored as ''. crud.reconcile_ticket_counters rebuilds the table from tickets.
+TICKET_COUNTER_SLOTS = 8
+TICKET_COUNTER_KEY = (
+    "coalesce(status::text, ''), coalesce(type::text, ''), coalesce(priority::text, ''), "
+    "coalesce(assigned_user_id, ''), coalesce(onsite_tech_id, '')"
+)
+TICKET_COUNTER_COLUMNS = "status, type, priority, assigned_user_id, onsite_tech_id"
+
+def _counter_upsert(deltas: str) -> str:
+    return (
+        f"INSERT INTO ticket_counters AS c ({TICKET_COUNTER_COLUMNS}, slot, n) "
+        f"SELECT {TICKET_COUNTER_COLUMNS}, pg_backend_pid() % {TICKET_COUNTER_SLOTS}, sum(delta) "
+        f"FROM ({deltas}) AS d ({TICKET_COUNTER_COLUMNS}, delta) "
+        f"GROUP BY {TICKET_COUNTER_COLUMNS} HAVING sum(delta) <> 0 ORDER BY {TICKET_COUNTER_COLUMNS} "
+        f"ON CONFLICT ({TICKET_COUNTER_COLUMNS}, slot) DO UPDATE SET n = c.n + excluded.n"
+    )
+
+# Replace the counters with exact per-key counts (setup and reconciliation)
+TICKET_COUNTER_SEED = (
+    "DELETE FROM ticket_counters",
+    f"INSERT INTO ticket_counters ({TICKET_COUNTER_COLUMNS}, slot, n) "
+    f"SELECT {TICKET_COUNTER_KEY}, 0, count(*) FROM tickets GROUP BY 1, 2, 3, 4, 5",
+)
+
+TICKET_COUNTER_DDL = (
+    # Applied in order by create_all (below) and migration 20260220_ticket_counters
+    f"""CREATE OR REPLACE FUNCTION ticket_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_counter_upsert(f"SELECT {TICKET_COUNTER_KEY}, 1 FROM new_rows")};
+    ELSIF TG_OP = 'DELETE' THEN
+        {_counter_upsert(f"SELECT {TICKET_COUNTER_KEY}, -1 FROM old_rows")};
+    ELSE
+        {_counter_upsert(f"SELECT {TICKET_COUNTER_KEY}, 1 FROM new_rows UNION ALL SELECT {TICKET_COUNTER_KEY}, -1 FROM old_rows")};
+    END IF;
+    RETURN NULL;
+END $$""",
+    "LOCK TABLE tickets IN SHARE ROW EXCLUSIVE MODE",
+    "DROP TRIGGER IF EXISTS ticket_counters_insert ON tickets",
+    "DROP TRIGGER IF EXISTS ticket_counters_update ON tickets",
+    "DROP TRIGGER IF EXISTS ticket_counters_delete ON tickets",
+    "CREATE TRIGGER ticket_counters_insert AFTER INSERT ON tickets REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION ticket_counters_apply()",
+    "CREATE TRIGGER ticket_counters_update AFTER UPDATE ON tickets REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION ticket_counters_apply()",
+    "CREATE TRIGGER ticket_counters_delete AFTER DELETE ON tickets REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION ticket_counters_apply()",
+) + TICKET_COUNTER_SEED
+
+class TicketCounter(Base):
+    """Ticket count per (status, type, priority, assignee, onsite tech, slot); see TICKET_COUNTER_DDL."""
+    __tablename__ = 'ticket_counters'
+    status = Column(String, primary_key=True)
+    type = Column(String, primary_key=True)
+    priority = Column(String, primary_key=True)
+    assigned_user_id = Column(String, primary_key=True)
+    onsite_tech_id = Column(String, primary_key=True)
+    slot = Column(SmallInteger, primary_key=True)
+    n = Column(BigInteger, nullable=False, default=0)
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_ticket_counters(target, connection, tables=(), **kw):
+    """Install the triggers and seed the counters when create_all creates ticket_counters."""
+    if TicketCounter.__table__ in tables:
+        for statement in TICKET_COUNTER_DDL:
+            connection.execute(text(statement))
+
 class RevokedToken(Base):
     __tablename__ = 'revoked_tokens'
     jti = Column(String, primary_key=True, index=True)  # JWT ID
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Build (or repair) the search_documents index behind GET /search from existing rows.
+Safe to re-run: documents are upserted and orphans removed, one transaction per type.
+Run from backend: python rebuild_search_index.py [--types ticket,site] [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from database import SessionLocal
+from utils import search_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--types", default="", help=f"Comma-separated subset of: {', '.join(search_index.SPEC_BY_TYPE)}")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    types = [t.strip() for t in args.types.split(",") if t.strip()]
+    unknown = [t for t in types if t not in search_index.SPEC_BY_TYPE]
+    if unknown:
+        parser.error(f"unknown types: {', '.join(unknown)}")
+
+    db = SessionLocal()
+    try:
+        counts = search_index.rebuild(db, types or None, batch_size=args.batch_size)
+    finally:
+        db.close()
+    for entity_type, total in counts.items():
+        print(f"{entity_type}: {total} documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,9 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.request_timing import TimedRoute
 
-router = APIRouter(prefix="/audit", tags=["audit"])
+router = APIRouter(prefix="/audit", tags=["audit"], route_class=TimedRoute)
 
 @router.get("/")
 def get_audit_logs(
@@ -19,6 +20,16 @@ def get_audit_logs(
     """Get audit logs with filtering"""
     return crud.get_audits(db, skip=skip, limit=limit)
 
+@router.get("/count")
+def count_audit_logs(
+    estimate: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Count audit log entries; estimate=true may answer from planner statistics"""
+    count, exact = crud.count_audits(db, estimate=estimate)
+    return {"count": count, "exact": exact}
+
 @router.get("/{audit_id}")
 def get_audit_log(
     audit_id: str, 
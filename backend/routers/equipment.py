@@ -6,8 +6,9 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.request_timing import TimedRoute
 
-router = APIRouter(prefix="/equipment", tags=["equipment"])
+router = APIRouter(prefix="/equipment", tags=["equipment"], route_class=TimedRoute)
 
 @router.post("/")
 def create_equipment(
@@ -6,8 +6,10 @@ from typing import List, Optional
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, _enqueue_broadcast
+from utils.request_timing import TimedRoute
+from utils.prefix_index import typeahead
 
-router = APIRouter(prefix="/fieldtech-companies", tags=["fieldtech-companies"])
+router = APIRouter(prefix="/fieldtech-companies", tags=["fieldtech-companies"], route_class=TimedRoute)
 
 
 @router.get("/states")
@@ -97,6 +99,17 @@ def list_companies(
     return out
 
 
+@router.get("/lookup")
+def lookup_companies(
+    prefix: str,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Autocomplete: prefix match on company name or number, served from the worker's prefix index"""
+    return typeahead.lookup(db, "field_tech_companies", prefix, limit)
+
+
 @router.get("/{company_id}", response_model=schemas.FieldTechCompanyOut)
 def get_company(
     company_id: str,
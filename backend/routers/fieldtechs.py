@@ -5,9 +5,12 @@ from datetime import datetime, timezone
 
 import models, schemas, crud
 from database import get_db
+from settings import settings
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.request_timing import TimedRoute
+from utils.prefix_index import typeahead
 
-router = APIRouter(prefix="/fieldtechs", tags=["fieldtechs"])
+router = APIRouter(prefix="/fieldtechs", tags=["fieldtechs"], route_class=TimedRoute)
 
 @router.post("/")
 def create_field_tech(
@@ -31,6 +34,16 @@ def create_field_tech(
         _enqueue_broadcast(background_tasks, '{"type":"field_tech","action":"create"}')
     return result
 
+@router.get("/lookup")
+def lookup_field_techs(
+    prefix: str,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Autocomplete: prefix match on tech name or tech number, served from the worker's prefix index"""
+    return typeahead.lookup(db, "field_techs", prefix, limit)
+
 @router.get("/{field_tech_id}")
 def get_field_tech(
     field_tech_id: str, 
@@ -54,6 +67,8 @@ def list_field_techs(
     current_user: models.User = Depends(get_current_user),
 ):
     """List field techs with optional region, company_id, and search (tech name, company name, city, state, phone)."""
+    if "fieldtechs" in settings.CORE_ROW_READS:
+        return crud.get_field_techs_rows(db, skip=skip, limit=limit, region=region, company_id=company_id, search=search)
     return crud.get_field_techs(db, skip=skip, limit=limit, region=region, company_id=company_id, search=search)
 
 @router.put("/{field_tech_id}")
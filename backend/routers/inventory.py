@@ -6,8 +6,10 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.request_timing import TimedRoute
+from utils.prefix_index import typeahead
 
-router = APIRouter(prefix="/inventory", tags=["inventory"])
+router = APIRouter(prefix="/inventory", tags=["inventory"], route_class=TimedRoute)
 
 @router.post("/")
 def create_inventory_item(
@@ -31,6 +33,16 @@ def create_inventory_item(
         _enqueue_broadcast(background_tasks, '{"type":"inventory","action":"create"}')
     return result
 
+@router.get("/lookup")
+def lookup_inventory_items(
+    prefix: str,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Autocomplete: prefix match on SKU or barcode, served from the worker's prefix index"""
+    return typeahead.lookup(db, "inventory", prefix, limit)
+
 @router.get("/{item_id}")
 def get_inventory_item(
     item_id: str, 
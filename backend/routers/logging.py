@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from database import get_db
 from utils.main_utils import get_current_user
+from utils.request_timing import TimedRoute
 import models
 import schemas
 from datetime import datetime, timezone
@@ -13,7 +14,7 @@ import json
 import logging
 from typing import Dict, Any, Optional
 
-router = APIRouter(prefix="/api", tags=["logging"])
+router = APIRouter(prefix="/api", tags=["logging"], route_class=TimedRoute)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -1,154 +1,52 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Dict, Any
 
-import models
+import models, crud
 from database import get_db
 from utils.main_utils import get_current_user
+from utils.request_timing import TimedRoute
 
-router = APIRouter(prefix="/search", tags=["search"])
+router = APIRouter(prefix="/search", tags=["search"], route_class=TimedRoute)
+
+# search_documents.entity_type -> (by_category key, detail URL prefix), in display order
+CATEGORIES = {
+    "ticket": ("tickets", "/tickets"),
+    "site": ("sites", "/sites"),
+    "user": ("users", "/users"),
+    "inventory": ("inventory", "/inventory"),
+    "field_tech": ("field_techs", "/fieldtechs"),
+    "shipment": ("shipments", "/shipments"),
+}
 
 @router.get("")
 def global_search(
     q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results per category"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Global search across tickets, sites, users, and inventory"""
-    
-    results = {
-        "tickets": [],
-        "sites": [],
-        "users": [],
-        "inventory": [],
-        "field_techs": [],
-        "shipments": []
-    }
-    
-    search_term = f"%{q}%"
-    
-    # Search tickets
-    tickets = db.query(models.Ticket).filter(
-        or_(
-            models.Ticket.ticket_id.ilike(search_term),
-            models.Ticket.inc_number.ilike(search_term),
-            models.Ticket.so_number.ilike(search_term),
-            models.Ticket.notes.ilike(search_term),
-            models.Ticket.category.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["tickets"] = [
-        {
-            "id": t.ticket_id,
-            "display": f"Ticket {t.ticket_id} - {t.status}",
-            "type": "ticket",
-            "url": f"/tickets/{t.ticket_id}"
-        } for t in tickets
-    ]
-    
-    # Search sites
-    sites = db.query(models.Site).filter(
-        or_(
-            models.Site.site_id.ilike(search_term),
-            models.Site.location.ilike(search_term),
-            models.Site.city.ilike(search_term),
-            models.Site.brand.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["sites"] = [
-        {
-            "id": s.site_id,
-            "display": f"{s.site_id} - {s.location}",
-            "type": "site",
-            "url": f"/sites/{s.site_id}"
-        } for s in sites
-    ]
-    
-    # Search users
-    users = db.query(models.User).filter(
-        or_(
-            models.User.name.ilike(search_term),
-            models.User.email.ilike(search_term),
-            models.User.user_id.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["users"] = [
-        {
-            "id": u.user_id,
-            "display": f"{u.name} ({u.email})",
-            "type": "user",
-            "url": f"/users/{u.user_id}"
-        } for u in users
-    ]
-    
-    # Search inventory
-    inventory = db.query(models.InventoryItem).filter(
-        or_(
-            models.InventoryItem.name.ilike(search_term),
-            models.InventoryItem.sku.ilike(search_term),
-            models.InventoryItem.barcode.ilike(search_term),
-            models.InventoryItem.description.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["inventory"] = [
-        {
-            "id": i.item_id,
-            "display": f"{i.name} (SKU: {i.sku})",
-            "type": "inventory",
-            "url": f"/inventory/{i.item_id}"
-        } for i in inventory
-    ]
-    
-    # Search field techs
-    field_techs = db.query(models.FieldTech).filter(
-        or_(
-            models.FieldTech.name.ilike(search_term),
-            models.FieldTech.email.ilike(search_term),
-            models.FieldTech.phone.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["field_techs"] = [
-        {
-            "id": ft.field_tech_id,
-            "display": f"{ft.name} - {ft.region}",
-            "type": "field_tech",
-            "url": f"/fieldtechs/{ft.field_tech_id}"
-        } for ft in field_techs
-    ]
-    
-    # Search shipments
-    shipments = db.query(models.Shipment).filter(
-        or_(
-            models.Shipment.shipment_id.ilike(search_term),
-            models.Shipment.tracking_number.ilike(search_term),
-            models.Shipment.what_is_being_shipped.ilike(search_term)
-        )
-    ).limit(10).all()
-    
-    results["shipments"] = [
-        {
-            "id": s.shipment_id,
-            "display": f"Shipment {s.shipment_id} - {s.what_is_being_shipped}",
-            "type": "shipment",
-            "url": f"/shipments/{s.shipment_id}"
-        } for s in shipments
-    ]
-    
+    """Global search across tickets, sites, users, inventory, field techs and shipments.
+
+    One ranked query over the search_documents index (see utils/search_index.py).
+    """
+    results = {category: [] for category, _ in CATEGORIES.values()}
+    for doc in crud.global_search(db, q, per_type=limit):
+        category, url = CATEGORIES[doc["entity_type"]]
+        results[category].append({
+            "id": doc["entity_id"],
+            "display": doc["display"],
+            "type": doc["entity_type"],
+            "url": f"{url}/{doc['entity_id']}",
+        })
+
     # Flatten results for frontend
     all_results = []
     for category, items in results.items():
         all_results.extend(items)
-    
+
     return {
         "query": q,
         "results": all_results,
         "count": len(all_results),
         "by_category": results
     }
-
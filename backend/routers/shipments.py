@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone
 
 import models, schemas, crud
 from database import get_db
+from settings import settings
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.conditional import weak_etag, not_modified, set_validators
+from utils.request_timing import TimedRoute, TimedJSONResponse
 
-router = APIRouter(prefix="/shipments", tags=["shipments"])
+router = APIRouter(prefix="/shipments", tags=["shipments"], route_class=TimedRoute)
 
 def create_shipment_data_from_request(data: schemas.ShipmentWithItemsCreate) -> schemas.ShipmentCreate:
     """Consolidated function to create ShipmentCreate from ShipmentWithItemsCreate"""
@@ -102,17 +105,25 @@ def create_shipment(
 
 @router.get("/count")
 def shipments_count(
-    response: Response,
+    request: Request,
     site_id: str | None = None,
     ticket_id: str | None = None,
     search: str | None = None,
     include_archived: bool = False,
+    estimate: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    count = crud.count_shipments(db, site_id=site_id, ticket_id=ticket_id, search=search, include_archived=include_archived)
-    response.headers["Cache-Control"] = "public, max-age=15"
-    return {"count": count}
+    filters = dict(site_id=site_id, ticket_id=ticket_id, search=search, include_archived=include_archived)
+    if estimate:
+        count, exact = crud.estimate_count_shipments(db, **filters)
+    else:
+        count, exact = crud.count_shipments(db, **filters), True
+    etag = weak_etag("shipments.count", count, exact, site_id, ticket_id, search, include_archived)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return set_validators(TimedJSONResponse({"count": count, "exact": exact}), etag)
 
 @router.get("/")
 def list_shipments(
@@ -126,6 +137,11 @@ def list_shipments(
     current_user: models.User = Depends(get_current_user)
 ):
     """List all shipments with pagination and optional filters"""
+    if "shipments" in settings.CORE_ROW_READS:
+        items = crud.get_shipments_rows(db, skip=skip, limit=limit, site_id=site_id, ticket_id=ticket_id, search=search)
+        if not include_archived:
+            items = [s for s in items if not s.get('archived')]
+        return items
     items = crud.get_shipments(db, skip=skip, limit=limit, site_id=site_id, ticket_id=ticket_id, search=search)
     if not include_archived:
         items = [s for s in items if not getattr(s, 'archived', False)]
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime, timezone
 
 import models, schemas, crud
 from database import get_db
+from settings import settings
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.conditional import weak_etag, not_modified, set_validators
+from utils.request_timing import TimedRoute, TimedJSONResponse
+from utils.serialization import model_list_response
+from utils.prefix_index import typeahead
 
-router = APIRouter(prefix="/sites", tags=["sites"])
+router = APIRouter(prefix="/sites", tags=["sites"], route_class=TimedRoute)
 
 @router.get("/lookup")
 def lookup_sites(
@@ -17,9 +22,8 @@ def lookup_sites(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Fast lookup for Autocomplete: prefix match on site_id only"""
-    q = db.query(models.Site).filter(models.Site.site_id.ilike(f"{prefix}%"))
-    items = q.order_by(models.Site.site_id.asc()).limit(limit).all()
+    """Fast lookup for Autocomplete: prefix match on site_id only, served from the worker's prefix index"""
+    items = typeahead.lookup(db, "sites", prefix, limit)
     response.headers["Cache-Control"] = "public, max-age=30"
     return items
 
@@ -47,15 +51,18 @@ def create_site(
 
 @router.get("/count")
 def sites_count(
-    response: Response,
+    request: Request,
     region: str | None = None,
     search: str | None = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     count = crud.count_sites(db, region=region, search=search)
-    response.headers["Cache-Control"] = "public, max-age=15"
-    return {"count": count}
+    etag = weak_etag("sites.count", count, region, search)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return set_validators(TimedJSONResponse({"count": count}), etag)
 
 @router.get("/{site_id}", response_model=schemas.SiteOut)
 def get_site(
@@ -79,7 +86,11 @@ def list_sites(
     current_user: models.User = Depends(get_current_user)
 ):
     """List sites with pagination and filters"""
-    return crud.get_sites(db, skip=skip, limit=limit, region=region, search=search)
+    if "sites" in settings.CORE_ROW_READS:
+        sites = crud.get_sites_rows(db, skip=skip, limit=limit, region=region, search=search)
+    else:
+        sites = crud.get_sites(db, skip=skip, limit=limit, region=region, search=search)
+    return model_list_response(schemas.SiteOut, sites)
 
 
 @router.put("/{site_id}", response_model=schemas.SiteOut)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+import models, crud
+from database import get_db
+from utils.main_utils import get_current_user
+from utils.request_timing import TimedRoute
+
+router = APIRouter(prefix="/stats", tags=["stats"], route_class=TimedRoute)
+
+@router.get("/tickets")
+def ticket_statistics(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Ticket counts and average resolution hours by status, priority, type and assignee for
+    tickets created between start_date and end_date (inclusive, either may be omitted).
+
+    `breakdown` holds the full status x priority x type x assignee cross-tab. Cached per
+    date range until the next ticket write.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    return crud.get_ticket_statistics(db, start_date=start_date, end_date=end_date)
@@ -1,3 +1,4 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import List
@@ -6,8 +7,9 @@ from datetime import datetime, timezone
 import models, schemas, crud
 from database import get_db
 from utils.main_utils import get_current_user, require_role, audit_log, _enqueue_broadcast
+from utils.request_timing import TimedRoute
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(prefix="/tasks", tags=["tasks"], route_class=TimedRoute)
 
 @router.post("/")
 def create_task(
@@ -28,7 +30,7 @@ def create_task(
     )
     crud.create_ticket_audit(db, audit)
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"task","action":"create"}')
+        _enqueue_broadcast(background_tasks, json.dumps({"type": "task", "action": "create", "ticket_ids": [result.ticket_id]}))
     return result
 
 @router.get("/{task_id}")
@@ -74,7 +76,7 @@ def update_task(
     crud.create_ticket_audit(db, audit)
     
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"task","action":"update"}')
+        _enqueue_broadcast(background_tasks, json.dumps({"type": "task", "action": "update", "ticket_ids": [result.ticket_id]}))
     
     return result
 
@@ -91,7 +93,7 @@ def delete_task(
         raise HTTPException(status_code=404, detail="Task not found")
     
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"task","action":"delete"}')
+        _enqueue_broadcast(background_tasks, json.dumps({"type": "task", "action": "delete", "ticket_ids": [result.ticket_id]}))
     
     return {"success": True, "message": "Task deleted successfully"}
 
@@ -1,52 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Body, Query, Request, Response
+import csv
+import json
+import math
+import tempfile
+import uuid
+import pydantic_core
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone
 
 import models, schemas, crud
 from database import get_db
-from utils.main_utils import get_current_user, require_role, audit_log, _as_ticket_status, _as_role
+from settings import settings
+from utils.main_utils import get_current_user, require_role, _as_ticket_status, _as_role
 from utils.main_utils import _enqueue_broadcast
-
-router = APIRouter(prefix="/tickets", tags=["tickets"])
-
-# Ensure datetime fields are timezone-aware (UTC) before serialization
-def _normalize_ticket_dt(t: models.Ticket):
-    if not t:
-        return t
-    from datetime import timezone as _tz
-    for field in ("created_at", "claimed_at", "check_in_time", "check_out_time", "end_time", "approved_at"):
-        val = getattr(t, field, None)
-        if val is not None and getattr(val, 'tzinfo', None) is None:
-            try:
-                setattr(t, field, val.replace(tzinfo=_tz.utc))
-            except Exception:
-                pass
-    return t
+from utils.conditional import weak_etag, not_modified, set_validators
+from utils.request_timing import TimedRoute, TimedJSONResponse, timed_phase
+from utils.serialization import model_list_response
+from utils import ticket_import
+from utils.daily_board import daily_board
+from utils.sla_engine import sla_engine
+
+router = APIRouter(prefix="/tickets", tags=["tickets"], route_class=TimedRoute)
+
+# Naive timestamps are UTC. TicketOut handles this in its serializer; projection rows
+# (plain dicts from crud.get_ticket_rows) are fixed up here before encoding.
+_UTC_FIELDS = ("created_at", "claimed_at", "check_in_time", "check_out_time", "end_time", "approved_at")
+
+def _rows_as_utc(rows: List[dict]) -> List[dict]:
+    for row in rows:
+        for field in _UTC_FIELDS:
+            val = row.get(field)
+            if val is not None and val.tzinfo is None:
+                row[field] = val.replace(tzinfo=timezone.utc)
+    return rows
+
+def _ticket_event(kind: str, action: str, ticket_ids) -> str:
+    """Broadcast message naming the tickets a write touched, so daily boards can move just those rows."""
+    return json.dumps({"type": kind, "action": action, "ticket_ids": list(ticket_ids)}, separators=(",", ":"))
 
 @router.get("/count")
 def tickets_count(
-    response: Response,
+    request: Request,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     assigned_user_id: Optional[str] = None,
     site_id: Optional[str] = None,
     ticket_type: Optional[str] = None,
     search: Optional[str] = None,
+    onsite_tech_id: Optional[str] = None,
+    estimate: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    count = crud.count_tickets(
-        db,
+    """Count tickets matching the list filters (badge counts come from ticket_counters).
+
+    estimate=true may answer from planner statistics; "exact" says which it did.
+    """
+    filters = dict(
         status=status,
         priority=priority,
         assigned_user_id=assigned_user_id,
         site_id=site_id,
         ticket_type=ticket_type,
         search=search,
+        onsite_tech_id=onsite_tech_id,
     )
-    response.headers["Cache-Control"] = "public, max-age=15"
-    return {"count": count}
+    if estimate:
+        count, exact = crud.estimate_count_tickets(db, **filters)
+    else:
+        count, exact = crud.count_tickets(db, **filters), True
+    etag = weak_etag("tickets.count", count, exact, sorted(filters.items()))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return set_validators(TimedJSONResponse({"count": count, "exact": exact}), etag)
 
 @router.post("/", response_model=schemas.TicketOut)
 def create_ticket(
@@ -56,31 +85,59 @@ def create_ticket(
     background_tasks: BackgroundTasks = None
 ):
     """Create a new ticket"""
+    sla_engine.apply_rule(db, ticket)
     # Wrap to return cleaner errors
     try:
-        result = crud.create_ticket(db=db, ticket=ticket)
+        out = crud.create_ticket(db=db, ticket=ticket, user_id=current_user.user_id)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not create ticket: {str(e)}")
     
-    # Create audit log for ticket creation
-    audit = schemas.TicketAuditCreate(
-        ticket_id=result.ticket_id,
-        user_id=current_user.user_id,
-        change_time=datetime.now(timezone.utc),
-        field_changed="ticket_create",
-        old_value=None,
-        new_value=f"Ticket {result.ticket_id} created"
-    )
-    crud.create_ticket_audit(db, audit)
-    
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"create"}')
-    # Refetch with relations to avoid N+1 during TicketOut serialization
-    out = crud.get_ticket_for_response(db, result.ticket_id)
-    return _normalize_ticket_dt(out)
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "create", [out["ticket_id"]]))
+    return out
+
+@router.post("/import", response_model=schemas.TicketImportResult)
+async def import_tickets(
+    request: Request,
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks = None
+):
+    """Import tickets from a CSV or NDJSON request body (Content-Type text/csv or application/x-ndjson, or ?format=).
+
+    Rows with a ticket_id that exists update that ticket (blank cells keep the stored value);
+    other rows create tickets. As with PUT /tickets/{id}, users other than admins and dispatchers
+    may only update tickets assigned to or claimed by them, and their "closed" becomes "pending".
+    Invalid or unauthorized rows are listed in `errors` and skipped.
+    """
+    fmt = ticket_import.detect_format(format, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson")
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.TICKET_IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Import file is too large")
+            upload.write(chunk)
+        upload.seek(0)
+        try:
+            privileged = _as_role(current_user.role) in (models.UserRole.admin, models.UserRole.dispatcher)
+            result = await run_in_threadpool(ticket_import.import_tickets, db, upload, fmt, current_user.user_id,
+                                             privileged=privileged)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(status_code=400, detail=f"Could not read import file: {str(e)}")
+    finally:
+        upload.close()
+    if background_tasks and (result["inserted"] or result["updated"]):
+        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"import"}')
+    return result
 
 @router.get("/", response_model=List[schemas.TicketOut])
 def list_tickets(
+    request: Request,
     skip: int = 0,
     limit: int = 50,
     status: Optional[str] = None,
@@ -90,37 +147,126 @@ def list_tickets(
     ticket_type: Optional[str] = None,
     search: Optional[str] = None,
     include_related: bool = True,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """List tickets with pagination and filters"""
+    """List tickets with pagination and filters.
+
+    fields=a,b,c returns only those columns (plus ticket_id); view=list returns the
+    columns the ticket list screens render, with a notes excerpt instead of full text.
+    """
     safe_skip = max(0, skip)
     safe_limit = max(1, min(limit, 200))
-    tickets = crud.get_tickets(
-        db,
-        skip=safe_skip,
-        limit=safe_limit,
+    projection = _parse_projection(fields, view)
+    filters = dict(
         status=status,
         priority=priority,
         assigned_user_id=assigned_user_id,
         site_id=site_id,
         ticket_type=ticket_type,
         search=search,
-        include_related=include_related,
     )
-    return [_normalize_ticket_dt(t) for t in tickets]
+    count, latest = crud.ticket_list_watermark(db, **filters)
+    etag = weak_etag(
+        "tickets.list", count, latest, sorted(filters.items()),
+        safe_skip, safe_limit, include_related, projection,
+    )
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    if projection is not None:
+        rows = crud.get_ticket_rows(db, projection, skip=safe_skip, limit=safe_limit, **filters)
+        with timed_phase("serialize"):
+            body = pydantic_core.to_json(_rows_as_utc(rows))
+        return set_validators(Response(content=body, media_type="application/json"), etag)
+    if "tickets" in settings.CORE_ROW_READS:
+        tickets = crud.get_tickets_rows(db, skip=safe_skip, limit=safe_limit, **filters)
+    else:
+        tickets = crud.get_tickets(db, skip=safe_skip, limit=safe_limit, include_related=include_related, **filters)
+    return set_validators(model_list_response(schemas.TicketOut, tickets), etag)
+
+def _parse_projection(fields: Optional[str], view: Optional[str]):
+    """Resolve fields=/view= into a field list, or None for the full TicketOut payload."""
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(requested) - crud.ticket_projection_fields())
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown ticket fields: {', '.join(unknown)}")
+        return ["ticket_id"] + [f for f in requested if f != "ticket_id"]
+    if view is None or view == "full":
+        return None
+    if view == "list":
+        return list(crud.TICKET_LIST_FIELDS)
+    raise HTTPException(status_code=400, detail="Invalid view. Use 'list' or 'full'")
+
+@router.get("/search")
+def search_tickets(
+    q: str = Query(..., min_length=1, description="Words, \"phrases\", OR and -exclusions"),
+    skip: int = 0,
+    limit: int = 25,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Ranked full-text search over ticket fields and comments with highlighted snippets"""
+    rows = crud.search_tickets(db, q, skip=max(0, skip), limit=max(1, min(limit, 100)))
+    with timed_phase("serialize"):
+        return Response(content=pydantic_core.to_json(_rows_as_utc(rows)), media_type="application/json")
 
 @router.get("/{ticket_id}", response_model=schemas.TicketOut)
 def get_ticket(
     ticket_id: str, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Get a specific ticket by ID"""
+    watermark = crud.ticket_detail_watermark(db, ticket_id)
+    if watermark is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    etag = weak_etag("tickets.detail", ticket_id, watermark)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     db_ticket = crud.get_ticket(db, ticket_id=ticket_id)
     if not db_ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    return _normalize_ticket_dt(db_ticket)
+    set_validators(response, etag)
+    return db_ticket
+
+def _ticket_guard_or_404(db: Session, ticket_id: str):
+    guard = crud.get_ticket_guard(db, ticket_id)
+    if not guard:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return guard
+
+def _require_ticket_actor(guard, current_user: models.User, action: str):
+    """RBAC: admin/dispatcher, or the assigned user / claimer of the ticket"""
+    is_admin_or_dispatcher = _as_role(current_user.role) in (models.UserRole.admin, models.UserRole.dispatcher)
+    is_assigned = guard["assigned_user_id"] == current_user.user_id
+    is_claimer = guard["claimed_by"] == current_user.user_id
+    if not (is_admin_or_dispatcher or is_assigned or is_claimer):
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this ticket")
+
+def _mutate_ticket(db: Session, guard, values: dict, current_user: models.User, audits=(), child_rows=(),
+                   error: str = "Could not update ticket"):
+    """crud.mutate_ticket with HTTP errors: 409 if the ticket changed since the guard read"""
+    try:
+        return crud.mutate_ticket(db, guard, values, current_user.user_id, audits, child_rows)
+    except crud.StaleTicketError:
+        raise HTTPException(status_code=409, detail="Ticket was changed by someone else; reload and try again")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"{error}: {str(e)}")
+
+def _allowed_status(requested, current_user: models.User) -> schemas.TicketStatus:
+    """Only admin/dispatcher may close; anyone else closing sends the ticket to pending"""
+    requested = _as_ticket_status(requested)
+    is_admin_or_dispatcher = _as_role(current_user.role) in (models.UserRole.admin, models.UserRole.dispatcher)
+    if requested == schemas.TicketStatus.closed and not is_admin_or_dispatcher:
+        return schemas.TicketStatus.pending
+    return requested
 
 @router.put("/{ticket_id}", response_model=schemas.TicketOut)
 def update_ticket(
@@ -130,45 +276,30 @@ def update_ticket(
     current_user: models.User = Depends(get_current_user), 
     background_tasks: BackgroundTasks = None
 ):
-    """Update a ticket"""
-    prev_ticket = crud.get_ticket(db, ticket_id)
-    if not prev_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    # RBAC: Only admin/dispatcher or assigned/claimer can update
-    user_role = _as_role(current_user.role)
-    is_admin_or_dispatcher = user_role in (models.UserRole.admin, models.UserRole.dispatcher)
-    is_assigned = prev_ticket.assigned_user_id == current_user.user_id
-    is_claimer = (getattr(prev_ticket, 'claimed_by', None) == current_user.user_id)
-    if not (is_admin_or_dispatcher or is_assigned or is_claimer):
-        raise HTTPException(status_code=403, detail="Not authorized to update this ticket")
-
+    """Update a ticket. If `version` is sent it must match the stored version (else 409)."""
+    guard = _ticket_guard_or_404(db, ticket_id)
+    _require_ticket_actor(guard, current_user, "update")
+    if ticket.version is not None and ticket.version != guard["version"]:
+        raise HTTPException(status_code=409, detail="Ticket was changed by someone else; reload and try again")
+
+    values = {
+        field: getattr(value, "value", value)
+        for field, value in ticket.model_dump(
+            exclude_unset=True, exclude={"version", "last_updated_by", "last_updated_at"}
+        ).items()
+        if value is not None
+    }
+    audits = []
     if ticket.status is not None:
-        requested = _as_ticket_status(ticket.status)
-        prev = _as_ticket_status(prev_ticket.status)
-        new_status = requested
-        if requested == schemas.TicketStatus.closed and _as_role(current_user.role) not in (models.UserRole.admin, models.UserRole.dispatcher):
-            new_status = schemas.TicketStatus.pending
-        ticket.status = new_status.value  # store value consistently as string
-
-    # metadata
-    ticket.last_updated_by = current_user.user_id
-    ticket.last_updated_at = datetime.now(timezone.utc)
-    
-    try:
-        crud.update_ticket(db, ticket_id=ticket_id, ticket=ticket)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Could not update ticket: {str(e)}")
-    
-    # Audit comparisons
-    if ticket.status is not None and not (prev_ticket.status == ticket.status):
-        audit_log(db, current_user.user_id, "status", prev_ticket.status, ticket.status, ticket_id)
-    
+        new_status = _allowed_status(ticket.status, current_user)
+        values["status"] = new_status.value  # store value consistently as string
+        if _as_ticket_status(guard["status"]) != new_status:
+            audits.append(("status", guard["status"], new_status))
+
+    out = _mutate_ticket(db, guard, values, current_user, audits)
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"update"}')
-    # Refetch with relations to avoid N+1 during TicketOut serialization
-    out = crud.get_ticket_for_response(db, ticket_id)
-    return _normalize_ticket_dt(out)
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "update", [ticket_id]))
+    return out
 
 @router.patch("/{ticket_id}/status", response_model=schemas.TicketOut)
 def update_ticket_status(
@@ -179,36 +310,19 @@ def update_ticket_status(
     background_tasks: BackgroundTasks = None
 ):
     """Quick endpoint for status changes only"""
-    prev_ticket = crud.get_ticket(db, ticket_id)
-    
-    if not prev_ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    # Handle status change logic
-    requested = _as_ticket_status(status_update.status)
-    is_admin_or_dispatcher = _as_role(current_user.role) in (models.UserRole.admin, models.UserRole.dispatcher)
-    new_status = requested if not (requested == schemas.TicketStatus.closed and not is_admin_or_dispatcher) else schemas.TicketStatus.pending
-
-    ticket_update = schemas.TicketUpdate(
-        status=new_status.value,
-        last_updated_by=current_user.user_id,
-        last_updated_at=datetime.now(timezone.utc),
-    )
-    
-    try:
-        result = crud.update_ticket(db, ticket_id=ticket_id, ticket=ticket_update)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Could not update status: {str(e)}")
-    
-    # Audit log
-    if prev_ticket.status != new_status:
-        audit_log(db, current_user.user_id, "status", prev_ticket.status, new_status, ticket_id)
-    
+    guard = _ticket_guard_or_404(db, ticket_id)
+    new_status = _allowed_status(status_update.status, current_user)
+    audits = []
+    if _as_ticket_status(guard["status"]) != new_status:
+        audits.append(("status", guard["status"], new_status))
+
+    result = _mutate_ticket(db, guard, {"status": new_status.value}, current_user, audits,
+                            error="Could not update status")
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"update"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "update", [ticket_id]))
     return result
 
-@router.post("/{ticket_id}/approve")
+@router.post("/{ticket_id}/approve", response_model=schemas.TicketOut)
 def approve_ticket(
     ticket_id: str, 
     approve: bool, 
@@ -217,26 +331,22 @@ def approve_ticket(
     current_user: models.User = Depends(require_role([models.UserRole.admin.value, models.UserRole.dispatcher.value]))
 ):
     """Approve or reject a ticket"""
-    ticket = crud.get_ticket(db, ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    current = _as_ticket_status(ticket.status)
-    if current not in (schemas.TicketStatus.completed, schemas.TicketStatus.closed):
+    guard = _ticket_guard_or_404(db, ticket_id)
+    prev_status = _as_ticket_status(guard["status"])
+    if prev_status not in (schemas.TicketStatus.completed, schemas.TicketStatus.closed):
         raise HTTPException(status_code=400, detail="Ticket must be completed or closed before approval")
 
-    from datetime import datetime, timezone
-    prev_status = _as_ticket_status(ticket.status)
-    ticket.status = (schemas.TicketStatus.archived if approve else schemas.TicketStatus.in_progress).value
-    ticket.approved_by = current_user.user_id if approve else None
-    ticket.approved_at = datetime.now(timezone.utc) if approve else None
-    db.commit()
-    db.refresh(ticket)
-    # Audit log
-    audit_log(db, current_user.user_id, "approval", prev_status, ticket.status, ticket_id)
-    _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"approval"}')
-    return _normalize_ticket_dt(ticket)
-
-@router.put("/{ticket_id}/claim")
+    new_status = schemas.TicketStatus.archived if approve else schemas.TicketStatus.in_progress
+    values = {
+        "status": new_status.value,
+        "approved_by": current_user.user_id if approve else None,
+        "approved_at": datetime.now(timezone.utc) if approve else None,
+    }
+    ticket = _mutate_ticket(db, guard, values, current_user, [("approval", prev_status, new_status)])
+    _enqueue_broadcast(background_tasks, _ticket_event("ticket", "approval", [ticket_id]))
+    return ticket
+
+@router.put("/{ticket_id}/claim", response_model=schemas.TicketOut)
 def claim_ticket(
     ticket_id: str,
     claim_data: dict,
@@ -245,32 +355,27 @@ def claim_ticket(
     background_tasks: BackgroundTasks = None
 ):
     """Claim a ticket (for in-house technicians)"""
-    ticket = crud.get_ticket(db, ticket_id=ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    # Update ticket with claim info - auto-assign to claiming user
-    from datetime import datetime, timezone
-    ticket.claimed_by = claim_data.get('claimed_by', current_user.user_id)
-    ticket.claimed_at = datetime.now(timezone.utc)
-    ticket.assigned_user_id = current_user.user_id  # Auto-assign to claimer
+    guard = _ticket_guard_or_404(db, ticket_id)
+
+    # Claim info - auto-assign to claiming user
+    now = datetime.now(timezone.utc)
+    claimed_by = claim_data.get('claimed_by', current_user.user_id)
+    values = {
+        "claimed_by": claimed_by,
+        "claimed_at": now,
+        "assigned_user_id": current_user.user_id,  # Auto-assign to claimer
+        "status": models.TicketStatus.in_progress.value,
+    }
     # Start timer on claim if not already started
-    if not getattr(ticket, 'start_time', None):
-        ticket.start_time = datetime.now(timezone.utc)
-    ticket.status = models.TicketStatus.in_progress.value
-    
-    db.commit()
-    db.refresh(ticket)
-    
-    # Audit log
-    audit_log(db, current_user.user_id, "claimed", None, ticket.claimed_by, ticket_id)
-    
+    if not guard["start_time"]:
+        values["start_time"] = now
+
+    ticket = _mutate_ticket(db, guard, values, current_user, [("claimed", None, claimed_by)])
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"claimed"}')
-    
-    return _normalize_ticket_dt(ticket)
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "claimed", [ticket_id]))
+    return ticket
 
-@router.put("/{ticket_id}/complete")
+@router.put("/{ticket_id}/complete", response_model=schemas.TicketOut)
 def complete_ticket(
     ticket_id: str,
     db: Session = Depends(get_db),
@@ -278,64 +383,41 @@ def complete_ticket(
     background_tasks: BackgroundTasks = None
 ):
     """Complete a ticket: stop timer and compute time_spent."""
-    ticket = crud.get_ticket(db, ticket_id=ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-
-    # Permissions: admin/dispatcher or assigned/claimer can complete
-    user_role = _as_role(current_user.role)
-    is_admin_or_dispatcher = user_role in (models.UserRole.admin, models.UserRole.dispatcher)
-    is_assigned = ticket.assigned_user_id == current_user.user_id
-    is_claimer = (getattr(ticket, 'claimed_by', None) == current_user.user_id)
-    if not (is_admin_or_dispatcher or is_assigned or is_claimer):
-        raise HTTPException(status_code=403, detail="Not authorized to complete this ticket")
+    guard = _ticket_guard_or_404(db, ticket_id)
+    _require_ticket_actor(guard, current_user, "complete")
 
     # Stop timer and compute duration (minutes)
-    from datetime import timezone as _tz
-    now = datetime.now(_tz.utc)
-    ticket.end_time = now
-    start = getattr(ticket, 'start_time', None) or getattr(ticket, 'claimed_at', None) or getattr(ticket, 'check_in_time', None) or getattr(ticket, 'created_at', None)
+    now = datetime.now(timezone.utc)
+    values = {"end_time": now, "status": models.TicketStatus.completed.value}
+    child_rows = []
+    start = guard["start_time"] or guard["claimed_at"] or guard["check_in_time"] or guard["created_at"]
     if start is not None:
         # Ensure both aware
-        if getattr(start, 'tzinfo', None) is None:
-            start = start.replace(tzinfo=_tz.utc)
-        duration = now - start
-        import math
-        seconds = max(0, int(duration.total_seconds()))
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        seconds = max(0, int((now - start).total_seconds()))
         minutes = max(1, math.ceil(seconds / 60)) if seconds > 0 else 0
-        ticket.time_spent = minutes
-
-    prev_status = ticket.status
-    ticket.status = models.TicketStatus.completed.value
-
-    db.commit()
-    db.refresh(ticket)
-
-    # Create a time entry for billing based on computed duration
-    if ticket.time_spent and ticket.time_spent > 0:
-        try:
-            entry_dict = {
-                'ticket_id': ticket.ticket_id,
+        values["time_spent"] = minutes
+        # Time entry for billing based on the computed duration, written with the update
+        if minutes > 0:
+            child_rows.append((models.TimeEntry, {
+                'entry_id': str(uuid.uuid4()),
                 'user_id': current_user.user_id,
                 'start_time': start,
                 'end_time': now,
-                'duration_minutes': ticket.time_spent,
+                'duration_minutes': minutes,
                 'description': 'Auto: work duration from claim to complete',
                 'is_billable': True,
-            }
-            crud.create_time_entry(db, entry_dict)
-        except Exception:
-            pass
-
-    # Audit log
-    audit_log(db, current_user.user_id, "status", prev_status, ticket.status, ticket_id)
+                'created_at': now,
+            }))
 
+    audits = [("status", guard["status"], models.TicketStatus.completed)]
+    ticket = _mutate_ticket(db, guard, values, current_user, audits, child_rows)
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"complete"}')
-
-    return _normalize_ticket_dt(ticket)
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "complete", [ticket_id]))
+    return ticket
 
-@router.put("/{ticket_id}/check-in")
+@router.put("/{ticket_id}/check-in", response_model=schemas.TicketOut)
 def check_in_ticket(
     ticket_id: str,
     check_in_data: dict = Body(None),
@@ -344,27 +426,15 @@ def check_in_ticket(
     background_tasks: BackgroundTasks = None
 ):
     """Field tech check-in at site"""
-    ticket = crud.get_ticket(db, ticket_id=ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    # Update ticket with check-in info
-    from datetime import datetime, timezone
-    ticket.check_in_time = datetime.now(timezone.utc)
-    ticket.status = models.TicketStatus.checked_in.value
-    
-    db.commit()
-    db.refresh(ticket)
-    
-    # Audit log
-    audit_log(db, current_user.user_id, "check_in", None, str(ticket.check_in_time), ticket_id)
-    
+    guard = _ticket_guard_or_404(db, ticket_id)
+    now = datetime.now(timezone.utc)
+    values = {"check_in_time": now, "status": models.TicketStatus.checked_in.value}
+    ticket = _mutate_ticket(db, guard, values, current_user, [("check_in", None, str(now))])
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"check_in"}')
-    
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "check_in", [ticket_id]))
     return ticket
 
-@router.put("/{ticket_id}/check-out")
+@router.put("/{ticket_id}/check-out", response_model=schemas.TicketOut)
 def check_out_ticket(
     ticket_id: str,
     check_out_data: dict = Body(None),
@@ -373,39 +443,24 @@ def check_out_ticket(
     background_tasks: BackgroundTasks = None
 ):
     """Field tech check-out from site"""
-    ticket = crud.get_ticket(db, ticket_id=ticket_id)
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket not found")
-    
-    # Update ticket with check-out info
-    from datetime import datetime, timezone
-    ticket.check_out_time = datetime.now(timezone.utc)
-    
+    guard = _ticket_guard_or_404(db, ticket_id)
+    now = datetime.now(timezone.utc)
+    values = {"check_out_time": now, "status": models.TicketStatus.completed.value}
+
     # Calculate onsite duration if check-in exists
-    if ticket.check_in_time:
-        # Ensure both datetimes are timezone-aware for comparison
-        check_in = ticket.check_in_time
+    check_in = guard["check_in_time"]
+    if check_in:
+        # Make timezone-naive datetime aware (assume UTC)
         if check_in.tzinfo is None:
-            # Make timezone-naive datetime aware (assume UTC)
             check_in = check_in.replace(tzinfo=timezone.utc)
-        
-        duration = ticket.check_out_time - check_in
-        duration_minutes = int(duration.total_seconds() / 60)
-        ticket.onsite_duration_minutes = duration_minutes
+        duration_minutes = int((now - check_in).total_seconds() / 60)
+        values["onsite_duration_minutes"] = duration_minutes
         # Also set time_spent so it displays in the frontend
-        ticket.time_spent = duration_minutes
-    
-    ticket.status = models.TicketStatus.completed.value
-    
-    db.commit()
-    db.refresh(ticket)
-    
-    # Audit log
-    audit_log(db, current_user.user_id, "check_out", None, str(ticket.check_out_time), ticket_id)
-    
+        values["time_spent"] = duration_minutes
+
+    ticket = _mutate_ticket(db, guard, values, current_user, [("check_out", None, str(now))])
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"check_out"}')
-    
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "check_out", [ticket_id]))
     return ticket
 
 @router.delete("/{ticket_id}")
@@ -421,7 +476,7 @@ def delete_ticket(
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not delete ticket: {str(e)}")
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"delete"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "delete", [ticket_id]))
     if not result:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return {"success": True, "message": "Ticket deleted"}
@@ -430,6 +485,91 @@ def delete_ticket(
 # Bulk operations
 # ============================
 
+BULK_TICKET_LIMIT = 1000
+BULK_NULLABLE_FIELDS = ("assigned_user_id", "onsite_tech_id", "date_scheduled")
+
+def _bulk_mutate(db: Session, ticket_ids: List[str], patch: dict, current_user: models.User):
+    """Apply patch to many tickets: one guard read, one UPDATE with its audit rows.
+
+    Returns (updated rows in request order, skipped [{ticket_id, reason}]).
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    if len(ticket_ids) > BULK_TICKET_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_TICKET_LIMIT} tickets per request")
+    is_admin_or_dispatcher = _as_role(current_user.role) in (models.UserRole.admin, models.UserRole.dispatcher)
+
+    approve = patch.pop("approve", None)
+    values = {
+        field: getattr(value, "value", value)
+        for field, value in patch.items()
+        if value is not None or field in BULK_NULLABLE_FIELDS
+    }
+    if approve is not None:
+        if not is_admin_or_dispatcher:
+            raise HTTPException(status_code=403, detail="Only admins and dispatchers can approve tickets")
+        if "status" in values:
+            raise HTTPException(status_code=400, detail="approve cannot be combined with status")
+        new_status = schemas.TicketStatus.archived if approve else schemas.TicketStatus.in_progress
+        values.update(
+            status=new_status.value,
+            approved_by=current_user.user_id if approve else None,
+            approved_at=datetime.now(timezone.utc) if approve else None,
+        )
+    elif "status" in values:
+        values["status"] = _allowed_status(values["status"], current_user).value
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    guards = crud.get_ticket_guards(db, ticket_ids)
+    eligible, skipped, audits = [], [], []
+    for ticket_id in ticket_ids:
+        guard = guards.get(ticket_id)
+        if guard is None:
+            skipped.append({"ticket_id": ticket_id, "reason": "Ticket not found"})
+            continue
+        if not (is_admin_or_dispatcher or current_user.user_id in (guard["assigned_user_id"], guard["claimed_by"])):
+            skipped.append({"ticket_id": ticket_id, "reason": "Not authorized to update this ticket"})
+            continue
+        prev_status = _as_ticket_status(guard["status"])
+        if approve is not None:
+            if prev_status not in (schemas.TicketStatus.completed, schemas.TicketStatus.closed):
+                skipped.append({"ticket_id": ticket_id, "reason": "Ticket must be completed or closed before approval"})
+                continue
+            audits.append((ticket_id, "approval", prev_status, values["status"]))
+        eligible.append(guard)
+        for field in ("status", "assigned_user_id", "onsite_tech_id", "date_scheduled", "priority"):
+            if approve is None and field in values and getattr(guard[field], "value", guard[field]) != values[field]:
+                audits.append((ticket_id, field, guard[field], values[field]))
+
+    try:
+        rows = crud.bulk_mutate_tickets(db, eligible, values, current_user.user_id, audits)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not update tickets: {str(e)}")
+    by_id = {row["ticket_id"]: row for row in rows}
+    skipped.extend(
+        {"ticket_id": g["ticket_id"], "reason": "Ticket was changed by someone else; reload and try again"}
+        for g in eligible if g["ticket_id"] not in by_id
+    )
+    return [by_id[t] for t in ticket_ids if t in by_id], skipped
+
+@router.post("/bulk", response_model=schemas.BulkTicketUpdateResult)
+def bulk_update_tickets(
+    payload: schemas.BulkTicketUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks = None
+):
+    """Apply one patch (status, assigned_user_id, onsite_tech_id, date_scheduled, priority, approve) to many tickets.
+
+    Tickets the user may not update, that are not ready for approval, or that changed
+    during the request are listed in `skipped`; the rest are updated together.
+    """
+    patch = payload.model_dump(exclude_unset=True, exclude={"ticket_ids"})
+    updated, skipped = _bulk_mutate(db, payload.ticket_ids, patch, current_user)
+    if background_tasks and updated:
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "bulk_update", (t["ticket_id"] for t in updated)))
+    return {"updated": updated, "skipped": skipped}
+
 @router.post("/bulk/status", response_model=List[schemas.TicketOut])
 def bulk_update_ticket_status(
     payload: schemas.BulkTicketStatusUpdate,
@@ -437,36 +577,16 @@ def bulk_update_ticket_status(
     current_user: models.User = Depends(get_current_user),
     background_tasks: BackgroundTasks = None
 ):
-    """Bulk update status for multiple tickets"""
-    updated: List[models.Ticket] = []
-    user_role = _as_role(current_user.role)
-    is_admin_or_dispatcher = user_role in (models.UserRole.admin, models.UserRole.dispatcher)
-
-    requested = _as_ticket_status(payload.status)
-    for tid in payload.ticket_ids:
-        t = crud.get_ticket(db, tid)
-        if not t:
-            continue
-        # Permission: same as single update - only admin/dispatcher can close
-        new_status = requested if not (requested == schemas.TicketStatus.closed and not is_admin_or_dispatcher) else schemas.TicketStatus.pending
-        ticket_update = schemas.TicketUpdate(
-            status=new_status.value,
-            last_updated_by=current_user.user_id,
-            last_updated_at=datetime.now(timezone.utc),
-        )
-        try:
-            res = crud.update_ticket(db, ticket_id=tid, ticket=ticket_update)
-        except Exception:
-            res = None
-        if res:
-            if getattr(t, 'status', None) != new_status.value:
-                audit_log(db, current_user.user_id, "status", getattr(t, 'status', None), new_status, tid)
-            updated.append(res)
-
+    """Bulk update status for multiple tickets (see POST /tickets/bulk)"""
+    updated, _ = _bulk_mutate(db, payload.ticket_ids, {"status": payload.status}, current_user)
     if background_tasks and updated:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"bulk_status"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "bulk_status", (t["ticket_id"] for t in updated)))
     return updated
 
+# Page size per bucket for GET /tickets/daily/{date}?summary=true
+DAILY_BUCKET_LIMIT = 100
+DAILY_BUCKET_MAX_LIMIT = 200
+
 @router.get("/daily/{date_str}")
 def get_daily_tickets(
     date_str: str,
@@ -474,24 +594,46 @@ def get_daily_tickets(
     priority: Optional[str] = None,
     status: Optional[str] = None,
     assigned_user_id: Optional[str] = None,
+    summary: bool = False,
+    bucket: Optional[str] = None,
+    skip: int = 0,
+    limit: int = DAILY_BUCKET_LIMIT,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get tickets for daily operations dashboard"""
+    """Get tickets for daily operations dashboard.
+
+    summary=true returns list-view rows with comment_count, open_task_count and
+    total_minutes, grouped into scheduled / unscheduled / overdue buckets that page
+    independently (bucket=, skip=, limit=); without bucket every bucket returns its
+    first page. Without filters it reads the worker's snapshot (utils/daily_board.py).
+    """
     try:
         date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-    
-    tickets = crud.get_daily_tickets(
-        db, 
-        date=date_obj, 
-        ticket_type=ticket_type, 
-        priority=priority, 
-        status=status, 
-        assigned_user_id=assigned_user_id
-    )
-    return tickets
+    filters = dict(ticket_type=ticket_type, priority=priority, status=status, assigned_user_id=assigned_user_id)
+
+    if summary:
+        if bucket is not None and bucket not in crud.DAILY_BUCKETS:
+            raise HTTPException(status_code=400, detail=f"Invalid bucket. Use one of: {', '.join(crud.DAILY_BUCKETS)}")
+        safe_skip = max(0, skip)
+        safe_limit = max(1, min(limit, DAILY_BUCKET_MAX_LIMIT))
+        names = [bucket] if bucket else list(crud.DAILY_BUCKETS)
+        if daily_board.enabled and not any(filters.values()):
+            # The unfiltered board is served from this worker's incrementally maintained snapshot
+            buckets = daily_board.pages(db, date_obj, names, skip=safe_skip, limit=safe_limit)
+        else:
+            buckets = {name: crud.get_daily_bucket_rows(db, date_obj, name, skip=safe_skip, limit=safe_limit, **filters)
+                       for name in names}
+        for page in buckets.values():
+            _rows_as_utc(page["items"])
+        with timed_phase("serialize"):
+            body = pydantic_core.to_json({"date": date_obj, "buckets": buckets})
+        return Response(content=body, media_type="application/json")
+
+    tickets = crud.get_daily_tickets(db, date=date_obj, **filters)
+    return model_list_response(schemas.TicketOut, tickets)
 
 @router.put("/{ticket_id}/costs")
 def update_ticket_costs(
@@ -508,7 +650,7 @@ def update_ticket_costs(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"ticket","action":"costs_updated"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("ticket", "costs_updated", [ticket_id]))
     
     return result
 
@@ -554,7 +696,7 @@ def create_comment(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"comment","action":"create"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("comment", "create", [ticket_id]))
     
     return result
 
@@ -581,7 +723,7 @@ def update_comment(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"comment","action":"update"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("comment", "update", [ticket_id]))
     
     return result
 
@@ -607,7 +749,7 @@ def delete_comment(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"comment","action":"delete"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("comment", "delete", [ticket_id]))
     
     return {"success": True, "message": "Comment deleted successfully"}
 
@@ -653,7 +795,7 @@ def create_time_entry(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"time_entry","action":"create"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("time_entry", "create", [ticket_id]))
     
     return result
 
@@ -680,7 +822,7 @@ def update_time_entry(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"time_entry","action":"update"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("time_entry", "update", [ticket_id]))
     
     return result
 
@@ -706,6 +848,6 @@ def delete_time_entry(
     
     # Broadcast update
     if background_tasks:
-        _enqueue_broadcast(background_tasks, '{"type":"time_entry","action":"delete"}')
+        _enqueue_broadcast(background_tasks, _ticket_event("time_entry", "delete", [ticket_id]))
     
     return {"success": True, "message": "Time entry deleted successfully"}
@@ -7,8 +7,9 @@ import models, schemas, crud
 from database import get_db
 from utils.auth import get_current_user, require_role
 from utils.main_utils import audit_log, generate_temp_password, get_password_hash
+from utils.request_timing import TimedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
 @router.post("/", response_model=schemas.UserOut)
 def create_user(
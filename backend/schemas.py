@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_serializer
 from typing import Optional, List
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 import enum
 
 class UserRole(str, enum.Enum):
@@ -274,6 +274,9 @@ class TicketUpdate(BaseModel):
     approved_by: Optional[str] = None
     approved_at: Optional[datetime] = None
     rejection_reason: Optional[str] = None
+
+    # Optimistic concurrency: the version the client last read (409 if the ticket has changed since)
+    version: Optional[int] = None
     
     # Enhanced SLA Management Fields
     sla_target_hours: Optional[int] = None
@@ -312,6 +315,7 @@ class TicketUpdate(BaseModel):
 class TicketOut(TicketBase):
     ticket_id: str
     created_at: Optional[datetime] = None  # Timestamp when ticket was created
+    version: Optional[int] = None  # Send back as TicketUpdate.version to reject conflicting edits
     site: Optional['SiteOut'] = None
     assigned_user: Optional['UserOut'] = None
     claimed_user: Optional['UserOut'] = None
@@ -319,6 +323,13 @@ class TicketOut(TicketBase):
     
     model_config = ConfigDict(from_attributes=True)
 
+    # Timestamps stored without tzinfo are UTC; emit them as such without touching the ORM object
+    @field_serializer("created_at", "claimed_at", "check_in_time", "check_out_time", "end_time", "approved_at")
+    def _serialize_utc(self, value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
 class TicketAuditBase(BaseModel):
     ticket_id: Optional[str] = None
     user_id: Optional[str] = None
@@ -581,6 +592,36 @@ class BulkTicketStatusUpdate(BaseModel):
     ticket_ids: List[str]
     status: TicketStatus
 
+class BulkTicketUpdate(BaseModel):
+    """One patch applied to many tickets; only the fields sent are changed"""
+    ticket_ids: List[str]
+    status: Optional[TicketStatus] = None
+    assigned_user_id: Optional[str] = None
+    onsite_tech_id: Optional[str] = None
+    date_scheduled: Optional[date] = None
+    priority: Optional[TicketPriority] = None
+    approve: Optional[bool] = None
+
+class BulkTicketSkip(BaseModel):
+    ticket_id: str
+    reason: str
+
+class BulkTicketUpdateResult(BaseModel):
+    updated: List[TicketOut]
+    skipped: List[BulkTicketSkip]
+
+class TicketImportError(BaseModel):
+    line: Optional[int] = None
+    field: Optional[str] = None
+    message: str
+
+class TicketImportResult(BaseModel):
+    inserted: int
+    updated: int
+    rejected: int
+    errors: List[TicketImportError]
+    errors_truncated: bool = False
+
 class TokenData(BaseModel):
     user_id: Optional[str] = None
     role: Optional[UserRole] = None
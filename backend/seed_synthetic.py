@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Fill a scratch database with a large, deterministic synthetic dataset for scaling tests.
+Run from backend: python seed_synthetic.py --preset small [--seed 42] [--password secret]
+
+Every table is generated from its own random stream derived from --seed, so the same
+seed and preset always produce the same rows. Rows are streamed into Postgres with COPY
+in batches. Child tables (audits, comments, time entries, shipments) re-derive the ticket
+stream instead of holding 2M tickets in memory. Tickets take the SLA hours of the active
+sla_rules (else the column defaults), as POST /tickets does.
+
+After loading, the script rebuilds ticket_counters and the search_documents index
+(utils/search_index.py) and runs one SLA scan as of REFERENCE_DATE, so escalation
+levels and sla_escalate_at look like a running system's.
+
+Intended for an empty database: the run aborts if tickets already exist unless --force
+is given, which first empties the seeded tables (TRUNCATE ... CASCADE, so every table
+referencing them too).
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+from region_utils import state_to_region
+
+# Row counts per preset. "large" approximates production scale.
+PRESETS = {
+    "small": {"users": 50, "companies": 40, "techs": 200, "sites": 500, "inventory": 200,
+              "tickets": 20_000, "audits": 100_000, "comments": 20_000, "time_entries": 15_000,
+              "shipments": 2_000},
+    "medium": {"users": 200, "companies": 400, "techs": 1_000, "sites": 5_000, "inventory": 1_000,
+               "tickets": 200_000, "audits": 1_000_000, "comments": 200_000, "time_entries": 150_000,
+               "shipments": 20_000},
+    "large": {"users": 500, "companies": 1_500, "techs": 5_000, "sites": 20_000, "inventory": 2_000,
+              "tickets": 2_000_000, "audits": 10_000_000, "comments": 2_000_000, "time_entries": 1_500_000,
+              "shipments": 200_000},
+}
+
+# Tickets are spread over this many days before the reference date
+HISTORY_DAYS = 3 * 365
+# Fixed "today" so output does not depend on when the script runs
+REFERENCE_DATE = date(2026, 1, 31)
+
+BATCH_ROWS = 50_000
+
+TYPE_WEIGHTS = {"onsite": 50, "inhouse": 30, "projects": 10, "misc": 10}
+PRIORITY_WEIGHTS = {"normal": 85, "critical": 12, "emergency": 3}
+ROLE_WEIGHTS = {"tech": 60, "dispatcher": 25, "billing": 10, "admin": 5}
+IMPACT_WEIGHTS = {"low": 25, "medium": 50, "high": 20, "critical": 5}
+BUSINESS_WEIGHTS = {"low": 25, "medium": 50, "high": 20, "urgent": 5}
+# Status mix by ticket age: recent tickets are mostly in flight, old ones mostly finished
+RECENT_STATUS_WEIGHTS = {"open": 25, "scheduled": 20, "checked_in": 5, "in_progress": 15, "pending": 8,
+                         "needs_parts": 7, "go_back_scheduled": 5, "completed": 10, "closed": 5}
+OLD_STATUS_WEIGHTS = {"completed": 5, "closed": 15, "approved": 40, "archived": 38, "pending": 1, "needs_parts": 1}
+FINISHED_STATUSES = {"completed", "closed", "approved", "archived"}
+AUDIT_FIELDS = ["status", "assigned_user_id", "onsite_tech_id", "date_scheduled", "priority", "notes", "claimed_by"]
+
+FIRST_NAMES = ["Mike", "Sarah", "James", "Lisa", "David", "Jennifer", "Robert", "Maria", "John", "Patricia",
+               "Chris", "Angela", "Kevin", "Nicole", "Brian", "Laura", "Jason", "Megan", "Eric", "Rachel"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Wilson", "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "White", "Harris"]
+BRANDS = ["Ace Burger", "Quick Mart", "Sunrise Diner", "Valley Pharmacy", "Metro Fitness", "Harbor Bank"]
+PARTS = ["Router", "Switch 24-port", "IP Phone", "Handset cord", "PoE injector", "Firewall", "UPS battery",
+         "Patch panel", "Access point", "Cat6 cable 50ft", "SIP gateway", "Power supply"]
+COMMENT_TEXT = ["Called site, no answer.", "Tech en route.", "Customer confirmed outage resolved.",
+                "Waiting on parts from warehouse.", "Rescheduled per store manager.",
+                "Replaced faulty handset.", "Escalated to network team.", "Verified dial tone on all lines."]
+NOTES_TEXT = ["Phones down at front counter", "Internet intermittent", "Install new access point",
+              "POS terminal cannot reach network", "Replace failed switch", "Move phone to back office",
+              "Quarterly maintenance visit", "Fax line not working"]
+
+
+def _rng(seed: int, stream: str) -> random.Random:
+    """Independent deterministic random stream per table."""
+    return random.Random(f"{seed}:{stream}")
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def real_zips(limit: int = 5000):
+    """Deterministic list of real, active standard ZIPs in the 50 states + DC as (zip, city, state)."""
+    try:
+        import zipcodes
+        rows = [z for z in zipcodes.list_all()
+                if z.get("active") and z.get("zip_code_type") == "STANDARD" and state_to_region(z.get("state"))]
+        rows.sort(key=lambda z: z["zip_code"])
+        step = max(1, len(rows) // limit)
+        return [(z["zip_code"], z["city"].title(), z["state"]) for z in rows[::step]][:limit]
+    except ImportError:
+        from seed_companies import COMPANIES
+        return [(c["zip"], c["city"], c["state"]) for c in COMPANIES]
+
+
+def user_ids(sizes: dict):
+    return [f"syn-user-{i:05d}" for i in range(sizes["users"])]
+
+
+def gen_users(seed: int, sizes: dict, password_hash: str):
+    rng = _rng(seed, "users")
+    for i, uid in enumerate(user_ids(sizes)):
+        role = "admin" if i == 0 else _weighted(rng, ROLE_WEIGHTS)
+        yield (uid, _name(rng), f"synthetic{i}@example.com", role, f"(555) 01{i % 10}-{1000 + i:04d}",
+               password_hash, False, True)
+
+
+def gen_companies(seed: int, sizes: dict, zips):
+    rng = _rng(seed, "companies")
+    for i in range(sizes["companies"]):
+        zip_code, city, state = rng.choice(zips)
+        yield (f"FTC-{i + 1:06d}", f"{rng.choice(LAST_NAMES)} Field Services {i + 1}", f"SYN-{i + 1:05d}",
+               f"{rng.randint(100, 9999)} Main St", city, state, zip_code, state_to_region(state),
+               None, rng.choice([25, 50, 75, 100, 150]))
+
+
+def gen_techs(seed: int, sizes: dict, zips):
+    rng = _rng(seed, "techs")
+    for i in range(sizes["techs"]):
+        zip_code, city, state = rng.choice(zips)
+        company_id = f"FTC-{rng.randrange(sizes['companies']) + 1:06d}"
+        yield (f"syn-tech-{i:05d}", company_id, _name(rng), f"T{i + 1:05d}", f"(555) 3{i % 100:02d}-{i % 10000:04d}",
+               f"tech{i}@example.com", state_to_region(state), city, state, zip_code, None,
+               rng.choice([None, 25, 50, 75]))
+
+
+def site_ids(sizes: dict):
+    return [f"SYN{i:05d}" for i in range(sizes["sites"])]
+
+
+def gen_sites(seed: int, sizes: dict, zips):
+    rng = _rng(seed, "sites")
+    for sid in site_ids(sizes):
+        zip_code, city, state = rng.choice(zips)
+        brand = rng.choice(BRANDS)
+        yield (sid, f"10.{rng.randrange(256)}.{rng.randrange(256)}.1", f"{brand} #{sid[3:]}", brand,
+               f"(555) 4{rng.randrange(100):02d}-{rng.randrange(10000):04d}", None,
+               f"{rng.randint(100, 9999)} Commerce Dr", city, state, zip_code, state_to_region(state),
+               "America/Chicago", None)
+
+
+def gen_inventory(seed: int, sizes: dict):
+    rng = _rng(seed, "inventory")
+    for i in range(sizes["inventory"]):
+        part = PARTS[i % len(PARTS)]
+        yield (f"SYN-ITEM-{i:05d}", f"{part} {i // len(PARTS) + 1}", f"SKU-{i:06d}", None,
+               rng.randint(0, 500), round(rng.uniform(5, 900), 2), "Warehouse A", f"BC{i:010d}")
+
+
+def iter_ticket_facts(seed: int, sizes: dict):
+    """Yield the core facts of every ticket in order; re-iterable and deterministic.
+
+    (ticket_id, site_id, created_at, status, type, assigned_user_id)
+    IDs follow crud.generate_ticket_id (YYYY-NNNNNN) numbered per creation year.
+    """
+    rng = _rng(seed, "ticket_facts")
+    n = sizes["tickets"]
+    sites = site_ids(sizes)
+    users = user_ids(sizes)
+    start = datetime.combine(REFERENCE_DATE, datetime.min.time(), tzinfo=timezone.utc) - timedelta(days=HISTORY_DAYS)
+    seq_by_year = {}
+    for i in range(n):
+        # Evenly increasing creation times with jitter keep IDs ordered by date
+        offset_days = HISTORY_DAYS * (i + rng.random()) / n
+        created = start + timedelta(days=offset_days)
+        seq = seq_by_year.get(created.year, 0) + 1
+        seq_by_year[created.year] = seq
+        age_days = HISTORY_DAYS - offset_days
+        status = _weighted(rng, RECENT_STATUS_WEIGHTS if age_days < 30 else OLD_STATUS_WEIGHTS)
+        # A minority of sites generate most tickets
+        site = sites[int(len(sites) * rng.random() ** 2)]
+        yield (f"{created.year}-{seq:06d}", site, created, status, _weighted(rng, TYPE_WEIGHTS),
+               rng.choice(users) if rng.random() < 0.8 else None)
+
+
+def gen_tickets(seed: int, sizes: dict, sla_hours):
+    """sla_hours(type, customer_impact, business_priority) -> (target, breach)."""
+    rng = _rng(seed, "tickets")
+    users = user_ids(sizes)
+    n_techs = sizes["techs"]
+    for ticket_id, site_id, created, status, ttype, assigned in iter_ticket_facts(seed, sizes):
+        finished = status in FINISHED_STATUSES
+        scheduled = created.date() + timedelta(days=rng.randint(0, 10))
+        closed = scheduled + timedelta(days=rng.randint(0, 5)) if finished else None
+        onsite_tech = f"syn-tech-{rng.randrange(n_techs):05d}" if ttype == "onsite" and rng.random() < 0.7 else None
+        time_spent = rng.randint(15, 480) if finished else None
+        claimed_by = assigned if ttype == "inhouse" and status != "open" else None
+        row = (
+            ticket_id, site_id, f"INC{rng.randrange(10**7):07d}", None, ttype, status,
+            _weighted(rng, PRIORITY_WEIGHTS), None, assigned, onsite_tech, created.date(), created,
+            scheduled if status != "open" else None, closed, time_spent, rng.choice(NOTES_TEXT),
+            rng.choice(users), created + timedelta(hours=rng.randint(0, 72)),
+            claimed_by, created + timedelta(minutes=rng.randint(5, 600)) if claimed_by else None,
+            _weighted(rng, IMPACT_WEIGHTS), _weighted(rng, BUSINESS_WEIGHTS),
+            status == "completed", True,
+        )
+        target, breach = sla_hours(ttype, row[-4], row[-3])
+        yield row + (created + timedelta(hours=target), target, breach, 0, False, False)
+
+
+def _per_ticket_counts(rng: random.Random, total: int, tickets: int):
+    """Poisson-ish count per ticket so the table total lands near `total`."""
+    mean = total / tickets if tickets else 0
+    whole = int(mean)
+    frac = mean - whole
+    return lambda: whole + (1 if rng.random() < frac else 0) + (rng.randint(-1, 1) if whole >= 2 else 0)
+
+
+def gen_audits(seed: int, sizes: dict):
+    rng = _rng(seed, "audits")
+    users = user_ids(sizes)
+    count = _per_ticket_counts(rng, sizes["audits"], sizes["tickets"])
+    for ticket_id, _site, created, status, _type, _assigned in iter_ticket_facts(seed, sizes):
+        change_time = created
+        for _ in range(count()):
+            change_time += timedelta(minutes=rng.randint(1, 2880))
+            field = rng.choice(AUDIT_FIELDS)
+            old, new = ("open", status) if field == "status" else (None, f"syn-{rng.randrange(10**6)}")
+            yield (_uuid(rng), ticket_id, rng.choice(users), change_time, field, old, new)
+
+
+def gen_comments(seed: int, sizes: dict):
+    rng = _rng(seed, "comments")
+    users = user_ids(sizes)
+    count = _per_ticket_counts(rng, sizes["comments"], sizes["tickets"])
+    for ticket_id, _site, created, _status, _type, _assigned in iter_ticket_facts(seed, sizes):
+        for _ in range(count()):
+            at = created + timedelta(minutes=rng.randint(1, 4320))
+            yield (_uuid(rng), ticket_id, rng.choice(users), rng.choice(COMMENT_TEXT), rng.random() < 0.3, at, at)
+
+
+def gen_time_entries(seed: int, sizes: dict):
+    rng = _rng(seed, "time_entries")
+    users = user_ids(sizes)
+    count = _per_ticket_counts(rng, sizes["time_entries"], sizes["tickets"])
+    for ticket_id, _site, created, _status, _type, _assigned in iter_ticket_facts(seed, sizes):
+        for _ in range(count()):
+            start = created + timedelta(minutes=rng.randint(10, 4320))
+            minutes = rng.randint(10, 240)
+            yield (_uuid(rng), ticket_id, rng.choice(users), start, start + timedelta(minutes=minutes), minutes,
+                   "Troubleshooting", True, 85.0, start)
+
+
+def gen_shipments_and_items(seed: int, sizes: dict):
+    """Yield ("shipments", row) and ("shipment_items", row) pairs; one ticket in N ships parts."""
+    rng = _rng(seed, "shipments")
+    ratio = sizes["shipments"] / sizes["tickets"] if sizes["tickets"] else 0
+    seq = 0
+    item_seq = 0
+    for ticket_id, site_id, created, status, ttype, _assigned in iter_ticket_facts(seed, sizes):
+        if rng.random() >= ratio:
+            continue
+        seq += 1
+        shipment_id = f"SHIP-{seq:07d}"
+        shipped = created + timedelta(hours=rng.randint(2, 72))
+        finished = status in FINISHED_STATUSES
+        items = [f"SYN-ITEM-{rng.randrange(sizes['inventory']):05d}" for _ in range(rng.randint(1, 3))]
+        yield "shipments", (
+            shipment_id, site_id, ticket_id, items[0], PARTS[int(items[0][-5:]) % len(PARTS)],
+            rng.choice(["ground", "2day", "overnight"]), round(rng.uniform(8, 80), 2), None,
+            f"1Z{rng.getrandbits(48):012X}", None, created, shipped if finished or rng.random() < 0.5 else None,
+            None, None, ttype, "normal", 0.0, 0.0, "delivered" if finished else "pending", len(items),
+            status == "archived", False,
+        )
+        for item_id in items:
+            item_seq += 1
+            yield "shipment_items", (
+                f"SI-{item_seq:08d}", shipment_id, item_id, rng.randint(1, 3),
+                PARTS[int(item_id[-5:]) % len(PARTS)], True, None, created,
+            )
+
+
+COLUMNS = {
+    "users": ["user_id", "name", "email", "role", "phone", "hashed_password", "must_change_password", "active"],
+    "field_tech_companies": ["company_id", "company_name", "company_number", "address", "city", "state", "zip",
+                             "region", "notes", "service_radius_miles"],
+    "field_techs": ["field_tech_id", "company_id", "name", "tech_number", "phone", "email", "region", "city",
+                    "state", "zip", "notes", "service_radius_miles"],
+    "sites": ["site_id", "ip_address", "location", "brand", "main_number", "mp", "service_address", "city",
+              "state", "zip", "region", "timezone", "notes"],
+    "inventory_items": ["item_id", "name", "sku", "description", "quantity_on_hand", "cost", "location", "barcode"],
+    "tickets": ["ticket_id", "site_id", "inc_number", "so_number", "type", "status", "priority", "category",
+                "assigned_user_id", "onsite_tech_id", "date_created", "created_at", "date_scheduled", "date_closed",
+                "time_spent", "notes", "last_updated_by", "last_updated_at", "claimed_by", "claimed_at",
+                "customer_impact", "business_priority", "requires_approval", "is_billable", "due_date",
+                "sla_target_hours", "sla_breach_hours", "escalation_level", "escalation_notified", "is_urgent"],
+    "ticket_audits": ["audit_id", "ticket_id", "user_id", "change_time", "field_changed", "old_value", "new_value"],
+    "ticket_comments": ["comment_id", "ticket_id", "user_id", "comment", "is_internal", "created_at", "updated_at"],
+    "time_entries": ["entry_id", "ticket_id", "user_id", "start_time", "end_time", "duration_minutes",
+                     "description", "is_billable", "hourly_rate", "created_at"],
+    "shipments": ["shipment_id", "site_id", "ticket_id", "item_id", "what_is_being_shipped", "shipping_preference",
+                  "charges_out", "charges_in", "tracking_number", "return_tracking", "date_created", "date_shipped",
+                  "date_returned", "notes", "source_ticket_type", "shipping_priority", "parts_cost", "total_cost",
+                  "status", "quantity", "archived", "remove_from_inventory"],
+    "shipment_items": ["shipment_item_id", "shipment_id", "item_id", "quantity", "what_is_being_shipped",
+                       "remove_from_inventory", "notes", "date_created"],
+}
+
+
+def copy_rows(raw_conn, table: str, rows) -> int:
+    """Stream rows into `table` with COPY ... FROM STDIN (CSV), BATCH_ROWS at a time."""
+    sql = f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    pending = 0
+    with raw_conn.cursor() as cur:
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= BATCH_ROWS:
+                buf.seek(0)
+                cur.copy_expert(sql, buf)
+                total += pending
+                buf.seek(0)
+                buf.truncate()
+                pending = 0
+        if pending:
+            buf.seek(0)
+            cur.copy_expert(sql, buf)
+            total += pending
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a deterministic synthetic dataset via COPY.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="synthetic", help="Password for all generated users")
+    parser.add_argument("--force", action="store_true",
+                        help="Empty the seeded tables (and every table referencing them) and load anyway")
+    args = parser.parse_args(argv)
+
+    from functools import lru_cache
+    from sqlalchemy import text
+    import crud
+    import models
+    from database import SessionLocal, engine
+    from utils import search_index
+    from utils.main_utils import get_password_hash
+    from utils.sla_engine import sla_engine
+
+    sizes = PRESETS[args.preset]
+    with engine.connect() as conn:
+        existing = conn.execute(text("SELECT COUNT(*) FROM tickets")).scalar()
+    if existing and not args.force:
+        print(f"tickets already has {existing} rows; use a scratch database or pass --force.")
+        return 1
+    if existing:
+        # Generated ids always start at 1, so loading on top of existing rows would collide
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {', '.join(COLUMNS)} CASCADE"))
+        print(f"--force: emptied {', '.join(COLUMNS)} (CASCADE)")
+
+    db = SessionLocal()
+    defaults = tuple(models.Ticket.__table__.c[c].default.arg for c in ("sla_target_hours", "sla_breach_hours"))
+
+    @lru_cache(maxsize=None)
+    def sla_hours(ticket_type, impact, priority):
+        rule = sla_engine.match(db, ticket_type, impact, priority) if sla_engine.enabled else None
+        if rule is None:
+            return defaults
+        return tuple(rule[f] if rule[f] is not None else d
+                     for f, d in zip(("sla_target_hours", "sla_breach_hours"), defaults))
+
+    zips = real_zips()
+    password_hash = get_password_hash(args.password)
+    shipments_rows = []
+    items_rows = []
+
+    plan = [
+        ("users", lambda: gen_users(args.seed, sizes, password_hash)),
+        ("field_tech_companies", lambda: gen_companies(args.seed, sizes, zips)),
+        ("field_techs", lambda: gen_techs(args.seed, sizes, zips)),
+        ("sites", lambda: gen_sites(args.seed, sizes, zips)),
+        ("inventory_items", lambda: gen_inventory(args.seed, sizes)),
+        ("tickets", lambda: gen_tickets(args.seed, sizes, sla_hours)),
+        ("ticket_audits", lambda: gen_audits(args.seed, sizes)),
+        ("ticket_comments", lambda: gen_comments(args.seed, sizes)),
+        ("time_entries", lambda: gen_time_entries(args.seed, sizes)),
+    ]
+
+    raw = engine.raw_connection()
+    try:
+        for table, rows in plan:
+            started = time.perf_counter()
+            loaded = copy_rows(raw, table, rows())
+            raw.commit()
+            print(f"{table}: {loaded} rows in {time.perf_counter() - started:.1f}s")
+
+        # Shipments and their items come from one pass; buffer them (a small fraction of tickets)
+        for kind, row in gen_shipments_and_items(args.seed, sizes):
+            (shipments_rows if kind == "shipments" else items_rows).append(row)
+        for table, rows in (("shipments", shipments_rows), ("shipment_items", items_rows)):
+            started = time.perf_counter()
+            loaded = copy_rows(raw, table, iter(rows))
+            raw.commit()
+            print(f"{table}: {loaded} rows in {time.perf_counter() - started:.1f}s")
+
+        # What the write paths and background loops would have maintained for these rows
+        started = time.perf_counter()
+        drift = crud.reconcile_ticket_counters(db)
+        print(f"ticket_counters: {drift} keys rebuilt in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        alerts = sla_engine.scan(db, now=datetime.combine(REFERENCE_DATE, dt_time()))
+        print(f"SLA scan: {sla_engine.last_scan_rows} tickets, {len(alerts)} broadcasts "
+              f"in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        counts = search_index.rebuild(db)
+        print(f"search_documents: {sum(counts.values())} documents in {time.perf_counter() - started:.1f}s")
+
+        with raw.cursor() as cur:
+            for table in (*COLUMNS, "search_documents"):
+                cur.execute(f"ANALYZE {table}")
+        raw.commit()
+    finally:
+        raw.close()
+        db.close()
+
+    print(f"Done. Log in as synthetic0@example.com (admin) with password '{args.password}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,66 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Request tracing (see utils/tracing.py)
+    TRACE_SLOWEST_PER_ROUTE: int = 5
+    TRACE_SAMPLE_PER_ROUTE: int = 5
+    TRACE_EXPORT_PATH: str = ""  # Optional JSONL file for retained traces
+
+    # Read-only list endpoints served from Core rows instead of ORM objects (see crud.get_*_rows).
+    # Remove an entry to fall back to the ORM path for that endpoint.
+    CORE_ROW_READS: List[str] = ["tickets", "sites", "shipments", "fieldtechs"]
+
+    # Filtered count cache (see utils/count_cache.py). Entries are invalidated by writes;
+    # the TTL only bounds staleness for writes that bypass the broadcast path.
+    COUNT_CACHE_ENABLED: bool = True
+    COUNT_CACHE_TTL_SECONDS: int = 30
+
+    # Per-worker typeahead prefix indexes (see utils/prefix_index.py): how often a lookup
+    # re-checks the DB fingerprint to catch writes that did not broadcast.
+    TYPEAHEAD_VERIFY_SECONDS: int = 60
+
+    # Audit log writes (see utils/audit_writer.py): "async" queues entries and writes them in
+    # batches every AUDIT_FLUSH_INTERVAL_MS or AUDIT_FLUSH_ROWS entries; "sync" writes each one
+    # immediately. Queued entries are spooled to AUDIT_SPOOL_DIR until committed ("" disables
+    # the spool, losing queued entries if a worker dies). A spool segment that fails
+    # AUDIT_MAX_FLUSH_ATTEMPTS flushes is moved aside as dead-audit-*.jsonl.
+    AUDIT_WRITE_MODE: str = "async"
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_FLUSH_ROWS: int = 500
+    AUDIT_SPOOL_DIR: str = "audit_spool"
+    AUDIT_MAX_FLUSH_ATTEMPTS: int = 10
+
+    # POST /tickets/import (see utils/ticket_import.py): records validated and staged per block,
+    # and the largest upload accepted.
+    TICKET_IMPORT_BLOCK_ROWS: int = 5000
+    TICKET_IMPORT_MAX_BYTES: int = 50 * 1024 * 1024
+
+    # Per-worker daily board snapshots (see utils/daily_board.py): how many dates are kept,
+    # and how often a read compares the snapshot with the database to repair missed changes.
+    DAILY_BOARD_ENABLED: bool = True
+    DAILY_BOARD_MAX_DATES: int = 7
+    DAILY_BOARD_VERIFY_SECONDS: int = 300
+
+    # Trigger-maintained ticket_counters (see models.TICKET_COUNTER_DDL) answer ticket counts
+    # that filter only on status, type, priority, assignee and onsite tech. Each worker checks
+    # them against tickets every TICKET_COUNTERS_RECONCILE_SECONDS and rebuilds them on drift
+    # (0 disables the loop).
+    TICKET_COUNTERS_ENABLED: bool = True
+    TICKET_COUNTERS_RECONCILE_SECONDS: int = 900
+
+    # estimate=true on /tickets/count, /shipments/count and /audit/count answers from planner
+    # statistics (pg_class.reltuples or the EXPLAIN row estimate); estimates below this are
+    # replaced by an exact count.
+    COUNT_ESTIMATE_EXACT_BELOW: int = 10000
+
+    # SLA engine (see utils/sla_engine.py): every SLA_SCAN_SECONDS one worker escalates unresolved
+    # tickets past their SLA target or due within SLA_AT_RISK_MINUTES, and broadcasts the alerts
+    # SLA_ALERT_BATCH per message. Disabling it also stops new tickets taking hours from sla_rules.
+    SLA_ENGINE_ENABLED: bool = True
+    SLA_SCAN_SECONDS: int = 60
+    SLA_AT_RISK_MINUTES: int = 60
+    SLA_ALERT_BATCH: int = 100
+
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -1,6 +1,8 @@
 from starlette.testclient import TestClient
 import os
+import re
 import sys
+from contextlib import contextmanager
 import pytest
 
 # Ensure backend package root is on sys.path
@@ -9,8 +11,12 @@ BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
 if BACKEND_ROOT not in sys.path:
     sys.path.insert(0, BACKEND_ROOT)
 
+# Tests read audit rows right after the request that wrote them
+os.environ.setdefault("AUDIT_WRITE_MODE", "sync")
+
 from main import app  # type: ignore
-from database import SessionLocal
+from database import SessionLocal, engine
+from sqlalchemy import event
 from utils.main_utils import get_password_hash
 import crud
 import schemas
@@ -82,3 +88,33 @@ def ensure_test_site():
             )
     finally:
         db.close()
+
+
+@pytest.fixture
+def record_statements():
+    """Context manager collecting the SQL statements run while its block runs.
+
+    With a pattern only matching statements are kept; without one every statement is,
+    and each commit is recorded as "COMMIT".
+    """
+    @contextmanager
+    def recorder(pattern=None):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if pattern is None or re.search(pattern, statement):
+                statements.append(statement)
+
+        def record_commit(conn):
+            if pattern is None:
+                statements.append("COMMIT")
+
+        event.listen(engine, "before_cursor_execute", record)
+        event.listen(engine, "commit", record_commit)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+            event.remove(engine, "commit", record_commit)
+
+    return recorder
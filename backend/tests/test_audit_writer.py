@@ -0,0 +1,88 @@
+"""Batched audit writer: queued entries, multi-row flush, spool replay and dead-lettering."""
+import os
+import sys
+import uuid
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from database import SessionLocal
+import models
+from utils.audit_writer import AuditWriter
+
+
+def _stored(field):
+    db = SessionLocal()
+    try:
+        return db.query(models.TicketAudit).filter(models.TicketAudit.field_changed == field).count()
+    finally:
+        db.close()
+
+
+def _segments(path, pattern="audit-*.jsonl"):
+    return sorted(path.glob(pattern))
+
+
+def test_entries_are_spooled_until_flushed(tmp_path):
+    writer = AuditWriter(mode="async", interval_ms=60_000, max_rows=100, spool_dir=str(tmp_path))
+    field = f"batch_{uuid.uuid4().hex[:8]}"
+    for i in range(3):
+        writer.write(ticket_id=None, user_id=None, field_changed=field, old_value=i, new_value=i + 1)
+
+    assert _stored(field) == 0
+    segments = _segments(tmp_path)
+    assert len(segments) == 1 and len(segments[0].read_text().splitlines()) == 3
+    assert segments[0].name.startswith(f"audit-{os.getpid()}-{writer._boot}-")
+
+    assert writer.flush() == 3
+    assert _stored(field) == 3
+    assert _segments(tmp_path) == []
+    assert writer.stats()["batches"] == 1
+    writer.close()
+
+
+def test_segments_from_dead_workers_are_replayed_once(tmp_path):
+    field = f"replay_{uuid.uuid4().hex[:8]}"
+    crashed = AuditWriter(mode="async", interval_ms=60_000, max_rows=100, spool_dir=str(tmp_path))
+    crashed.write(ticket_id=None, user_id=None, field_changed=field, new_value="x")
+    crashed._close_spool()
+    crashed._buffer.clear()
+    # Pretend the segments belong to a worker that exited before flushing: one that had this
+    # process's pid under another boot id (no owner lock held), and one from before boot ids
+    segment = _segments(tmp_path)[0]
+    segment.rename(tmp_path / f"audit-{os.getpid()}-deadbeef-1.jsonl")
+    (tmp_path / "audit-999999999-2.jsonl").write_text((tmp_path / f"audit-{os.getpid()}-deadbeef-1.jsonl").read_text())
+
+    writer = AuditWriter(mode="async", interval_ms=60_000, max_rows=100, spool_dir=str(tmp_path))
+    writer.write(ticket_id=None, user_id=None, field_changed=field, new_value="y")
+    assert writer.stats()["replayed"] == 2
+    writer.close()
+
+    assert _stored(field) == 2  # the duplicated segment's entry is written once
+    assert _segments(tmp_path) == []
+
+
+def test_failing_segment_is_dead_lettered_without_blocking_others(tmp_path):
+    writer = AuditWriter(mode="async", interval_ms=60_000, max_rows=100, spool_dir=str(tmp_path), max_attempts=2)
+    bad, good = f"bad_{uuid.uuid4().hex[:8]}", f"good_{uuid.uuid4().hex[:8]}"
+    insert = writer._insert
+
+    def failing_insert(entries):
+        if any(e["field_changed"] == bad for e in entries):
+            raise RuntimeError("value too long")
+        insert(entries)
+
+    writer._insert = failing_insert
+    writer.write(ticket_id=None, user_id=None, field_changed=bad, new_value="x")
+    assert writer.flush() == 0
+    writer.write(ticket_id=None, user_id=None, field_changed=good, new_value="y")
+    assert writer.flush() == 1  # the bad segment's second failure dead-letters it
+
+    assert _stored(good) == 1 and _stored(bad) == 0
+    assert _segments(tmp_path) == []
+    assert len(_segments(tmp_path, "dead-audit-*.jsonl")) == 1
+    stats = writer.stats()
+    assert stats["dead_lettered"] == 1 and stats["pending"] == 0 and stats["failures"] == 2
+    writer.close()
@@ -0,0 +1,148 @@
+"""
+Micro-benchmarks for hot crud functions and schema serialization.
+
+Opt-in: RUN_BENCHMARKS=1 pytest tests/test_benchmarks.py -s
+Results are appended to bench/micro_history.json (override with BENCH_HISTORY). A median
+slower than the recent history by more than BENCH_REGRESSION_THRESHOLD (default 0.25)
+is reported as a warning, or fails the test when BENCH_FAIL_ON_REGRESSION=1.
+Run against a populated database (see seed_synthetic.py) for meaningful numbers.
+"""
+
+import os
+import sys
+import warnings
+from datetime import date
+
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from bench.micro import DEFAULT_HISTORY, BenchmarkHistory, measure  # type: ignore
+from database import SessionLocal  # type: ignore
+import crud  # type: ignore
+import models  # type: ignore
+import schemas  # type: ignore
+import zip_lookup  # type: ignore
+from utils.serialization import list_adapter  # type: ignore
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_BENCHMARKS") != "1", reason="micro-benchmarks are opt-in (RUN_BENCHMARKS=1)"
+)
+
+WARMUP = int(os.getenv("BENCH_WARMUP", "3"))
+REPEAT = int(os.getenv("BENCH_REPEAT", "20"))
+THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.25"))
+
+ZIPS = ["77001", "60601", "90001", "10001", "85001", "80201", "30301", "98101", "78701", "55401"]
+
+
+@pytest.fixture(scope="module")
+def history():
+    hist = BenchmarkHistory(os.getenv("BENCH_HISTORY", DEFAULT_HISTORY))
+    yield hist
+    hist.save()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def bench(history):
+    """bench(name, func, setup=None) -> stats; records history and flags regressions."""
+    def run(name, func, setup=None):
+        stats = measure(func, warmup=WARMUP, repeat=REPEAT, setup=setup)
+        regression = history.record(name, stats, threshold=THRESHOLD, label=os.getenv("BENCH_LABEL"))
+        print(f"\n{name}: median {stats['median_ms']:.3f} ms, p95 {stats['p95_ms']:.3f} ms "
+              f"(min {stats['min_ms']:.3f}, stdev {stats['stdev_ms']:.3f}, n={stats['repeat']})")
+        if regression:
+            if os.getenv("BENCH_FAIL_ON_REGRESSION") == "1":
+                pytest.fail(regression)
+            warnings.warn(regression)
+        return stats
+    return run
+
+
+def test_bench_get_tickets_with_related(bench, db):
+    bench("crud.get_tickets[include_related=True]",
+          lambda: crud.get_tickets(db, limit=100, include_related=True), setup=db.expunge_all)
+
+
+def test_bench_get_tickets_without_related(bench, db):
+    bench("crud.get_tickets[include_related=False]",
+          lambda: crud.get_tickets(db, limit=100, include_related=False), setup=db.expunge_all)
+
+
+def test_bench_get_daily_tickets(bench, db):
+    today = date.today()
+    bench("crud.get_daily_tickets", lambda: crud.get_daily_tickets(db, date=today), setup=db.expunge_all)
+
+
+def test_bench_get_field_tech_companies_with_techs(bench, db):
+    bench("crud.get_field_tech_companies[include_techs=True]",
+          lambda: crud.get_field_tech_companies(db, limit=500, include_techs=True), setup=db.expunge_all)
+
+
+def test_bench_ticket_out_validation(bench, db):
+    tickets = crud.get_tickets(db, limit=200, include_related=True)
+    if not tickets:
+        pytest.skip("no tickets in database")
+    bench(f"schemas.TicketOut.validate[{len(tickets)}]",
+          lambda: [schemas.TicketOut.model_validate(t).model_dump(mode="json") for t in tickets])
+
+
+def test_bench_ticket_out_list_adapter(bench, db):
+    tickets = crud.get_tickets(db, limit=200, include_related=True)
+    if not tickets:
+        pytest.skip("no tickets in database")
+    adapter = list_adapter(schemas.TicketOut)
+    bench(f"utils.serialization.list_adapter[TicketOut][{len(tickets)}]",
+          lambda: adapter.dump_json(adapter.validate_python(tickets, from_attributes=True)))
+
+
+def test_bench_bulk_ticket_update(bench, db):
+    """POST /tickets/bulk's set-based update against the per-ticket update loop it replaced.
+
+    Writes date_scheduled on up to 500 seeded tickets; run against a disposable database.
+    """
+    ids = [t for (t,) in db.query(models.Ticket.ticket_id).order_by(models.Ticket.ticket_id).limit(500)]
+    if not ids:
+        pytest.skip("no tickets in database")
+    today = date.today()
+
+    def loop():
+        for ticket_id in ids:
+            crud.update_ticket(db, ticket_id, schemas.TicketUpdate(date_scheduled=today))
+
+    def bulk():
+        guards = crud.get_ticket_guards(db, ids)
+        crud.bulk_mutate_tickets(db, list(guards.values()), {"date_scheduled": today}, None)
+
+    bench(f"tickets.bulk_update.loop[{len(ids)}]", loop, setup=db.expunge_all)
+    bench(f"tickets.bulk_update.set_based[{len(ids)}]", bulk)
+
+
+@pytest.mark.parametrize("term", ["fax line", "switch"])
+def test_bench_ticket_search_fts_vs_ilike(bench, db, term):
+    """Ranked FTS (crud.search_tickets) against the notes ILIKE scan it replaced."""
+    ilike = (
+        db.query(models.Ticket.ticket_id)
+        .filter(models.Ticket.notes.ilike(f"%{term}%"))
+        .order_by(models.Ticket.created_at.desc())
+        .limit(25)
+    )
+    bench(f"tickets.search.ilike[{term}]", lambda: ilike.all())
+    bench(f"tickets.search.fts[{term}]", lambda: crud.search_tickets(db, term, limit=25))
+
+
+def test_bench_lookup_zip(bench):
+    bench(f"zip_lookup.lookup_zip[{len(ZIPS)}]", lambda: [zip_lookup.lookup_zip(z) for z in ZIPS])
@@ -0,0 +1,123 @@
+"""Count cache: filter normalization, generation invalidation and write-path bumps."""
+import os
+import sys
+import pytest
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from sqlalchemy import text
+from starlette.testclient import TestClient
+from main import app
+from database import SessionLocal
+import models
+from settings import settings
+from utils.count_cache import CountCache, filter_key
+
+client = TestClient(app)
+
+
+def test_filter_key_normalizes_empty_and_whitespace():
+    assert filter_key({"search": " abc ", "region": None}) == filter_key({"search": "abc", "status": ""})
+    assert filter_key({"search": "abc"}) != filter_key({"search": "abd"})
+
+
+def test_memory_cache_hits_until_bumped():
+    cache = CountCache(redis_url="", ttl=30)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("tickets", {"status": "open"}, compute) == 1
+    assert cache.get_or_compute("tickets", {"status": "open"}, compute) == 1
+    cache.bump_for_broadcast('{"type":"comment","action":"create"}')
+    assert cache.get_or_compute("tickets", {"status": "open"}, compute) == 1
+    cache.bump_for_broadcast('{"type":"ticket","action":"update"}')
+    assert cache.get_or_compute("tickets", {"status": "open"}, compute) == 2
+
+    stats = cache.stats()["tables"]["tickets"]
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_compute_error_is_not_a_redis_outage():
+    cache = CountCache(redis_url="redis://fake", ttl=30)
+    cache._redis = _FakeRedis()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("tickets", {"status": "open"}, compute)
+    assert len(calls) == 1
+    assert cache.stats()["tables"].get("tickets", {}).get("errors", 0) == 0
+    assert cache.get_or_compute("tickets", {"status": "open"}, lambda: 7) == 7
+    assert cache.get_or_compute("tickets", {"status": "open"}, lambda: 8) == 7
+
+
+def test_ticket_count_reflects_create(auth_headers, ensure_test_site):
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+    finally:
+        db.close()
+    before = client.get("/tickets/count", params={"site_id": site_id}, headers=auth_headers)
+    assert before.status_code == 200
+    resp = client.post(
+        "/tickets/",
+        json={"site_id": site_id, "type": "onsite", "status": "open"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    after = client.get("/tickets/count", params={"site_id": site_id}, headers=auth_headers)
+    assert after.json()["count"] == before.json()["count"] + 1
+
+
+def test_estimated_counts_report_exactness(auth_headers, ensure_test_site):
+    for path in ("/tickets/count", "/shipments/count", "/audit/count"):
+        exact = client.get(path, headers=auth_headers)
+        assert exact.status_code == 200, exact.text
+        assert exact.json()["exact"] is True
+        estimated = client.get(path, params={"estimate": "true"}, headers=auth_headers)
+        assert estimated.status_code == 200, estimated.text
+        body = estimated.json()
+        assert isinstance(body["count"], int) and isinstance(body["exact"], bool)
+        if body["exact"]:
+            # Small test tables fall back to the exact count
+            assert body["count"] == exact.json()["count"]
+
+
+def test_estimates_above_threshold_are_not_exact(auth_headers, ensure_test_site, monkeypatch):
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+        db.execute(text("ANALYZE tickets, shipments, ticket_audits"))
+        db.commit()
+    finally:
+        db.close()
+    monkeypatch.setattr(settings, "COUNT_ESTIMATE_EXACT_BELOW", 0)
+
+    for path, params in (("/shipments/count", {}), ("/audit/count", {}), ("/tickets/count", {"site_id": site_id})):
+        resp = client.get(path, params={**params, "estimate": "true"}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        body = resp.json()
+        assert isinstance(body["count"], int) and body["exact"] is False, (path, body)
+    # Counter-covered ticket filters stay exact
+    assert client.get("/tickets/count", params={"estimate": "true"}, headers=auth_headers).json()["exact"] is True
@@ -18,3 +18,13 @@ def test_health_ok():
     assert data.get("status") == "healthy"
 
 
+def test_health_server_timing_header():
+    client = TestClient(app)
+    resp = client.get("/health")
+    assert resp.status_code == 200
+    header = resp.headers.get("Server-Timing")
+    assert header
+    phases = {part.split(";")[0].strip() for part in header.split(",")}
+    assert {"auth", "db", "serialize", "app", "total"} <= phases
+
+
@@ -0,0 +1,46 @@
+"""Tests for the in-process ops endpoints (latency, traces)."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from utils.tracing import TraceSampler
+
+client = TestClient(app)
+
+
+def test_ops_traces_requires_auth():
+    """GET /ops/traces without token returns 401."""
+    resp = client.get("/ops/traces")
+    assert resp.status_code == 401
+
+
+def test_ops_traces_keeps_exemplars(auth_headers):
+    """A traced request shows up in the per-route reservoir with SQL spans."""
+    resp = client.get("/tickets/", headers=auth_headers)
+    assert resp.status_code == 200
+
+    summary = client.get("/ops/traces", headers=auth_headers)
+    assert summary.status_code == 200
+    assert "GET /tickets/" in summary.json()["routes"]
+
+    detail = client.get("/ops/traces", params={"route": "GET /tickets/"}, headers=auth_headers)
+    assert detail.status_code == 200
+    slowest = detail.json()["traces"]["GET /tickets/"]["slowest"]
+    assert slowest
+    span_names = {s["name"] for s in slowest[0]["spans"]}
+    assert {"middleware", "dependencies", "endpoint", "sql"} <= span_names
+
+
+def test_traces_keep_query_keys_but_mask_values():
+    """Query parameter values never reach retained or exported traces."""
+    sampler = TraceSampler(slowest_per_route=1, sample_per_route=0)
+    sampler.record("GET /tickets/", "GET", "/tickets/", "search=jane%40acme.com&limit=50&status=",
+                   200, 12.0, [])
+    trace = sampler.traces("GET /tickets/")["GET /tickets/"]["slowest"][0]
+    assert trace["query"] == "search=?&limit=?&status=?"
@@ -0,0 +1,60 @@
+"""Typeahead prefix indexes: lookups, broadcast invalidation and the DB version check."""
+import os
+import sys
+import uuid
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+from database import SessionLocal
+import models
+from utils.prefix_index import typeahead
+
+client = TestClient(app)
+
+
+def test_site_lookup_follows_writes(auth_headers):
+    tag = uuid.uuid4().hex[:6].upper()
+    for suffix in ("B", "A"):
+        resp = client.post("/sites/", json={"site_id": f"PX{tag}{suffix}", "location": f"Lot {suffix}"}, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+
+    found = client.get("/sites/lookup", params={"prefix": f"px{tag}"}, headers=auth_headers).json()
+    assert [s["site_id"] for s in found] == [f"PX{tag}A", f"PX{tag}B"]
+    assert found[0]["location"] == "Lot A"
+    assert len(client.get("/sites/lookup", params={"prefix": f"PX{tag}", "limit": 1}, headers=auth_headers).json()) == 1
+
+    client.delete(f"/sites/PX{tag}A", headers=auth_headers)
+    found = client.get("/sites/lookup", params={"prefix": f"PX{tag}"}, headers=auth_headers).json()
+    assert [s["site_id"] for s in found] == [f"PX{tag}B"]
+
+
+def test_version_check_picks_up_unbroadcast_writes(auth_headers):
+    tag = uuid.uuid4().hex[:8].upper()
+    client.get("/inventory/lookup", params={"prefix": "x"}, headers=auth_headers)
+    db = SessionLocal()
+    try:
+        db.add(models.InventoryItem(item_id=str(uuid.uuid4()), name="Patch cable", sku=f"SKU-{tag}"))
+        db.commit()
+    finally:
+        db.close()
+
+    index = typeahead.indexes["inventory"]
+    original = index.verify_seconds
+    index.verify_seconds = 0
+    try:
+        found = client.get("/inventory/lookup", params={"prefix": f"sku-{tag}"}, headers=auth_headers).json()
+    finally:
+        index.verify_seconds = original
+    assert [i["sku"] for i in found] == [f"SKU-{tag}"]
+
+
+def test_typeahead_stats_report_memory(auth_headers):
+    client.get("/fieldtechs/lookup", params={"prefix": "a"}, headers=auth_headers)
+    stats = client.get("/ops/typeahead", headers=auth_headers).json()
+    assert stats["indexes"]["field_techs"]["rebuilds"] >= 1
+    assert stats["memory_bytes"] >= stats["indexes"]["field_techs"]["memory_bytes"] > 0
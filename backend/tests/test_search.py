@@ -0,0 +1,77 @@
+"""Substring search on sites, field techs and companies, and the global search index."""
+import os
+import sys
+import uuid
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+def test_site_search_is_case_insensitive_substring(auth_headers):
+    tag = uuid.uuid4().hex[:6]
+    site_id = f"SRCH{tag}".upper()
+    resp = client.post(
+        "/sites/",
+        json={"site_id": site_id, "location": f"Riverside 100%_{tag} Plaza", "city": "Springfield", "brand": "Acme"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+
+    found = client.get("/sites/", params={"search": f"100%_{tag.upper()}"}, headers=auth_headers)
+    assert [s["site_id"] for s in found.json()] == [site_id]
+    # % and _ are literal characters, not wildcards
+    assert client.get("/sites/", params={"search": f"100__{tag}"}, headers=auth_headers).json() == []
+    count = client.get("/sites/count", params={"search": "plaza"}, headers=auth_headers)
+    assert count.json()["count"] >= 1
+
+
+def test_company_search_matches_techs_without_duplicates(auth_headers):
+    tag = uuid.uuid4().hex[:8]
+    company = client.post(
+        "/fieldtech-companies/",
+        json={"company_name": f"Quartz Cabling {tag}", "city": "Austin", "state": "TX"},
+        headers=auth_headers,
+    )
+    assert company.status_code == 200, company.text
+    company_id = company.json()["company_id"]
+    for name in ("Dana", "Eli"):
+        tech = client.post(
+            "/fieldtechs/",
+            json={"name": f"{name} {tag}", "company_id": company_id, "phone": "555-0100"},
+            headers=auth_headers,
+        )
+        assert tech.status_code == 200, tech.text
+
+    # Both techs match; the company must still be returned once
+    by_tech = client.get("/fieldtech-companies/", params={"search": tag}, headers=auth_headers)
+    assert [c["company_id"] for c in by_tech.json()] == [company_id]
+
+    techs = client.get("/fieldtechs/", params={"search": f"quartz cabling {tag}"}, headers=auth_headers)
+    assert len(techs.json()) == 2
+
+
+
+def test_global_search_index_follows_writes(auth_headers):
+    tag = uuid.uuid4().hex[:8]
+    site_id = f"GS{tag}".upper()
+    resp = client.post("/sites/", json={"site_id": site_id, "location": f"Harbor {tag} Depot"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+
+    body = client.get("/search", params={"q": f"harbor {tag}"}, headers=auth_headers).json()
+    assert [r["id"] for r in body["by_category"]["sites"]] == [site_id]
+    assert body["by_category"]["sites"][0]["url"] == f"/sites/{site_id}"
+
+    client.put(f"/sites/{site_id}", json={"site_id": site_id, "location": f"Quay {tag} Depot"}, headers=auth_headers)
+    assert client.get("/search", params={"q": f"harbor {tag}"}, headers=auth_headers).json()["count"] == 0
+    moved = client.get("/search", params={"q": f"quay {tag}"}, headers=auth_headers).json()
+    assert moved["results"][0]["display"] == f"{site_id} - Quay {tag} Depot"
+
+    client.delete(f"/sites/{site_id}", headers=auth_headers)
+    assert client.get("/search", params={"q": tag}, headers=auth_headers).json()["count"] == 0
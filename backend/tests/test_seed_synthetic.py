@@ -0,0 +1,41 @@
+import os
+import re
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+import seed_synthetic  # type: ignore
+
+SIZES = {"users": 5, "companies": 3, "techs": 10, "sites": 20, "inventory": 12,
+         "tickets": 500, "audits": 2500, "comments": 500, "time_entries": 300, "shipments": 50}
+
+
+def test_synthetic_rows_are_deterministic():
+    zips = [("77001", "Houston", "TX"), ("60601", "Chicago", "IL")]
+    first = list(seed_synthetic.gen_tickets(7, SIZES)) + list(seed_synthetic.gen_sites(7, SIZES, zips))
+    again = list(seed_synthetic.gen_tickets(7, SIZES)) + list(seed_synthetic.gen_sites(7, SIZES, zips))
+    other = list(seed_synthetic.gen_tickets(8, SIZES))
+    assert first == again
+    assert first[:len(other)] != other
+
+
+def test_synthetic_rows_match_columns_and_counts():
+    tickets = list(seed_synthetic.gen_tickets(1, SIZES))
+    assert len(tickets) == SIZES["tickets"]
+    assert all(len(row) == len(seed_synthetic.COLUMNS["tickets"]) for row in tickets)
+    ids = [row[0] for row in tickets]
+    assert len(set(ids)) == len(ids)
+    assert all(re.fullmatch(r"\d{4}-\d{6}", tid) for tid in ids)
+
+    audits = list(seed_synthetic.gen_audits(1, SIZES))
+    assert all(len(row) == len(seed_synthetic.COLUMNS["ticket_audits"]) for row in audits)
+    assert abs(len(audits) - SIZES["audits"]) < SIZES["audits"] * 0.1
+
+    ticket_ids = set(ids)
+    for kind, row in seed_synthetic.gen_shipments_and_items(1, SIZES):
+        assert len(row) == len(seed_synthetic.COLUMNS[kind])
+        if kind == "shipments":
+            assert row[2] in ticket_ids
@@ -1,6 +1,10 @@
-"""Tests for SLA rule CRUD."""
+"""Tests for SLA rule CRUD and the SLA engine."""
+import io
+import json
 import os
 import sys
+import uuid
+from datetime import datetime, timedelta
 import pytest
 
 CURRENT_DIR = os.path.dirname(__file__)
@@ -10,6 +14,10 @@ if BACKEND_ROOT not in sys.path:
 
 from starlette.testclient import TestClient
 from main import app
+from database import SessionLocal
+import models
+from utils import ticket_import
+from utils.sla_engine import SLAEngine, escalation_level, next_escalation_at, sla_engine
 
 client = TestClient(app)
 
@@ -109,3 +117,133 @@ def test_sla_delete(auth_headers):
     assert resp.json().get("success") is True
     get_resp = client.get(f"/sla/{rule_id}", headers=auth_headers)
     assert get_resp.status_code == 404
+
+
+def _rule(rule_id, ticket_type=None, customer_impact=None, business_priority=None, levels=3):
+    return dict(rule_id=rule_id, name=rule_id, ticket_type=ticket_type, customer_impact=customer_impact,
+                business_priority=business_priority, sla_target_hours=4, sla_breach_hours=8,
+                escalation_levels=levels)
+
+
+def test_rule_match_prefers_most_specific_with_wildcards():
+    engine = SLAEngine()
+    engine.load([
+        _rule("any"),
+        _rule("onsite-urgent", "onsite", None, "urgent"),
+        _rule("onsite-critical", "onsite", "critical", None),
+    ])
+    assert engine.match(None, models.TicketType.onsite, models.ImpactLevel.critical, models.BusinessPriority.urgent)["rule_id"] == "onsite-critical"
+    assert engine.match(None, "onsite", "low", "urgent")["rule_id"] == "onsite-urgent"
+    assert engine.match(None, "misc", "low", "low")["rule_id"] == "any"
+
+
+def test_escalation_level_steps_after_breach():
+    created = datetime(2026, 1, 1)
+    levels = [escalation_level(created + timedelta(hours=h), created, 4, 8, 4) for h in (1, 4, 8, 12, 40)]
+    assert levels == [0, 1, 2, 3, 4]
+
+
+def test_next_escalation_stops_at_the_last_level():
+    created = datetime(2026, 1, 1)
+    assert next_escalation_at(created, 4, 8, 0, 4) == created + timedelta(hours=4)
+    assert next_escalation_at(created, 4, 8, 1, 4) == created + timedelta(hours=8)
+    assert next_escalation_at(created, 4, 8, 3, 4) == created + timedelta(hours=16)
+    assert next_escalation_at(created, 4, 8, 4, 4) is None
+    # No breach step: nothing after level 2
+    assert next_escalation_at(created, 4, 4, 2, 4) is None
+    assert next_escalation_at(created, 4, None, 1, 4) is None
+
+
+def test_update_messages_batch_silent_escalations():
+    messages = [json.loads(m) for m in SLAEngine(alert_batch=2).update_messages(["a", "b", "c"])]
+    assert messages == [{"type": "ticket", "action": "sla_update", "ticket_ids": ["a", "b"]},
+                        {"type": "ticket", "action": "sla_update", "ticket_ids": ["c"]}]
+
+
+def test_new_ticket_takes_rule_hours(auth_headers, ensure_test_site):
+    rule = client.post(
+        "/sla/",
+        json={"name": "Engine Rule Pytest", "ticket_type": "misc", "customer_impact": "critical",
+              "business_priority": "urgent", "sla_target_hours": 3, "sla_breach_hours": 7, "is_active": True},
+        headers=auth_headers,
+    )
+    assert rule.status_code == 200, rule.text
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+    finally:
+        db.close()
+    try:
+        resp = client.post(
+            "/tickets/",
+            json={"site_id": site_id, "type": "misc", "status": "open",
+                  "customer_impact": "critical", "business_priority": "urgent"},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["sla_target_hours"] == 3
+        assert resp.json()["sla_breach_hours"] == 7
+        # The ticket forms send null for empty fields
+        nulls = client.post(
+            "/tickets/",
+            json={"site_id": site_id, "type": "misc", "status": "open", "customer_impact": "critical",
+                  "business_priority": "urgent", "sla_target_hours": None, "sla_breach_hours": None},
+            headers=auth_headers,
+        )
+        assert nulls.status_code == 200, nulls.text
+        assert (nulls.json()["sla_target_hours"], nulls.json()["sla_breach_hours"]) == (3, 7)
+    finally:
+        client.delete(f"/sla/{rule.json()['rule_id']}", headers=auth_headers)
+
+
+def test_imported_ticket_takes_rule_hours(auth_headers, ensure_test_site):
+    rule = client.post(
+        "/sla/",
+        json={"name": "Import Rule Pytest", "ticket_type": "misc", "sla_target_hours": 5, "sla_breach_hours": 9,
+              "is_active": True},
+        headers=auth_headers,
+    )
+    assert rule.status_code == 200, rule.text
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+        user_id = db.query(models.User.user_id).filter(models.User.email == "test-admin@example.com").scalar()
+        sla_engine.mark_stale()
+        notes = f"sla import {uuid.uuid4().hex[:8]}"
+        body = f"site_id,type,notes\n{site_id},misc,{notes}\n{site_id},onsite,{notes}\n".encode()
+        result = ticket_import.import_tickets(db, io.BytesIO(body), "csv", user_id)
+        assert result["inserted"] == 2, result
+        hours = dict(db.query(models.Ticket.type, models.Ticket.sla_target_hours)
+                     .filter(models.Ticket.notes == notes).all())
+        assert hours[models.TicketType.misc] == 5
+        assert hours[models.TicketType.onsite] is not None  # another rule's, or the column default
+    finally:
+        db.close()
+        client.delete(f"/sla/{rule.json()['rule_id']}", headers=auth_headers)
+
+
+def test_scan_escalates_overdue_ticket(auth_headers, ensure_test_site):
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+        resp = client.post(
+            "/tickets/",
+            json={"site_id": site_id, "type": "onsite", "status": "open",
+                  "sla_target_hours": 1, "sla_breach_hours": 2},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200, resp.text
+        ticket_id = resp.json()["ticket_id"]
+        db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).update(
+            {"created_at": datetime.utcnow() - timedelta(hours=90)}, synchronize_session=False)
+        db.commit()
+
+        messages = sla_engine.scan(db)
+        ticket = db.query(models.Ticket).filter(models.Ticket.ticket_id == ticket_id).one()
+        assert ticket.escalation_level >= 2 and ticket.escalation_notified is True
+        assert ticket.sla_escalate_at is None  # at its last level: no longer scanned
+        assert any(ticket_id in message for message in messages)
+        # Already at its level and notified: the next scan leaves it alone
+        assert all(ticket_id not in message for message in sla_engine.scan(db))
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+"""Ticket statistics: one GROUPING SETS query, cached per date range until the next ticket write."""
+import os
+import sys
+
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from starlette.testclient import TestClient
+from database import SessionLocal
+from main import app
+import models
+
+client = TestClient(app)
+
+DAY = "1991-03-01"  # no other test creates tickets on this date
+
+
+def _stats(auth_headers, record_statements):
+    with record_statements(r"\btickets\b") as statements:
+        resp = client.get("/stats/tickets", params={"start_date": DAY, "end_date": DAY}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json(), statements
+
+
+def test_ticket_statistics_single_query_and_invalidation(auth_headers, ensure_test_site, record_statements):
+    before, statements = _stats(auth_headers, record_statements)
+    assert len(statements) <= 1
+    assert set(before["status_counts"]) == {s.value for s in models.TicketStatus}
+    assert set(before["priority_counts"]) == {p.value for p in models.TicketPriority}
+
+    _, cached = _stats(auth_headers, record_statements)
+    assert cached == []
+
+    db = SessionLocal()
+    try:
+        site_id = db.query(models.Site.site_id).first()[0]
+    finally:
+        db.close()
+    resp = client.post(
+        "/tickets/",
+        json={"site_id": site_id, "type": "inhouse", "status": "open", "priority": "critical", "date_created": DAY},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+
+    after, statements = _stats(auth_headers, record_statements)
+    assert len(statements) == 1 and "GROUPING SETS" in statements[0]
+    assert after["total_tickets"] == before["total_tickets"] + 1
+    assert after["priority_counts"]["critical"] == before["priority_counts"]["critical"] + 1
+    assert after["by_assignee"]["unassigned"]["count"] >= 1
+    assert any(
+        row["status"] == "open" and row["priority"] == "critical" and row["type"] == "inhouse"
+        for row in after["breakdown"]
+    )
+
+
+def test_ticket_statistics_rejects_inverted_range(auth_headers):
+    resp = client.get("/stats/tickets", params={"start_date": "2026-02-02", "end_date": "2026-02-01"}, headers=auth_headers)
+    assert resp.status_code == 400
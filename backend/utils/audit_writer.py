@@ -0,0 +1,361 @@
+"""
+Batched audit log writer (ticket_audits).
+
+Request handlers queue audit entries instead of inserting and committing each one.
+A per-worker thread writes the queue every AUDIT_FLUSH_INTERVAL_MS, or sooner once
+AUDIT_FLUSH_ROWS entries are waiting, as one multi-row INSERT ... ON CONFLICT DO NOTHING.
+
+Delivery is at least once. Each entry is appended and fsynced to a spool segment
+(AUDIT_SPOOL_DIR/audit-<pid>-<boot>-<n>.jsonl, boot being random per process) before
+it is queued, and a segment is deleted only after its entries are committed. While a
+writer runs it holds an flock on owner-<pid>-<boot>.lock; segments whose owner lock is
+free belong to a worker that died and are replayed by the next writer that starts, even
+if a live process has since been given the same pid. audit_id is the conflict key, so a
+replayed entry that was already written is skipped.
+
+When a flush fails, each pending segment is retried on its own so one bad segment does
+not hold back the rest, with the flush interval doubling (up to MAX_RETRY_SECONDS)
+while failures continue. A segment that fails AUDIT_MAX_FLUSH_ATTEMPTS flushes is
+renamed to dead-audit-....jsonl, which is not replayed, and its entries counted as
+dead_lettered.
+
+AUDIT_WRITE_MODE=sync writes each entry immediately in its own transaction (tests,
+scripts).
+"""
+
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+
+import models
+from database import engine
+from settings import settings
+
+logger = logging.getLogger("ticketing")
+
+MAX_RETRY_SECONDS = 30.0
+
+COLUMNS = ("audit_id", "ticket_id", "user_id", "change_time", "field_changed", "old_value", "new_value")
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return str(getattr(value, "value", value))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True  # exists, owned by another user
+    except (OSError, OverflowError):
+        return False
+    return True
+
+
+class AuditWriter:
+    """Per-worker audit queue with a spool and a background flush thread."""
+
+    def __init__(self, mode: str = "async", interval_ms: int = 200, max_rows: int = 500, spool_dir: str = "",
+                 max_attempts: int = 10):
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.max_rows = max_rows
+        self.spool_dir = spool_dir
+        self.max_attempts = max(1, max_attempts)
+        self._buffer: List[dict] = []
+        self._pending: List[list] = []  # [spool segment, entries, failed flushes] not yet committed
+        self._retries = 0  # consecutive failed flushes
+        self._spool = None
+        self._spool_path: Optional[str] = None
+        self._segment = 0
+        self._owner = None
+        self._owner_pid: Optional[int] = None
+        self._boot: Optional[str] = None
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._registered = False
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.replayed = 0
+        self.last_flush_ms = 0.0
+
+    def write(self, ticket_id: Optional[str], user_id: Optional[str], field_changed: str,
+              old_value=None, new_value=None, change_time: Optional[datetime] = None) -> dict:
+        """Queue one audit entry; returns the row as it will be written."""
+        entry = {
+            "audit_id": str(uuid.uuid4()),
+            "ticket_id": ticket_id,
+            "user_id": user_id,
+            "change_time": change_time or datetime.now(timezone.utc),
+            "field_changed": field_changed,
+            "old_value": _text(old_value),
+            "new_value": _text(new_value),
+        }
+        if self.mode == "sync":
+            self._insert([entry])
+            self.written += 1
+            return entry
+        self._start()
+        with self._cond:
+            self._append_spool(entry)
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.max_rows:
+                self._cond.notify()
+        return entry
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of entries committed."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._buffer = self._buffer, []
+                segment = self._close_spool()
+            if batch or segment:
+                self._pending.append([segment, batch, 0])
+            entries = [entry for _, batch, _ in self._pending for entry in batch]
+            if not entries:
+                self._remove_segments(self._pending)
+                self._pending = []
+                return 0
+            started = time.perf_counter()
+            try:
+                self._insert(entries)
+            except Exception as e:
+                self.failures += 1
+                self._retries += 1
+                logger.warning(f"Audit flush of {len(entries)} entries failed, will retry: {e}")
+                return self._retry_segments(e)
+            self._remove_segments(self._pending)
+            self._pending = []
+            self._retries = 0
+            self.written += len(entries)
+            self.batches += 1
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            return len(entries)
+
+    def close(self):
+        """Stop the flush thread and write what is left (lifespan shutdown, atexit)."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        self._stopping = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "queued": len(self._buffer),
+            "pending": sum(len(batch) for _, batch, _ in self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+            "replayed": self.replayed,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    # -- internals ---------------------------------------------------------
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._flush_lock:
+            if self._thread is not None:
+                return
+            if self.spool_dir:
+                self._own_spool()
+            self._replay()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            if not self._registered:
+                atexit.register(self.close)
+                self._registered = True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._buffer) < self.max_rows:
+                    self._cond.wait(min(self.interval * 2 ** self._retries, MAX_RETRY_SECONDS)
+                                    if self._retries else self.interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def _insert(self, entries: List[dict]):
+        table = models.TicketAudit.__table__
+        stmt = pg_insert(table).on_conflict_do_nothing(index_elements=["audit_id"])
+        try:
+            with engine.begin() as conn:
+                for i in range(0, len(entries), self.max_rows):
+                    conn.execute(stmt.values(entries[i:i + self.max_rows]))
+        except IntegrityError:
+            # An entry references a ticket or user deleted before the flush; keep the rest
+            with engine.begin() as conn:
+                for entry in entries:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(stmt.values([entry]))
+                    except IntegrityError as e:
+                        self.dropped += 1
+                        logger.warning(f"Dropping audit entry {entry['audit_id']} ({entry['field_changed']}): {e.orig}")
+
+    def _retry_segments(self, error: Exception) -> int:
+        """After a failed flush, write each pending segment in its own transaction; returns the
+        entries committed. Segments that fail max_attempts flushes are dead-lettered."""
+        written, kept = 0, []
+        for segment, entries, attempts in self._pending:
+            if len(self._pending) > 1:
+                try:
+                    self._insert(entries)
+                except Exception as e:
+                    error = e
+                else:
+                    self._remove_segments([(segment, entries, attempts)])
+                    written += len(entries)
+                    continue
+            attempts += 1
+            if attempts < self.max_attempts:
+                kept.append([segment, entries, attempts])
+            else:
+                self._dead_letter(segment, entries, error)
+        self._pending = kept
+        if written:
+            self.written += written
+            self.batches += 1
+        return written
+
+    def _dead_letter(self, segment: Optional[str], entries: List[dict], error: Exception):
+        self.dead_lettered += len(entries)
+        dead = None
+        if segment:
+            dead = os.path.join(os.path.dirname(segment), "dead-" + os.path.basename(segment))
+            try:
+                os.replace(segment, dead)
+            except FileNotFoundError:
+                dead = None
+        logger.error(f"Audit entries failed {self.max_attempts} flushes; {len(entries)} moved to "
+                     f"{dead or 'nowhere (no spool segment)'}: {error}")
+
+    def _own_spool(self):
+        """Pick this process's boot id and hold its owner lock (again after a fork)."""
+        if self._owner_pid == os.getpid():
+            return
+        if self._owner is not None:
+            self._owner.close()  # the parent's lock, inherited across fork
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._owner_pid, self._boot, self._segment = os.getpid(), uuid.uuid4().hex[:8], 0
+        path = os.path.join(self.spool_dir, f"owner-{self._owner_pid}-{self._boot}.lock")
+        # Lock under a temporary name so _replay never sees the file unlocked
+        self._owner = open(path + ".tmp", "w")
+        fcntl.flock(self._owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.replace(path + ".tmp", path)
+
+    def _append_spool(self, entry: dict):
+        if not self.spool_dir:
+            return
+        if self._spool is None:
+            self._own_spool()
+            self._segment += 1
+            self._spool_path = os.path.join(self.spool_dir,
+                                            f"audit-{self._owner_pid}-{self._boot}-{self._segment}.jsonl")
+            self._spool = open(self._spool_path, "a", encoding="utf-8")
+        self._spool.write(json.dumps({**entry, "change_time": entry["change_time"].isoformat()}) + "\n")
+        self._spool.flush()
+        os.fsync(self._spool.fileno())
+
+    def _close_spool(self) -> Optional[str]:
+        if self._spool is None:
+            return None
+        self._spool.close()
+        path, self._spool, self._spool_path = self._spool_path, None, None
+        return path
+
+    @staticmethod
+    def _remove_segments(pending):
+        for segment, _, _ in pending:
+            if segment:
+                try:
+                    os.remove(segment)
+                except FileNotFoundError:
+                    pass
+
+    def _live_owners(self) -> set:
+        """(pid, boot) of the writers still running; lock files of dead ones are removed."""
+        live = set()
+        for path in glob.glob(os.path.join(self.spool_dir, "owner-*-*.lock")):
+            try:
+                _, pid, boot = os.path.basename(path)[:-len(".lock")].split("-")
+                owner = (int(pid), boot)
+            except ValueError:
+                continue
+            if owner == (self._owner_pid, self._boot):
+                live.add(owner)
+                continue
+            try:
+                with open(path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.remove(path)
+            except BlockingIOError:
+                live.add(owner)
+            except FileNotFoundError:
+                pass
+        return live
+
+    def _replay(self):
+        """Queue spool segments left behind by workers that are no longer running."""
+        if not self.spool_dir:
+            return
+        live = self._live_owners()
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "audit-*-*.jsonl"))):
+            parts = os.path.basename(path)[:-len(".jsonl")].split("-")
+            try:
+                pid = int(parts[1])
+            except (IndexError, ValueError):
+                continue
+            if len(parts) == 4:
+                if (pid, parts[2]) in live:
+                    continue
+            elif pid == os.getpid() or _pid_alive(pid):  # audit-<pid>-<n>.jsonl from before boot ids
+                continue
+            entries = []
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash mid-write
+                    entry["change_time"] = datetime.fromisoformat(entry["change_time"])
+                    entries.append({c: entry.get(c) for c in COLUMNS})
+            self._pending.append([path, entries, 0])
+            self.replayed += len(entries)
+            logger.info(f"Replaying {len(entries)} audit entries from {path}")
+
+
+audit_writer = AuditWriter(
+    mode=settings.AUDIT_WRITE_MODE,
+    interval_ms=settings.AUDIT_FLUSH_INTERVAL_MS,
+    max_rows=settings.AUDIT_FLUSH_ROWS,
+    spool_dir=settings.AUDIT_SPOOL_DIR,
+    max_attempts=settings.AUDIT_MAX_FLUSH_ATTEMPTS,
+)
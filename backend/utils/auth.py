@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 import models
 import crud
 from database import get_db
+from utils.request_timing import timed_phase
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -33,36 +34,37 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get current user from JWT token"""
-    if not token:
-        logger.warning("get_current_user: no token provided")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
+    """Get current user from JWT token (JWT decode + user load timed as the "auth" phase)"""
+    with timed_phase("auth"):
+        if not token:
+            logger.warning("get_current_user: no token provided")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated"
+            )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        sub = payload.get("sub")
-        if sub is None:
-            logger.warning("get_current_user: token missing sub")
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            sub = payload.get("sub")
+            if sub is None:
+                logger.warning("get_current_user: token missing sub")
+                raise HTTPException(status_code=401, detail="Invalid token")
+            user_id = str(sub)  # Ensure string (JWT may return int in some edge cases)
+        except jwt.ExpiredSignatureError:
+            logger.info("get_current_user: token expired")
+            raise HTTPException(status_code=401, detail="Token expired")
+        except jwt.InvalidTokenError as e:
+            logger.warning("get_current_user: invalid token: %s", e)
             raise HTTPException(status_code=401, detail="Invalid token")
-        user_id = str(sub)  # Ensure string (JWT may return int in some edge cases)
-    except jwt.ExpiredSignatureError:
-        logger.info("get_current_user: token expired")
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError as e:
-        logger.warning("get_current_user: invalid token: %s", e)
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except Exception as e:
-        logger.exception("get_current_user: error %s", e)
-        raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
+        except Exception as e:
+            logger.exception("get_current_user: error %s", e)
+            raise HTTPException(status_code=401, detail=f"Authentication error: {str(e)}")
     
-    user = crud.get_user(db, user_id=user_id)
-    if user is None:
-        logger.warning("get_current_user: user not found for user_id=%s", user_id)
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+        user = crud.get_user(db, user_id=user_id)
+        if user is None:
+            logger.warning("get_current_user: user not found for user_id=%s", user_id)
+            raise HTTPException(status_code=401, detail="User not found")
+        return user
 
 def require_role(allowed_roles: list):
     """Dependency to require specific roles"""
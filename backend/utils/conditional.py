@@ -0,0 +1,46 @@
+"""
+Conditional GET helpers: weak ETags and If-None-Match handling.
+
+Routes compute an ETag from a cheap watermark query (row count, max timestamp,
+request parameters) and return 304 before running the full query or serializing.
+Responses are marked private and must be revalidated, so the browser cache replays
+the last body whenever the server answers 304.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """W/"<hash>" over the repr of parts (timestamps, counts, filter values)."""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against etag (RFC 9110 13.1.2)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def set_validators(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+    return response
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds etag, else None."""
+    if etag_matches(request, etag):
+        return set_validators(Response(status_code=304), etag)
+    return None
@@ -0,0 +1,157 @@
+"""
+Count cache keyed by table generation and a normalized filter hash.
+
+List screens ask for filtered counts on every refresh. Results are stored in Redis
+(shared by all workers) under `countcache:<table>:<generation>:<filter hash>`, with an
+in-process dict as the fallback when Redis is unreachable. Writes bump the table's
+generation counter (see utils.main_utils._enqueue_broadcast), so existing entries
+are never read again and simply expire. COUNT_CACHE_TTL_SECONDS bounds staleness for
+writes that do not broadcast, and for other workers when running on the fallback.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+from settings import settings
+
+logger = logging.getLogger("ticketing")
+
+# Broadcast message type -> cached tables whose counts it can change
+BROADCAST_TABLES: Dict[str, tuple] = {
+    "ticket": ("tickets", "ticket_stats"),
+    "site": ("sites",),
+    "shipment": ("shipments",),
+}
+
+# Seconds to wait before retrying Redis after a connection failure
+REDIS_RETRY_SECONDS = 30.0
+
+
+def filter_key(filters: Dict[str, Any]) -> str:
+    """Stable hash of a filter dict; None/empty values and surrounding whitespace are ignored."""
+    normalized = {}
+    for name, value in filters.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        normalized[name] = value
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=10).hexdigest()
+
+
+class CountCache:
+    """Generation-versioned cache for count-style queries, shared by the worker process."""
+
+    def __init__(self, redis_url: str = "", ttl: float = 30.0, enabled: bool = True):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.enabled = enabled
+        self._redis = None
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+        self._local: Dict[str, tuple] = {}  # key -> (expires_at, value)
+        self._local_gen: Dict[str, int] = defaultdict(int)
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "errors": 0})
+
+    def _client(self):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(
+                self.redis_url, decode_responses=True, socket_timeout=0.2, socket_connect_timeout=0.2
+            )
+        return self._redis
+
+    def _redis_failed(self, table: str, exc: Exception):
+        logger.warning(f"Count cache falling back to process memory: {exc}")
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        with self._lock:
+            self._stats[table]["errors"] += 1
+
+    def get_or_compute(self, table: str, filters: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Cached result of compute() for (table, filters). Values must be JSON-serializable."""
+        if not self.enabled:
+            return compute()
+        fkey = filter_key(filters)
+        client = self._client()
+        if client is not None:
+            # Only Redis calls go inside the try: a compute() error is the caller's, not an outage
+            try:
+                gen = client.get(f"countcache:gen:{table}") or "0"
+                key = f"countcache:{table}:{gen}:{fkey}"
+                raw = client.get(key)
+            except Exception as exc:  # redis.RedisError, OSError
+                self._redis_failed(table, exc)
+            else:
+                if raw is not None:
+                    self._record(table, hit=True)
+                    return json.loads(raw)
+                value = compute()
+                self._record(table, hit=False)
+                try:
+                    client.set(key, json.dumps(value), ex=max(1, int(self.ttl)))
+                except Exception as exc:  # redis.RedisError, OSError
+                    self._redis_failed(table, exc)
+                return value
+
+        now = time.monotonic()
+        with self._lock:
+            key = f"{table}:{self._local_gen[table]}:{fkey}"
+            entry = self._local.get(key)
+        if entry is not None and entry[0] > now:
+            self._record(table, hit=True)
+            return entry[1]
+        value = compute()
+        with self._lock:
+            if len(self._local) > 10_000:
+                self._local = {k: v for k, v in self._local.items() if v[0] > now}
+            self._local[key] = (now + self.ttl, value)
+        self._record(table, hit=False)
+        return value
+
+    def bump(self, table: str):
+        """Invalidate every cached entry for table (call after a committed write)."""
+        with self._lock:
+            self._local_gen[table] += 1
+        client = self._client()
+        if client is not None:
+            try:
+                client.incr(f"countcache:gen:{table}")
+            except Exception as exc:
+                self._redis_failed(table, exc)
+
+    def bump_for_broadcast(self, message: str):
+        """Bump the tables affected by a WebSocket broadcast message ({"type": ...})."""
+        try:
+            kind = json.loads(message).get("type")
+        except (ValueError, AttributeError):
+            return
+        for table in BROADCAST_TABLES.get(kind, ()):
+            self.bump(table)
+
+    def _record(self, table: str, hit: bool):
+        with self._lock:
+            self._stats[table]["hits" if hit else "misses"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tables = {}
+            for table, s in self._stats.items():
+                lookups = s["hits"] + s["misses"]
+                tables[table] = {**s, "hit_ratio": round(s["hits"] / lookups, 3) if lookups else None}
+        backend = "redis" if self._client() is not None else "memory"
+        return {"backend": backend, "ttl_seconds": self.ttl, "enabled": self.enabled, "tables": tables}
+
+
+count_cache = CountCache(
+    redis_url=settings.REDIS_URL,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+    enabled=settings.COUNT_CACHE_ENABLED,
+)
@@ -0,0 +1,259 @@
+"""
+Per-worker snapshots of the daily operations board (GET /tickets/daily/{date}?summary=true).
+
+Dispatchers keep the board open all day and every change broadcast makes each client
+re-request it. Instead of re-running the bucket queries, each worker keeps the board
+for its DAILY_BOARD_MAX_DATES most recent dates: the summary rows of every ticket on
+it, sorted into the scheduled / unscheduled / overdue buckets, so a read is a slice.
+
+Ticket, comment, time entry and task broadcasts carry the ticket_ids they touched.
+They arrive from this worker (utils.main_utils._enqueue_broadcast) and from other
+workers (Redis websocket_updates, see main.lifespan). Those ids are marked dirty. The
+next read fetches just those rows in one query and moves each one into, out of, or
+between buckets on every cached date. Messages without ticket_ids, and site, user and
+tech changes (their names are on the rows), drop the snapshots so they are rebuilt on
+the next read.
+
+Every DAILY_BOARD_VERIFY_SECONDS a read also compares the board with a fresh query.
+Any difference, e.g. a write that never broadcast, is logged and the board replaced.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+import crud
+from settings import settings
+
+logger = logging.getLogger("ticketing")
+
+# Broadcast types whose messages name the tickets they changed ({"ticket_ids": [...]})
+TICKET_TYPES = ("ticket", "comment", "time_entry", "task")
+# Broadcast types that change joined display columns on any number of rows
+REBUILD_TYPES = ("site", "user", "field_tech")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _value(v):
+    return getattr(v, "value", v)
+
+
+def bucket_of(row: dict, day: date) -> Optional[str]:
+    """Which bucket of day's board a summary row belongs in; mirrors crud._daily_buckets."""
+    scheduled, created = row["date_scheduled"], row["date_created"]
+    if scheduled is not None:
+        if scheduled == day:
+            return "scheduled"
+        past = scheduled < day
+    else:
+        if created == day:
+            return "unscheduled"
+        past = created is not None and created < day
+    status = _value(row["status"])
+    if past and status is not None and status not in crud.DAILY_DONE_STATUSES:
+        return "overdue"
+    return None
+
+
+def order_key(row: dict) -> tuple:
+    """Sort key matching crud.DAILY_ORDER (date_scheduled NULLS FIRST, created_at DESC, ticket_id)."""
+    scheduled, created = row["date_scheduled"], row["created_at"]
+    if created is not None:
+        created = -((created.replace(tzinfo=None) - _EPOCH) // _MICROSECOND)
+    return (scheduled is not None, scheduled or date.min, created is not None, created or 0, row["ticket_id"])
+
+
+class _Board:
+    """One date's buckets: (sort key, ticket_id) lists plus the rows they point at."""
+
+    __slots__ = ("day", "rows", "buckets", "placed", "built_at", "verified_at")
+
+    def __init__(self, day: date, rows: Iterable[dict]):
+        self.day = day
+        self.rows: Dict[str, dict] = {}
+        self.buckets: Dict[str, List[Tuple[tuple, str]]] = {name: [] for name in crud.DAILY_BUCKETS}
+        self.placed: Dict[str, Tuple[str, tuple]] = {}  # ticket_id -> (bucket, sort key)
+        for row in rows:
+            bucket = bucket_of(row, day)
+            if bucket is not None:
+                key = order_key(row)
+                self.rows[row["ticket_id"]] = row
+                self.buckets[bucket].append((key, row["ticket_id"]))
+                self.placed[row["ticket_id"]] = (bucket, key)
+        for entries in self.buckets.values():
+            entries.sort()
+        self.built_at = time.time()
+        self.verified_at = time.monotonic()
+
+    def place(self, ticket_id: str, row: Optional[dict]) -> bool:
+        """Put a ticket's current row (None: deleted) where it belongs; True if its bucket changed."""
+        before = self.placed.pop(ticket_id, None)
+        if before is not None:
+            entries = self.buckets[before[0]]
+            del entries[bisect_left(entries, (before[1], ticket_id))]
+            del self.rows[ticket_id]
+        bucket = bucket_of(row, self.day) if row is not None else None
+        if bucket is not None:
+            key = order_key(row)
+            insort(self.buckets[bucket], (key, ticket_id))
+            self.placed[ticket_id] = (bucket, key)
+            self.rows[ticket_id] = row
+        return (before[0] if before else None) != bucket
+
+    def page(self, bucket: str, skip: int, limit: int) -> dict:
+        entries = self.buckets[bucket]
+        # Copies: callers adjust timestamps on the rows they serialize
+        items = [dict(self.rows[ticket_id]) for _, ticket_id in entries[skip:skip + limit]]
+        return {"items": items, "total": len(entries), "skip": skip, "limit": limit}
+
+    def diff(self, other: "_Board") -> Dict[str, int]:
+        """Counts of tickets only here, only there, in another bucket, or with different values."""
+        mine, theirs = set(self.placed), set(other.placed)
+        both = mine & theirs
+        return {
+            "missing": len(theirs - mine),
+            "extra": len(mine - theirs),
+            "moved": sum(1 for t in both if self.placed[t][0] != other.placed[t][0]),
+            "changed": sum(1 for t in both if self.rows[t] != other.rows[t]),
+        }
+
+
+class DailyBoards:
+    """The worker's daily board snapshots, most recently read date last."""
+
+    def __init__(self, max_dates: int = 7, verify_seconds: float = 300.0, enabled: bool = True):
+        self.max_dates = max_dates
+        self.verify_seconds = verify_seconds
+        self.enabled = enabled
+        self._boards: "OrderedDict[date, _Board]" = OrderedDict()
+        self._dirty: set = set()
+        self._stale = False
+        self._lock = threading.Lock()  # guards _dirty and _stale
+        self._board_lock = threading.Lock()  # serializes reads and updates of _boards
+        self.reads = 0
+        self.rebuilds = 0
+        self.moves = 0
+        self.updates = 0
+        self.repairs = 0
+        self.last_build_ms = 0.0
+
+    def apply_broadcast(self, message: str):
+        """Note the tickets a WebSocket broadcast message ({"type": ..., "ticket_ids": [...]}) changed."""
+        if not self.enabled:
+            return
+        try:
+            data = json.loads(message)
+            kind = data.get("type")
+        except (ValueError, TypeError, AttributeError):
+            return
+        if kind in REBUILD_TYPES:
+            self.mark_stale()
+        elif kind in TICKET_TYPES:
+            ids = data.get("ticket_ids")
+            if not isinstance(ids, list):
+                self.mark_stale()
+                return
+            with self._lock:
+                self._dirty.update(str(i) for i in ids if i)
+
+    def mark_stale(self):
+        with self._lock:
+            self._stale = True
+
+    def pages(self, db: Session, day: date, buckets: Sequence[str], skip: int = 0, limit: int = 100) -> Dict[str, dict]:
+        """{bucket: page} for day, in the shape of crud.get_daily_bucket_rows."""
+        with self._board_lock:
+            self.reads += 1
+            board = self._current(db, day)
+            return {name: board.page(name, skip, limit) for name in buckets}
+
+    def verify(self, db: Session, day: date) -> Dict[str, int]:
+        """Compare day's board with the database and replace it if they differ."""
+        with self._board_lock:
+            return self._verify(db, self._current(db, day, verify=False))
+
+    def _current(self, db: Session, day: date, verify: bool = True) -> _Board:
+        self._apply_pending(db)
+        board = self._boards.get(day)
+        if board is None:
+            board = self._build(db, day)
+        elif verify and time.monotonic() - board.verified_at >= self.verify_seconds:
+            self._verify(db, board)
+            board = self._boards[day]
+        self._boards.move_to_end(day)
+        while len(self._boards) > self.max_dates:
+            self._boards.popitem(last=False)
+        return board
+
+    def _apply_pending(self, db: Session):
+        with self._lock:
+            stale, self._stale = self._stale, False
+            dirty, self._dirty = self._dirty, set()
+        if stale:
+            self._boards.clear()
+            return
+        if not dirty or not self._boards:
+            return
+        try:
+            rows = {row["ticket_id"]: row for row in crud.get_daily_board_rows(db, ticket_ids=dirty)}
+        except Exception:
+            self.mark_stale()  # the dirty ids are lost; rebuild rather than serve them stale
+            raise
+        for board in self._boards.values():
+            for ticket_id in dirty:
+                self.moves += board.place(ticket_id, rows.get(ticket_id))
+        self.updates += 1
+
+    def _build(self, db: Session, day: date) -> _Board:
+        started = time.perf_counter()
+        board = _Board(day, crud.get_daily_board_rows(db, day=day))
+        self._boards[day] = board
+        self.rebuilds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 2)
+        return board
+
+    def _verify(self, db: Session, board: _Board) -> Dict[str, int]:
+        fresh = self._build(db, board.day)
+        diff = board.diff(fresh)
+        if any(diff.values()):
+            self.repairs += 1
+            logger.warning(f"Daily board {board.day} missed changes, rebuilt: {diff}")
+        return diff
+
+    def stats(self) -> Dict[str, Any]:
+        boards = {
+            day.isoformat(): {
+                **{name: len(entries) for name, entries in board.buckets.items()},
+                "built_at": board.built_at,
+            }
+            for day, board in list(self._boards.items())
+        }
+        return {
+            "enabled": self.enabled,
+            "max_dates": self.max_dates,
+            "verify_seconds": self.verify_seconds,
+            "dirty": len(self._dirty),
+            "reads": self.reads,
+            "rebuilds": self.rebuilds,
+            "updates": self.updates,
+            "moves": self.moves,
+            "repairs": self.repairs,
+            "last_build_ms": self.last_build_ms,
+            "boards": boards,
+        }
+
+
+daily_board = DailyBoards(
+    max_dates=settings.DAILY_BOARD_MAX_DATES,
+    verify_seconds=settings.DAILY_BOARD_VERIFY_SECONDS,
+    enabled=settings.DAILY_BOARD_ENABLED,
+)
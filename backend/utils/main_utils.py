@@ -18,6 +18,11 @@ import models
 import schemas
 import crud
 from database import get_db
+from utils.count_cache import count_cache
+from utils.prefix_index import typeahead
+from utils.daily_board import daily_board
+from utils.sla_engine import sla_engine
+from utils.audit_writer import audit_writer
 
 def generate_temp_password(length: int = 12) -> str:
     """Generate a temporary password"""
@@ -76,19 +81,17 @@ def _as_role(role_str: str) -> models.UserRole:
 from utils.auth import get_current_user, require_role
 
 def audit_log(db: Session, user_id: str, field: str, old_value: str, new_value: str, ticket_id: str = None):
-    """Create an audit log entry"""
-    audit = schemas.TicketAuditCreate(
-        ticket_id=ticket_id,
-        user_id=user_id,
-        change_time=datetime.now(timezone.utc),
-        field_changed=field,
-        old_value=old_value,
-        new_value=new_value
-    )
-    crud.create_ticket_audit(db, audit)
+    """Queue an audit log entry (written in batches, see utils/audit_writer.py)"""
+    audit_writer.write(ticket_id=ticket_id, user_id=user_id, field_changed=field, old_value=old_value, new_value=new_value)
 
 def _enqueue_broadcast(background_tasks, message: str):
     """Enqueue a WebSocket broadcast message"""
+    # Every write path broadcasts after committing; invalidate cached counts and typeahead indexes,
+    # mark the changed tickets on the daily boards and reload SLA rules here too
+    count_cache.bump_for_broadcast(message)
+    typeahead.mark_stale_for_broadcast(message)
+    daily_board.apply_broadcast(message)
+    sla_engine.apply_broadcast(message)
     # Defer import to avoid circular dependency; delegate to app-level helper
     try:
         from main import _enqueue_broadcast as app_enqueue_broadcast  # type: ignore
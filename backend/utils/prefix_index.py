@@ -0,0 +1,214 @@
+"""
+In-process prefix indexes for typeahead lookups (site ids, techs, companies, SKUs).
+
+Each worker keeps one sorted array of (lowercased key, id) per entity plus a compact
+record per id, so a prefix lookup is a bisect and a short scan with no DB round trip.
+Indexes are built at startup (or on first use). They are marked stale by change
+broadcasts, both this worker's (utils.main_utils._enqueue_broadcast) and other
+workers' (Redis websocket_updates, see main.lifespan), and rebuilt on the next
+lookup. Every TYPEAHEAD_VERIFY_SECONDS a lookup also compares a cheap DB fingerprint
+(row count, newest row version) so writes that never broadcast are picked up too.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+import models
+from settings import settings
+
+logger = logging.getLogger("ticketing")
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    model: type
+    key: str
+    prefix_fields: Tuple[str, ...]  # lookup keys (case-insensitive)
+    fields: Tuple[str, ...]  # returned record
+    broadcast_types: Tuple[str, ...]
+
+
+SPECS: Tuple[IndexSpec, ...] = (
+    IndexSpec("sites", models.Site, "site_id", ("site_id",),
+              ("site_id", "location", "brand", "city", "state"), ("site",)),
+    IndexSpec("field_techs", models.FieldTech, "field_tech_id", ("name", "tech_number"),
+              ("field_tech_id", "name", "tech_number", "company_id", "region"), ("field_tech",)),
+    IndexSpec("field_tech_companies", models.FieldTechCompany, "company_id", ("company_name", "company_number"),
+              ("company_id", "company_name", "company_number", "city", "state"), ("field_tech_company",)),
+    IndexSpec("inventory", models.InventoryItem, "item_id", ("sku", "barcode"),
+              ("item_id", "name", "sku", "barcode", "quantity_on_hand"), ("inventory",)),
+)
+
+
+class _Snapshot:
+    """Immutable build result; lookups read one snapshot without locking."""
+
+    __slots__ = ("keys", "ids", "records", "fingerprint", "built_at")
+
+    def __init__(self, keys: List[str], ids: List[str], records: Dict[str, tuple], fingerprint: tuple):
+        self.keys = keys
+        self.ids = ids
+        self.records = records
+        self.fingerprint = fingerprint
+        self.built_at = time.time()
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over one table."""
+
+    def __init__(self, spec: IndexSpec, verify_seconds: float = 60.0):
+        self.spec = spec
+        self.verify_seconds = verify_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._stale = True
+        self._verified_at = 0.0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.lookups = 0
+        self.last_build_ms = 0.0
+
+    def fingerprint(self, db: Session) -> tuple:
+        """(row count, newest row version). xmin changes on every INSERT/UPDATE of a row."""
+        table = self.spec.model.__table__
+        row = db.execute(select(
+            func.count(), func.max(literal_column("xmin::text::bigint")),
+        ).select_from(table)).one()
+        return tuple(row)
+
+    def rebuild(self, db: Session):
+        spec = self.spec
+        started = time.perf_counter()
+        fingerprint = self.fingerprint(db)
+        columns = [getattr(spec.model, f) for f in dict.fromkeys((spec.key, *spec.prefix_fields, *spec.fields))]
+        entries: List[Tuple[str, str]] = []
+        records: Dict[str, tuple] = {}
+        for row in db.execute(select(*columns)):
+            entity_id = str(getattr(row, spec.key))
+            records[entity_id] = tuple(getattr(row, f) for f in spec.fields)
+            for field in spec.prefix_fields:
+                value = getattr(row, field)
+                if value:
+                    entries.append((str(value).lower(), entity_id))
+        entries.sort()
+        self._snapshot = _Snapshot([k for k, _ in entries], [i for _, i in entries], records, fingerprint)
+        self._verified_at = time.monotonic()
+        self.rebuilds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def refresh(self, db: Session, if_stale: bool = False):
+        """Clear the stale flag and rebuild; a broadcast arriving mid-build marks it stale again."""
+        with self._lock:
+            if if_stale and not self._stale and self._snapshot is not None:
+                return  # another request rebuilt it while this one waited
+            self._stale = False
+            try:
+                self.rebuild(db)
+            except Exception:
+                self._stale = True
+                raise
+
+    def ensure_fresh(self, db: Session):
+        """Rebuild if never built, marked stale, or the DB fingerprint moved since the last check."""
+        due = time.monotonic() - self._verified_at >= self.verify_seconds
+        if not (self._stale or self._snapshot is None or due):
+            return
+        if self._stale or self._snapshot is None:
+            self.refresh(db, if_stale=True)
+        elif self.fingerprint(db) != self._snapshot.fingerprint:
+            logger.info(f"Prefix index {self.spec.name} missed a change; rebuilding")
+            self.refresh(db)
+        else:
+            self._verified_at = time.monotonic()
+
+    def mark_stale(self):
+        self._stale = True
+
+    def lookup(self, prefix: str, limit: int = 50) -> List[Dict[str, Any]]:
+        snapshot = self._snapshot
+        if snapshot is None or limit <= 0:
+            return []
+        self.lookups += 1
+        prefix = prefix.strip().lower()
+        keys, ids = snapshot.keys, snapshot.ids
+        found: Dict[str, None] = {}
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(found) < limit:
+            found.setdefault(ids[i])
+            i += 1
+        fields = self.spec.fields
+        return [dict(zip(fields, snapshot.records[entity_id])) for entity_id in found]
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: the arrays, key strings and record tuples (ids are shared)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return 0
+        size = sys.getsizeof(snapshot.keys) + sys.getsizeof(snapshot.ids) + sys.getsizeof(snapshot.records)
+        size += sum(sys.getsizeof(k) for k in snapshot.keys)
+        for entity_id, record in snapshot.records.items():
+            size += sys.getsizeof(entity_id) + sys.getsizeof(record)
+            size += sum(sys.getsizeof(v) for v in record if isinstance(v, str))
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "entries": len(snapshot.keys) if snapshot else 0,
+            "records": len(snapshot.records) if snapshot else 0,
+            "memory_bytes": self.memory_bytes(),
+            "built_at": snapshot.built_at if snapshot else None,
+            "stale": self._stale,
+            "rebuilds": self.rebuilds,
+            "last_build_ms": self.last_build_ms,
+            "lookups": self.lookups,
+        }
+
+
+class TypeaheadIndexes:
+    """The worker's prefix indexes, keyed by SPECS name."""
+
+    def __init__(self, specs: Sequence[IndexSpec], verify_seconds: float = 60.0):
+        self.indexes = {spec.name: PrefixIndex(spec, verify_seconds) for spec in specs}
+        self._by_broadcast: Dict[str, List[PrefixIndex]] = {}
+        for index in self.indexes.values():
+            for kind in index.spec.broadcast_types:
+                self._by_broadcast.setdefault(kind, []).append(index)
+
+    def lookup(self, db: Session, name: str, prefix: str, limit: int = 50) -> List[Dict[str, Any]]:
+        index = self.indexes[name]
+        index.ensure_fresh(db)
+        return index.lookup(prefix, limit)
+
+    def build_all(self, db: Session):
+        for index in self.indexes.values():
+            index.refresh(db)
+
+    def mark_stale_for_broadcast(self, message: str):
+        """Mark the indexes affected by a WebSocket broadcast message ({"type": ...}) stale."""
+        try:
+            kind = json.loads(message).get("type")
+        except (ValueError, AttributeError):
+            return
+        for index in self._by_broadcast.get(kind, ()):
+            index.mark_stale()
+
+    def stats(self) -> Dict[str, Any]:
+        indexes = {name: index.stats() for name, index in self.indexes.items()}
+        return {
+            "verify_seconds": next(iter(self.indexes.values())).verify_seconds,
+            "memory_bytes": sum(s["memory_bytes"] for s in indexes.values()),
+            "indexes": indexes,
+        }
+
+
+typeahead = TypeaheadIndexes(SPECS, verify_seconds=settings.TYPEAHEAD_VERIFY_SECONDS)
@@ -0,0 +1,254 @@
+"""
+Per-request phase timing exposed through the Server-Timing response header.
+
+The latency middleware opens a RequestTimings accumulator for each request and
+stores it in a context variable. Auth, SQL and serialization code add their
+elapsed time to it; whatever is left of the total is reported as "app".
+The same hooks also record lightweight spans that utils.tracing keeps as
+per-route trace exemplars.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+
+def _now_ms() -> float:
+    return time.perf_counter() * 1000.0
+
+
+class RequestTimings:
+    """Mutable accumulator shared by everything that runs for one request.
+
+    The object itself is stored in the context variable and mutated in place, so
+    updates made from threadpool workers (sync routes and dependencies run in a
+    copied context) are visible to the middleware.
+    """
+
+    __slots__ = (
+        "started_ms", "db_ms", "db_count", "phases", "spans",
+        "handler_start_ms", "handler_done_ms", "handler_done_db_ms",
+    )
+
+    # Upper bound on recorded spans so a runaway N+1 loop can't grow a trace without limit
+    MAX_SPANS = 500
+
+    def __init__(self):
+        self.started_ms = _now_ms()
+        self.db_ms = 0.0
+        self.db_count = 0
+        self.phases: Dict[str, float] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self.handler_start_ms: Optional[float] = None
+        self.handler_done_ms: Optional[float] = None
+        self.handler_done_db_ms = 0.0
+
+    def add(self, name: str, milliseconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + max(0.0, milliseconds)
+
+    def add_span(self, name: str, start_ms: float, end_ms: float, **attrs):
+        """Record a span; start is stored as an offset from the start of the request."""
+        if len(self.spans) >= self.MAX_SPANS:
+            return
+        span = {
+            "name": name,
+            "start_ms": round(start_ms - self.started_ms, 3),
+            "duration_ms": round(max(0.0, end_ms - start_ms), 3),
+        }
+        if attrs:
+            span["attrs"] = attrs
+        self.spans.append(span)
+
+    def mark_handler_done(self):
+        self.handler_done_ms = _now_ms()
+        self.handler_done_db_ms = self.db_ms
+
+    def breakdown(self, total_ms: float) -> Dict[str, float]:
+        """Disjoint phase durations; "app" is the remainder of the total."""
+        out = {
+            "auth": self.phases.get("auth", 0.0),
+            "db": self.db_ms,
+            "serialize": self.phases.get("serialize", 0.0),
+        }
+        out["app"] = max(0.0, total_ms - sum(out.values()))
+        return out
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = []
+        for name, value in self.breakdown(total_ms).items():
+            if name == "db":
+                parts.append(f'db;dur={value:.2f};desc="{self.db_count} queries"')
+            else:
+                parts.append(f"{name};dur={value:.2f}")
+        parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def begin_request_timing():
+    """Start a new accumulator for the current request. Returns (timings, reset token)."""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request_timing(token):
+    _current_timings.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed_phase(name: str):
+    """Time a block as a named phase, excluding SQL time already counted under "db"."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = _now_ms()
+    db_before = timings.db_ms
+    try:
+        yield
+    finally:
+        end = _now_ms()
+        timings.add(name, (end - start) - (timings.db_ms - db_before))
+        timings.add_span(name, start, end)
+
+
+@contextmanager
+def traced_span(name: str, **attrs):
+    """Record a span for a block without attributing it to a Server-Timing phase."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = _now_ms()
+    try:
+        yield
+    finally:
+        timings.add_span(name, start, _now_ms(), **attrs)
+
+
+def _redact_parameters(parameters, executemany: bool):
+    """Keep the shape of bound parameters but never their values."""
+    if executemany:
+        return {"rows": len(parameters) if hasattr(parameters, "__len__") else None}
+    if isinstance(parameters, dict):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        return ["?"] * len(parameters)
+    return None
+
+
+def install_sql_timing(engine):
+    """Register cursor-execute hooks that sum statement time into the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_ms", []).append(_now_ms())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start_ms")
+        if not starts:
+            return
+        start = starts.pop()
+        end = _now_ms()
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.db_ms += end - start
+            timings.db_count += 1
+            timings.add_span(
+                "sql",
+                start,
+                end,
+                statement=statement[:500],
+                params=_redact_parameters(parameters, executemany),
+            )
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that encodes with pydantic-core's Rust serializer instead of stdlib json
+    and records response model validation + JSON encoding as "serialize"."""
+
+    def render(self, content) -> bytes:
+        body = pydantic_core.to_json(content, inf_nan_mode="null")
+        timings = _current_timings.get()
+        if timings is not None and timings.handler_done_ms is not None:
+            end = _now_ms()
+            elapsed = end - timings.handler_done_ms
+            timings.add("serialize", elapsed - (timings.db_ms - timings.handler_done_db_ms))
+            timings.add_span("serialize", timings.handler_done_ms, end, bytes=len(body))
+            timings.handler_done_ms = None
+        return body
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that marks when the route handler starts and when the endpoint function
+    returns. The gap before the endpoint is dependency resolution; the gap between the
+    endpoint and TimedJSONResponse.render is attributed to serialization."""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if call is not None and not getattr(call, "_marks_handler_done", False):
+            self.dependant.call = _mark_handler_done(call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            timings = _current_timings.get()
+            if timings is not None:
+                timings.handler_start_ms = _now_ms()
+            return await handler(request)
+
+        return timed_handler
+
+
+def _mark_handler_done(call):
+    def _enter():
+        timings = _current_timings.get()
+        if timings is not None and timings.handler_start_ms is not None:
+            now = _now_ms()
+            timings.add_span("dependencies", timings.handler_start_ms, now)
+            return now
+        return None
+
+    def _exit(endpoint_start):
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.mark_handler_done()
+            if endpoint_start is not None:
+                timings.add_span("endpoint", endpoint_start, timings.handler_done_ms)
+
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def async_wrapper(**values):
+            endpoint_start = _enter()
+            try:
+                return await call(**values)
+            finally:
+                _exit(endpoint_start)
+
+        wrapper = async_wrapper
+    else:
+        @functools.wraps(call)
+        def sync_wrapper(**values):
+            endpoint_start = _enter()
+            try:
+                return call(**values)
+            finally:
+                _exit(endpoint_start)
+
+        wrapper = sync_wrapper
+    wrapper._marks_handler_done = True
+    return wrapper
@@ -0,0 +1,174 @@
+"""
+search_documents maintenance for the global search box (GET /search).
+
+Each searchable entity has one row: a display string and a lowercased body of its
+searchable fields. An after_flush hook upserts rows for new or changed entities and
+removes rows for deleted ones, in the same transaction as the write. Query-level bulk
+deletes (Query.delete) and Core UPDATEs bypass the hook, so those call remove() or
+refresh_rows() explicitly.
+rebuild() backfills the table for existing data (see rebuild_search_index.py).
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, event, inspect, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+
+logger = logging.getLogger("ticketing")
+
+
+def _value(v) -> str:
+    if v is None:
+        return ""
+    return str(getattr(v, "value", v))
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    entity_type: str
+    model: type
+    key: str
+    fields: Tuple[str, ...]  # searchable columns, folded into body
+    display: Callable[[object], str]
+    display_fields: Tuple[str, ...] = ()  # extra columns that only feed display
+
+
+SPECS: Tuple[EntitySpec, ...] = (
+    EntitySpec("ticket", models.Ticket, "ticket_id",
+               ("ticket_id", "inc_number", "so_number", "customer_name", "category", "notes"),
+               lambda t: f"Ticket {t.ticket_id} - {_value(t.status)}", ("status",)),
+    EntitySpec("site", models.Site, "site_id",
+               ("site_id", "location", "city", "state", "brand", "ip_address"),
+               lambda s: f"{s.site_id} - {s.location}"),
+    EntitySpec("user", models.User, "user_id",
+               ("user_id", "name", "email"),
+               lambda u: f"{u.name} ({u.email})"),
+    EntitySpec("inventory", models.InventoryItem, "item_id",
+               ("name", "sku", "barcode", "description"),
+               lambda i: f"{i.name} (SKU: {i.sku})"),
+    EntitySpec("field_tech", models.FieldTech, "field_tech_id",
+               ("name", "tech_number", "email", "phone"),
+               lambda ft: f"{ft.name} - {ft.region}", ("region",)),
+    EntitySpec("shipment", models.Shipment, "shipment_id",
+               ("shipment_id", "tracking_number", "what_is_being_shipped"),
+               lambda s: f"Shipment {s.shipment_id} - {s.what_is_being_shipped}"),
+)
+
+SPEC_BY_MODEL: Dict[type, EntitySpec] = {spec.model: spec for spec in SPECS}
+SPEC_BY_TYPE: Dict[str, EntitySpec] = {spec.entity_type: spec for spec in SPECS}
+
+
+def document(spec: EntitySpec, obj) -> dict:
+    """search_documents row for a model instance (or a Row with the spec's columns)."""
+    body = " ".join(_value(getattr(obj, f)) for f in spec.fields).lower()
+    return {
+        "entity_type": spec.entity_type,
+        "entity_id": str(getattr(obj, spec.key)),
+        "display": spec.display(obj),
+        "body": body,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+def _changed(spec: EntitySpec, obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[f].history.has_changes() for f in spec.fields + spec.display_fields)
+
+
+def upsert(connection, docs: List[dict]):
+    if not docs:
+        return
+    stmt = pg_insert(models.SearchDocument.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["entity_type", "entity_id"],
+        set_={"display": stmt.excluded.display, "body": stmt.excluded.body, "updated_at": stmt.excluded.updated_at},
+    )
+    connection.execute(stmt, docs)
+
+
+def touches(entity_type: str, values) -> bool:
+    """Whether a change to these column names affects the entity's document."""
+    spec = SPEC_BY_TYPE[entity_type]
+    return any(name in values for name in spec.fields + spec.display_fields)
+
+
+def refresh_rows(db: Session, entity_type: str, rows: Iterable[dict]):
+    """Upsert documents from plain row dicts, for writes made with Core UPDATE statements."""
+    spec = SPEC_BY_TYPE[entity_type]
+    upsert(db.connection(), [document(spec, SimpleNamespace(**row)) for row in rows])
+
+
+def remove(db: Session, entity_type: str, entity_ids: Iterable[str]):
+    """Drop documents for rows deleted outside the ORM unit of work (Query.delete)."""
+    ids = [str(i) for i in entity_ids]
+    if ids:
+        _delete(db.connection(), {entity_type: ids})
+
+
+def _delete(connection, removals: Dict[str, List[str]]):
+    doc = models.SearchDocument
+    connection.execute(delete(doc).where(or_(*(
+        and_(doc.entity_type == entity_type, doc.entity_id.in_(ids)) for entity_type, ids in removals.items()
+    ))))
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context):
+    docs: Dict[tuple, dict] = {}
+    removals: Dict[str, List[str]] = {}
+    for obj in session.new:
+        spec = SPEC_BY_MODEL.get(type(obj))
+        if spec is not None:
+            doc = document(spec, obj)
+            docs[(doc["entity_type"], doc["entity_id"])] = doc
+    for obj in session.dirty:
+        spec = SPEC_BY_MODEL.get(type(obj))
+        if spec is not None and _changed(spec, obj):
+            doc = document(spec, obj)
+            docs[(doc["entity_type"], doc["entity_id"])] = doc
+    for obj in session.deleted:
+        spec = SPEC_BY_MODEL.get(type(obj))
+        if spec is not None:
+            removals.setdefault(spec.entity_type, []).append(str(getattr(obj, spec.key)))
+    if not docs and not removals:
+        return
+    connection = session.connection()
+    if removals:
+        _delete(connection, removals)
+    upsert(connection, list(docs.values()))
+
+
+def rebuild(db: Session, entity_types: Optional[Sequence[str]] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """Upsert documents for every row of the given types and drop orphans; commits per type."""
+    counts = {}
+    for spec in SPECS:
+        if entity_types and spec.entity_type not in entity_types:
+            continue
+        columns = [getattr(spec.model, c) for c in {spec.key, *spec.fields, *spec.display_fields}]
+        rows = db.execute(select(*columns).execution_options(yield_per=batch_size))
+        batch, total = [], 0
+        for row in rows:
+            batch.append(document(spec, row))
+            if len(batch) >= batch_size:
+                upsert(db.connection(), batch)
+                total += len(batch)
+                batch = []
+        upsert(db.connection(), batch)
+        total += len(batch)
+        doc = models.SearchDocument
+        key = getattr(spec.model, spec.key)
+        db.execute(delete(doc).where(
+            doc.entity_type == spec.entity_type,
+            ~doc.entity_id.in_(select(key)),
+        ).execution_options(synchronize_session=False))
+        db.commit()
+        counts[spec.entity_type] = total
+        logger.info(f"search_documents: indexed {total} {spec.entity_type} rows")
+    return counts
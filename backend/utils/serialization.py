@@ -0,0 +1,28 @@
+"""
+One-pass response serialization for list endpoints.
+
+FastAPI validates a returned list against response_model, dumps it back to Python
+objects and then JSON-encodes those. model_list_response validates and encodes in a
+single pydantic-core call with a TypeAdapter cached per model.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from utils.request_timing import timed_phase
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def model_list_response(model: type[BaseModel], items: Iterable[Any]) -> Response:
+    """Validate ORM objects or dicts against `model` and return the JSON array as one Response."""
+    adapter = list_adapter(model)
+    with timed_phase("serialize"):
+        body = adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,271 @@
+"""
+SLA evaluation: per-worker rule matching and the periodic at-risk scan.
+
+Active sla_rules are held in a dict keyed by (ticket_type, customer_impact,
+business_priority), where None in a rule matches anything. match() probes the ticket's
+own key and then its wildcard variants, most specific first (type outranks impact,
+impact outranks priority), so a lookup is at most eight dict probes instead of a query.
+POST/PUT/DELETE /sla broadcast an "sla" message; this worker (utils.main_utils.
+_enqueue_broadcast) and the others (Redis websocket_updates, see main.lifespan) reload
+the rules on their next lookup. Rules older than reload_seconds are reloaded too.
+
+New tickets take sla_target_hours / sla_breach_hours from their rule unless the request
+set them (null counts as not set).
+
+Every SLA_SCAN_SECONDS one worker (advisory lock) reads the unresolved tickets not yet
+alerted whose due time (created_at + sla_target_hours) is before now + SLA_AT_RISK_MINUTES,
+through the expression index ix_tickets_sla_due, plus the alerted ones whose
+sla_escalate_at has passed, and works out each ticket's level:
+
+    0  due within the at-risk window (alerted once, escalation_notified)
+    1  past the target
+    2  past sla_breach_hours, then +1 per further (breach - target) hours,
+       capped at the rule's escalation_levels
+
+Levels and the time of each ticket's next level (sla_escalate_at, NULL at its rule's
+last level, so finished tickets leave the scan) are written in one UPDATE. New alerts
+and raised levels are announced in "ticket" broadcasts with action "sla_escalation",
+SLA_ALERT_BATCH alerts per message. The other updated tickets (a new sla_escalate_at,
+no new alert) go out as action "sla_update" with just their ids, so every write still
+reaches the count caches, ETags and daily boards.
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+import crud
+from settings import settings
+
+logger = logging.getLogger("ticketing")
+
+DEFAULT_ESCALATION_LEVELS = 3
+
+
+def _value(v):
+    return getattr(v, "value", v)
+
+
+def rule_key(ticket_type, customer_impact, business_priority) -> Tuple[Optional[str], ...]:
+    return (_value(ticket_type), _value(customer_impact), _value(business_priority))
+
+
+def escalation_level(now: datetime, created_at: datetime, target_hours: Optional[int],
+                     breach_hours: Optional[int], max_levels: int = DEFAULT_ESCALATION_LEVELS) -> int:
+    """Level of a ticket at now (naive UTC, like created_at); see the module docstring."""
+    if created_at is None or target_hours is None:
+        return 0
+    due = created_at + timedelta(hours=target_hours)
+    if now < due:
+        return 0
+    level = 1
+    if breach_hours is not None:
+        breach = created_at + timedelta(hours=breach_hours)
+        if now >= breach:
+            step = timedelta(hours=breach_hours - target_hours) if breach_hours > target_hours else None
+            level = 2 + ((now - breach) // step if step else 0)
+    return max(0, min(level, max_levels))
+
+
+def next_escalation_at(created_at: datetime, target_hours: Optional[int], breach_hours: Optional[int],
+                       level: int, max_levels: int = DEFAULT_ESCALATION_LEVELS) -> Optional[datetime]:
+    """When a ticket at level reaches level + 1, or None if it never will (last level, or no breach step)."""
+    if created_at is None or target_hours is None or level >= max_levels:
+        return None
+    if level == 0:
+        return created_at + timedelta(hours=target_hours)
+    if breach_hours is None:
+        return None
+    breach = created_at + timedelta(hours=breach_hours)
+    if level == 1:
+        return breach
+    if breach_hours <= target_hours:
+        return None
+    return breach + (level - 1) * timedelta(hours=breach_hours - target_hours)
+
+
+class SLAEngine:
+    """The worker's active SLA rules and scan counters."""
+
+    def __init__(self, at_risk_minutes: int = 60, alert_batch: int = 100, reload_seconds: float = 300.0,
+                 enabled: bool = True):
+        self.at_risk_minutes = at_risk_minutes
+        self.alert_batch = max(1, alert_batch)
+        self.reload_seconds = reload_seconds
+        self.enabled = enabled
+        self._rules: Dict[Tuple[Optional[str], ...], dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.scans = 0
+        self.skipped_scans = 0
+        self.escalated = 0
+        self.alert_messages_sent = 0
+        self.last_scan_at: Optional[str] = None
+        self.last_scan_ms = 0.0
+        self.last_scan_rows = 0
+
+    def apply_broadcast(self, message: str):
+        """Reload rules on the next lookup after an SLA rule write ({"type": "sla", ...})."""
+        try:
+            kind = json.loads(message).get("type")
+        except (ValueError, TypeError, AttributeError):
+            return
+        if kind == "sla":
+            self.mark_stale()
+
+    def mark_stale(self):
+        with self._lock:
+            self._stale = True
+
+    def load(self, rules: Iterable[dict]):
+        """Replace the rule dict; for two rules with the same key the later one wins."""
+        compiled = {}
+        for rule in rules:
+            compiled[rule_key(rule["ticket_type"], rule["customer_impact"], rule["business_priority"])] = rule
+        with self._lock:
+            self._rules = compiled
+            self._loaded_at = time.monotonic()
+            self._stale = False
+        self.reloads += 1
+
+    def rules(self, db: Session) -> Dict[Tuple[Optional[str], ...], dict]:
+        with self._lock:
+            fresh = (not self._stale and self._loaded_at is not None
+                     and time.monotonic() - self._loaded_at < self.reload_seconds)
+            rules = self._rules
+        if fresh:
+            return rules
+        self.load(crud.get_active_sla_rules(db))
+        return self._rules
+
+    def match(self, db: Session, ticket_type, customer_impact, business_priority) -> Optional[dict]:
+        """The most specific active rule for a ticket, or None."""
+        rules = self.rules(db)
+        if not rules:
+            return None
+        for key in product(*((v, None) for v in rule_key(ticket_type, customer_impact, business_priority))):
+            rule = rules.get(key)
+            if rule is not None:
+                return rule
+        return None
+
+    def apply_rule(self, db: Session, ticket):
+        """Fill a TicketCreate's SLA hours from its rule where the request left them unset or null
+        (the ticket forms send null for empty fields)."""
+        if not self.enabled:
+            return
+        unset = [f for f in ("sla_target_hours", "sla_breach_hours")
+                 if f not in ticket.model_fields_set or getattr(ticket, f) is None]
+        if not unset:
+            return
+        rule = self.match(db, ticket.type, ticket.customer_impact, ticket.business_priority)
+        if rule is not None:
+            for field in unset:
+                if rule[field] is not None:
+                    setattr(ticket, field, rule[field])
+
+    def fill_rule_hours(self, db: Session, ticket_ids: Optional[List[str]] = None) -> int:
+        """Give tickets inserted without SLA hours (bulk import, synthetic seed) their rule's, or the
+        column defaults, as POST /tickets would; ticket_ids None means every such ticket. One UPDATE
+        per distinct (type, impact, priority); does not commit. Returns the tickets updated."""
+        filled = 0
+        for key in crud.get_missing_sla_hour_keys(db, ticket_ids):
+            rule = self.match(db, *key) if self.enabled else None
+            filled += crud.fill_sla_hours(db, key, rule and rule["sla_target_hours"], rule and rule["sla_breach_hours"],
+                                          ticket_ids)
+        return filled
+
+    def scan(self, db: Session, now: Optional[datetime] = None) -> List[str]:
+        """Escalate at-risk tickets and return the broadcast messages (empty if another worker is scanning)."""
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        if not crud.try_sla_scan_lock(db):
+            db.rollback()
+            self.skipped_scans += 1
+            return []
+        rows = crud.get_sla_scan_rows(db, now + timedelta(minutes=self.at_risk_minutes), now)
+        changes = []
+        for row in rows:
+            rule = self.match(db, row["type"], row["customer_impact"], row["business_priority"])
+            max_levels = rule["escalation_levels"] if rule and rule["escalation_levels"] is not None \
+                else DEFAULT_ESCALATION_LEVELS
+            current = row["escalation_level"] or 0
+            level = max(current, escalation_level(now, row["created_at"], row["sla_target_hours"],
+                                                  row["sla_breach_hours"], max_levels))
+            escalate_at = next_escalation_at(row["created_at"], row["sla_target_hours"], row["sla_breach_hours"],
+                                             level, max_levels)
+            changes.append((row["ticket_id"], level, escalate_at, level > current or not row["escalation_notified"]))
+        written = crud.escalate_sla_tickets(db, changes)
+        updated = [row for row in written if row["alert"]]
+        alerts = self.alert_messages(updated)
+        messages = alerts + self.update_messages([row["ticket_id"] for row in written if not row["alert"]])
+
+        self.scans += 1
+        self.escalated += len(updated)
+        self.alert_messages_sent += len(alerts)
+        self.last_scan_at = datetime.now(timezone.utc).isoformat()
+        self.last_scan_rows = len(rows)
+        self.last_scan_ms = round((time.perf_counter() - started) * 1000, 2)
+        return messages
+
+    def alert_messages(self, updated: List[dict]) -> List[str]:
+        messages = []
+        for i in range(0, len(updated), self.alert_batch):
+            batch = updated[i:i + self.alert_batch]
+            alerts = [
+                {
+                    "ticket_id": row["ticket_id"],
+                    "level": row["escalation_level"],
+                    "due_at": row["due_at"].isoformat() if row["due_at"] is not None else None,
+                    "site_id": row["site_id"],
+                    "assigned_user_id": row["assigned_user_id"],
+                }
+                for row in batch
+            ]
+            messages.append(json.dumps({
+                "type": "ticket",
+                "action": "sla_escalation",
+                "ticket_ids": [a["ticket_id"] for a in alerts],
+                "alerts": alerts,
+            }, separators=(",", ":")))
+        return messages
+
+    def update_messages(self, ticket_ids: List[str]) -> List[str]:
+        return [
+            json.dumps({"type": "ticket", "action": "sla_update", "ticket_ids": ticket_ids[i:i + self.alert_batch]},
+                       separators=(",", ":"))
+            for i in range(0, len(ticket_ids), self.alert_batch)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rules, stale = len(self._rules), self._stale
+        return {
+            "enabled": self.enabled,
+            "rules": rules,
+            "stale": stale,
+            "reloads": self.reloads,
+            "at_risk_minutes": self.at_risk_minutes,
+            "scans": self.scans,
+            "skipped_scans": self.skipped_scans,
+            "escalated": self.escalated,
+            "alert_messages": self.alert_messages_sent,
+            "last_scan_at": self.last_scan_at,
+            "last_scan_rows": self.last_scan_rows,
+            "last_scan_ms": self.last_scan_ms,
+        }
+
+
+sla_engine = SLAEngine(
+    at_risk_minutes=settings.SLA_AT_RISK_MINUTES,
+    alert_batch=settings.SLA_ALERT_BATCH,
+    enabled=settings.SLA_ENGINE_ENABLED,
+)
@@ -0,0 +1,351 @@
+"""
+Bulk ticket import (POST /tickets/import): CSV or NDJSON in, one transaction out.
+
+The route spools the upload to a temporary file as it streams in. import_tickets then
+reads it in blocks of TICKET_IMPORT_BLOCK_ROWS records. Each block is:
+- validated column by column: one pydantic-core call per column, not one model per row;
+- checked against sites, users and field techs, one query per column;
+- COPY'd into a temporary staging table.
+Once everything is staged, new rows get ticket ids in one block allocation and the
+staging table is upserted in two statements: rows naming an existing ticket_id update
+it, the rest are inserted. Updates follow the PUT /tickets/{id} rules: unless the
+importer is an admin or dispatcher, only tickets assigned to or claimed by them may be
+updated, and "closed" becomes "pending". Inserted tickets take their SLA rule's hours
+(utils/sla_engine.py) or the column defaults, as POST /tickets does. Invalid rows are
+reported by line and skipped; they never abort the import. One summary audit row is
+written with the tickets.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import String, any_, literal, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+import crud
+import models
+import schemas
+from settings import settings
+from timezone_utils import get_eastern_today
+from utils import search_index
+from utils.sla_engine import sla_engine
+
+# Importable columns and their types; other columns in the file are ignored
+IMPORT_FIELDS: Dict[str, Any] = {
+    "ticket_id": str,
+    "site_id": str,
+    "type": schemas.TicketType,
+    "status": schemas.TicketStatus,
+    "priority": schemas.TicketPriority,
+    "category": str,
+    "inc_number": str,
+    "so_number": str,
+    "assigned_user_id": str,
+    "onsite_tech_id": str,
+    "date_created": date,
+    "date_scheduled": date,
+    "notes": str,
+    "customer_name": str,
+    "customer_phone": str,
+    "customer_email": str,
+}
+REQUIRED_FIELDS = ("site_id",)
+# Applied to inserted rows only; updates keep the stored value when a cell is blank
+INSERT_DEFAULTS = {"type": "onsite", "status": "open", "priority": "normal"}
+REFERENCES = {
+    "site_id": (models.Site, "site_id"),
+    "assigned_user_id": (models.User, "user_id"),
+    "onsite_tech_id": (models.FieldTech, "field_tech_id"),
+}
+STAGING = "ticket_import_staging"
+MAX_REPORTED_ERRORS = 1000
+
+_ADAPTERS = {name: TypeAdapter(List[Optional[kind]]) for name, kind in IMPORT_FIELDS.items()}
+
+FORMATS = {"csv": "csv", "text/csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson",
+           "application/x-ndjson": "ndjson", "application/jsonl": "ndjson", "application/json": "ndjson"}
+
+
+def detect_format(requested: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """csv or ndjson from ?format= or the Content-Type header; None if neither is recognised."""
+    if requested:
+        return FORMATS.get(requested.lower())
+    return FORMATS.get((content_type or "").split(";")[0].strip().lower())
+
+
+def read_records(upload, fmt: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """(line number, record) pairs; record is None for an NDJSON line that is not a JSON object."""
+    stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def _blank(value, kind):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if kind is str and isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def validate_block(records: List[dict]) -> Tuple[Dict[str, list], Dict[int, Tuple[str, str]]]:
+    """Validate a block column-wise. Returns ({field: values}, {row index: (field, message)})."""
+    errors: Dict[int, Tuple[str, str]] = {}
+    columns: Dict[str, list] = {}
+    for name, kind in IMPORT_FIELDS.items():
+        raw = [_blank(record.get(name), kind) for record in records]
+        adapter = _ADAPTERS[name]
+        try:
+            columns[name] = adapter.validate_python(raw)
+        except ValidationError as e:
+            for err in e.errors():
+                index = err["loc"][0]
+                errors.setdefault(index, (name, err["msg"]))
+                raw[index] = None
+            columns[name] = adapter.validate_python(raw)
+    return columns, errors
+
+
+def _existing(db: Session, column, wanted) -> set:
+    return set(db.execute(select(column).where(column == any_(literal(list(wanted), ARRAY(String))))).scalars())
+
+
+def _existing_tickets(db: Session, ticket_ids) -> Dict[str, dict]:
+    T = models.Ticket
+    stmt = select(T.ticket_id, T.assigned_user_id, T.claimed_by).where(
+        T.ticket_id == any_(literal(list(ticket_ids), ARRAY(String))))
+    return {row["ticket_id"]: row for row in db.execute(stmt).mappings()}
+
+
+def check_references(db: Session, columns: Dict[str, list], errors: Dict[int, Tuple[str, str]],
+                     user_id: Optional[str] = None, privileged: bool = True):
+    """Flag rows naming a site, user or tech that does not exist (one query per column), rows
+    that will create a ticket without the required fields, and, unless privileged, rows
+    updating a ticket user_id is neither assigned to nor has claimed."""
+    ticket_ids = {v for v in columns["ticket_id"] if v is not None}
+    updates = _existing_tickets(db, ticket_ids) if ticket_ids else {}
+    if not privileged:
+        for index, ticket_id in enumerate(columns["ticket_id"]):
+            ticket = updates.get(ticket_id)
+            if ticket is not None and user_id not in (ticket["assigned_user_id"], ticket["claimed_by"]):
+                errors.setdefault(index, ("ticket_id", "Not authorized to update this ticket"))
+    for name in REQUIRED_FIELDS:
+        for index, value in enumerate(columns[name]):
+            if value is None and columns["ticket_id"][index] not in updates:
+                errors.setdefault(index, (name, "Field required"))
+    for name, (model, key) in REFERENCES.items():
+        wanted = {v for v in columns[name] if v is not None}
+        if not wanted:
+            continue
+        found = _existing(db, getattr(model, key), wanted)
+        for index, value in enumerate(columns[name]):
+            if value is not None and value not in found:
+                errors.setdefault(index, (name, f"Unknown {name} {value!r}"))
+
+
+def create_staging(db: Session):
+    """Temporary table typed like tickets (plus the source line), dropped at commit or rollback."""
+    columns = ", ".join(IMPORT_FIELDS)
+    db.execute(text(
+        f"CREATE TEMP TABLE {STAGING} ON COMMIT DROP AS "
+        f"SELECT 0 AS line, {columns} FROM tickets WITH NO DATA"
+    ))
+
+
+def copy_block(db: Session, lines: List[int], columns: Dict[str, list], keep: List[int]):
+    """COPY the kept rows of a block into the staging table."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    names = list(IMPORT_FIELDS)
+    for index in keep:
+        row = [lines[index]]
+        for name in names:
+            value = columns[name][index]
+            row.append(getattr(value, "value", value))
+        writer.writerow(row)
+    buf.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {STAGING} (line, {', '.join(names)}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+
+def allocate_ids(db: Session) -> int:
+    """Give staged rows without a ticket_id consecutive YYYY-NNNNNN ids in one statement."""
+    prefix = f"{datetime.now(timezone.utc).year}-"
+    next_id = crud.generate_ticket_id(db)
+    base = int(next_id[len(prefix):]) - 1
+    # Explicit ids in the file may already use numbers past the stored maximum
+    staged_max = db.execute(text(
+        f"SELECT max(substr(ticket_id, :start)::int) FROM {STAGING} "
+        f"WHERE ticket_id LIKE :pattern AND ticket_id ~ '^[0-9]{{4}}-[0-9]+$'"
+    ), {"start": len(prefix) + 1, "pattern": f"{prefix}%"}).scalar()
+    base = max(base, staged_max or 0)
+    result = db.execute(text(
+        f"UPDATE {STAGING} s SET ticket_id = :prefix || lpad((:base + n.rn)::text, 6, '0') "
+        f"FROM (SELECT line, row_number() OVER (ORDER BY line) AS rn FROM {STAGING} WHERE ticket_id IS NULL) n "
+        f"WHERE s.line = n.line"
+    ), {"prefix": prefix, "base": base})
+    return result.rowcount
+
+
+def _search_columns() -> str:
+    spec = search_index.SPEC_BY_TYPE["ticket"]
+    return ", ".join(f"t.{c}" for c in dict.fromkeys((spec.key, *spec.fields, *spec.display_fields)))
+
+
+def upsert_staged(db: Session, user_id: str, privileged: bool = True) -> Tuple[List[dict], List[dict], List[int]]:
+    """Update tickets named by staged rows, insert the rest; returns (updated, inserted) search rows
+    and the lines of rows refused as unauthorized updates.
+
+    Unless privileged, updates are limited to tickets user_id is assigned to or has claimed
+    (re-checked here for tickets created or reassigned since check_references) and "closed"
+    becomes "pending".
+    """
+    now = datetime.now(timezone.utc)
+    fields = [c for c in IMPORT_FIELDS if c != "ticket_id"]
+    assignments = {c: f"coalesce(s.{c}, t.{c})" for c in fields}
+    actor = ""
+    if not privileged:
+        assignments["status"] = "CASE WHEN s.status = 'closed' THEN 'pending' ELSE coalesce(s.status, t.status) END"
+        actor = "AND :user_id IN (t.assigned_user_id, t.claimed_by) "
+    updated = db.execute(text(
+        f"UPDATE tickets t SET {', '.join(f'{c} = {v}' for c, v in assignments.items())}, "
+        f"version = t.version + 1, last_updated_by = :user_id, last_updated_at = :now "
+        f"FROM {STAGING} s WHERE t.ticket_id = s.ticket_id {actor}RETURNING s.line AS import_line, {_search_columns()}"
+    ), {"user_id": user_id, "now": now}).mappings().all()
+    updated_lines = [r["import_line"] for r in updated]
+
+    refused: List[int] = []
+    if not privileged:
+        # Existing tickets the actor check kept out of the UPDATE; the INSERT below skips them too
+        refused = list(db.execute(text(
+            f"SELECT s.line FROM {STAGING} s JOIN tickets t ON t.ticket_id = s.ticket_id "
+            f"WHERE s.line <> ALL(:updated_lines) "
+            f"AND NOT coalesce(:user_id IN (t.assigned_user_id, t.claimed_by), false) ORDER BY s.line"
+        ), {"user_id": user_id, "updated_lines": updated_lines}).scalars())
+
+    selected = []
+    for c in fields:
+        if c in INSERT_DEFAULTS:
+            selected.append(f"coalesce(s.{c}, '{INSERT_DEFAULTS[c]}')")
+        elif c == "date_created":
+            selected.append("coalesce(s.date_created, :today)")
+        else:
+            selected.append(f"s.{c}")
+    inserted = db.execute(text(
+        f"INSERT INTO tickets AS t (ticket_id, {', '.join(fields)}, created_at, last_updated_by, last_updated_at) "
+        f"SELECT s.ticket_id, {', '.join(selected)}, :now, :user_id, :now FROM {STAGING} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM tickets x WHERE x.ticket_id = s.ticket_id) ORDER BY s.line "
+        f"ON CONFLICT (ticket_id) DO NOTHING RETURNING {_search_columns()}"
+    ), {"user_id": user_id, "now": now, "today": get_eastern_today()}).mappings().all()
+    updated = [{k: v for k, v in r.items() if k != "import_line"} for r in updated]
+    return updated, [dict(r) for r in inserted], refused
+
+
+def import_tickets(db: Session, upload, fmt: str, user_id: str, block_rows: Optional[int] = None,
+                   privileged: bool = True) -> dict:
+    """Validate, stage and upsert every record in upload; commits once. Returns the import summary.
+
+    privileged: the importer is an admin or dispatcher and may update any ticket.
+    """
+    block_rows = block_rows or settings.TICKET_IMPORT_BLOCK_ROWS
+    errors: List[dict] = []
+    rejected = 0
+    error_count = 0  # error entries, reported or not
+    staged_lines: Dict[str, int] = {}  # explicit ticket_id -> first line, to reject duplicates
+
+    def reject(line: int, field: Optional[str], message: str):
+        nonlocal rejected, error_count
+        rejected += 1
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "field": field, "message": message})
+
+    def flush(lines: List[int], records: List[dict]):
+        columns, row_errors = validate_block(records)
+        check_references(db, columns, row_errors, user_id, privileged)
+        keep = []
+        for index, line in enumerate(lines):
+            ticket_id = columns["ticket_id"][index]
+            if index not in row_errors and ticket_id is not None:
+                if ticket_id in staged_lines:
+                    row_errors[index] = ("ticket_id", f"Duplicate of line {staged_lines[ticket_id]}")
+                else:
+                    staged_lines[ticket_id] = line
+            if index in row_errors:
+                reject(line, *row_errors[index])
+            else:
+                keep.append(index)
+        if keep:
+            copy_block(db, lines, columns, keep)
+        return len(keep)
+
+    try:
+        create_staging(db)
+        staged = 0
+        lines: List[int] = []
+        records: List[dict] = []
+        for line, record in read_records(upload, fmt):
+            if record is None:
+                reject(line, None, "Not a JSON object")
+                continue
+            lines.append(line)
+            records.append(record)
+            if len(records) >= block_rows:
+                staged += flush(lines, records)
+                lines, records = [], []
+        if records:
+            staged += flush(lines, records)
+
+        updated, inserted, refused = [], [], []
+        if staged:
+            allocate_ids(db)
+            updated, inserted, refused = upsert_staged(db, user_id, privileged)
+            if inserted:
+                sla_engine.fill_rule_hours(db, [row["ticket_id"] for row in inserted])
+            search_index.refresh_rows(db, "ticket", updated + inserted)
+        for line in refused:
+            reject(line, "ticket_id", "Not authorized to update this ticket")
+        collided = staged - len(updated) - len(inserted) - len(refused)
+        if collided:
+            # Only possible when a concurrent create takes an allocated or named id between the checks and the upsert
+            rejected += collided
+            error_count += 1
+            errors.append({"line": None, "field": "ticket_id",
+                           "message": f"{collided} rows collided with tickets created during the import; re-import them"})
+        crud.create_audit_log(
+            db, user_id, "ticket_import",
+            new_value=f"Imported {len(inserted)} new and {len(updated)} updated tickets; {rejected} rows rejected",
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {
+        "inserted": len(inserted),
+        "updated": len(updated),
+        "rejected": rejected,
+        "errors": errors,
+        "errors_truncated": error_count > len(errors),
+    }
@@ -0,0 +1,149 @@
+"""
+In-process trace sampler.
+
+Each finished request is offered to a per-route reservoir that keeps the slowest N
+traces plus a uniform random sample (reservoir sampling), so a latency spike on a
+route comes with concrete example requests. No external collector is involved;
+retained traces can optionally be appended to a local JSONL file. Query strings are
+kept as parameter names only (values masked), like the SQL span parameters.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+logger = logging.getLogger("ticketing")
+
+
+def redact_query(query: str) -> str:
+    """Keep the parameter names of a query string but never their values."""
+    if not query:
+        return query
+    return urlencode([(key, "?") for key, _ in parse_qsl(query, keep_blank_values=True)], safe="?")
+
+
+class _RouteReservoir:
+    """Slowest-N heap plus an Algorithm R random sample for one route."""
+
+    def __init__(self, slowest: int, sample: int):
+        self.slowest_size = slowest
+        self.sample_size = sample
+        self.slowest: List[tuple] = []  # min-heap of (duration_ms, seq, trace)
+        self.sample: List[Dict[str, Any]] = []
+        self.seen = 0
+
+    def offer(self, trace: Dict[str, Any], seq: int, rng: random.Random) -> bool:
+        """Add a trace; returns True if it was retained in either set."""
+        self.seen += 1
+        retained = False
+        duration = trace["duration_ms"]
+
+        if self.slowest_size > 0:
+            if len(self.slowest) < self.slowest_size:
+                heapq.heappush(self.slowest, (duration, seq, trace))
+                retained = True
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, seq, trace))
+                retained = True
+
+        if self.sample_size > 0:
+            if len(self.sample) < self.sample_size:
+                self.sample.append(trace)
+                retained = True
+            else:
+                slot = rng.randrange(self.seen)
+                if slot < self.sample_size:
+                    self.sample[slot] = trace
+                    retained = True
+        return retained
+
+
+class TraceSampler:
+    """Per-route trace reservoirs shared by the whole worker process."""
+
+    def __init__(self, slowest_per_route: int = 5, sample_per_route: int = 5,
+                 export_path: Optional[str] = None, seed: Optional[int] = None):
+        self.slowest_per_route = slowest_per_route
+        self.sample_per_route = sample_per_route
+        self.export_path = export_path or None
+        self._rng = random.Random(seed)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteReservoir] = defaultdict(
+            lambda: _RouteReservoir(self.slowest_per_route, self.sample_per_route)
+        )
+
+    def record(self, route: str, method: str, path: str, query: str, status_code: int,
+               duration_ms: float, spans: List[Dict[str, Any]]) -> bool:
+        trace = {
+            "route": route,
+            "method": method,
+            "path": path,
+            "query": redact_query(query),
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "spans": sorted(spans, key=lambda s: s["start_ms"]),
+        }
+        with self._lock:
+            retained = self._routes[route].offer(trace, next(self._seq), self._rng)
+        if retained and self.export_path:
+            self._export(trace)
+        return retained
+
+    def _export(self, trace: Dict[str, Any]):
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(trace, default=str) + "\n")
+        except OSError as e:
+            logger.warning("trace export to %s failed: %s", self.export_path, e)
+
+    def summary(self) -> Dict[str, Any]:
+        """Route -> counts and the duration of the retained slowest traces."""
+        with self._lock:
+            return {
+                route: {
+                    "seen": res.seen,
+                    "slowest_ms": sorted((d for d, _, _ in res.slowest), reverse=True),
+                    "sampled": len(res.sample),
+                }
+                for route, res in self._routes.items()
+            }
+
+    def traces(self, route: Optional[str] = None, include_sample: bool = True) -> Dict[str, Any]:
+        """Retained traces, slowest first, optionally restricted to one route."""
+        with self._lock:
+            items = self._routes.items() if route is None else (
+                [(route, self._routes[route])] if route in self._routes else []
+            )
+            out = {}
+            for key, res in items:
+                entry = {
+                    "seen": res.seen,
+                    "slowest": [t for _, _, t in sorted(res.slowest, key=lambda x: x[0], reverse=True)],
+                }
+                if include_sample:
+                    entry["sample"] = list(res.sample)
+                out[key] = entry
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+def route_key(request) -> str:
+    """Method plus route template (e.g. "GET /tickets/{ticket_id}").
+
+    Requests that matched no route share one key so 404 scans can't create unbounded reservoirs.
+    """
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{request.method} {path}"
@@ -59,6 +59,7 @@ function CompactTickets() {
       const params = new URLSearchParams();
       params.set('limit', String(rowsPerPage));
       params.set('skip', String(page * rowsPerPage));
+      params.set('view', 'list');
       if (filters.type !== 'all') params.set('ticket_type', filters.type);
       if (filters.status !== 'all') params.set('status', filters.status === 'active' ? '' : filters.status);
       if (filters.priority !== 'all') params.set('priority', filters.priority);
@@ -143,12 +144,11 @@ function CompactTickets() {
 
   const bulkApprove = async () => {
     try {
-      const results = await Promise.allSettled(Array.from(selected).map(id => api.post(`/tickets/${id}/approve?approve=true`)));
-      const succeeded = results.filter(r => r.status === 'fulfilled').length;
-      const failed = results.filter(r => r.status === 'rejected').length;
+      const result = await api.post('/tickets/bulk', { ticket_ids: Array.from(selected), approve: true });
+      const succeeded = result.updated.length;
+      const failed = result.skipped.length;
       if (failed > 0) {
-        const errors = results.filter(r => r.status === 'rejected').map(r => r.reason?.message || 'Unknown error');
-        showError(`Approved ${succeeded}, failed ${failed}: ${errors[0]}`);
+        showError(`Approved ${succeeded}, failed ${failed}: ${result.skipped[0].reason}`);
       } else {
         success(`Approved ${succeeded} ticket${succeeded !== 1 ? 's' : ''}`);
       }
@@ -187,19 +187,27 @@ function CompactTickets() {
           </IconButton>
           <IconButton size="small" component="label" title="Import CSV">
             <UploadFile fontSize="small" />
-            <input type="file" accept=".csv" hidden onChange={async (e) => {
+            <input type="file" accept=".csv,.ndjson,.jsonl" hidden onChange={async (e) => {
               const file = e.target.files?.[0]; if (!file) return;
-              const text = await file.text();
-              const [headerLine, ...lines] = text.split(/\r?\n/).filter(Boolean);
-              const headers = headerLine.split(',');
-              let imported = 0;
-              for (const line of lines) {
-                const cols = line.split(',');
-                const record = Object.fromEntries(headers.map((h, i) => [h, cols[i] ?? '']));
-                try { await api.post('/tickets/', record); imported++; } catch {}
+              e.target.value = '';
+              const isCsv = file.name.toLowerCase().endsWith('.csv');
+              try {
+                const result = await api.post('/tickets/import', file, {
+                  headers: { 'Content-Type': isCsv ? 'text/csv' : 'application/x-ndjson' },
+                });
+                const imported = result.inserted + result.updated;
+                if (result.rejected > 0) {
+                  const first = result.errors[0];
+                  showError(`Imported ${imported}, rejected ${result.rejected}` + (first ? ` (line ${first.line ?? '?'}: ${first.message})` : ''));
+                } else if (imported === 0) {
+                  showError('No records imported');
+                } else {
+                  success(`Imported ${imported} ticket${imported !== 1 ? 's' : ''}`);
+                }
+              } catch (err) {
+                showError(err?.message || 'Import failed');
               }
               await fetchTickets();
-              if (imported === 0) showError('No records imported');
             }} />
           </IconButton>
           <IconButton size="small" onClick={fetchTickets}><Refresh fontSize="small" /></IconButton>
@@ -19,6 +19,11 @@ import TypeChip from './TypeChip';
 import { useDataSync } from '../contexts/DataSyncContext';
 import { useNotifications } from '../contexts/NotificationProvider';
 
+// Summary buckets are paged by the API (at most 200 rows per request); read up to
+// DAILY_MAX_ROWS of each and show "showing N of M" beyond that
+const DAILY_PAGE_SIZE = 200;
+const DAILY_MAX_ROWS = 1000;
+
 function CompactOperationsDashboard() {
   const navigate = useNavigate();
   const { user } = useAuth();
@@ -42,6 +47,7 @@ function CompactOperationsDashboard() {
   const [activeTab, setActiveTab] = useState(0);
   const [currentTime, setCurrentTime] = useState(new Date());
   const [tickets, setTickets] = useState([]);
+  const [bucketTotals, setBucketTotals] = useState(null);
   const [loading, setLoading] = useState(true);
   const [selectedTickets, setSelectedTickets] = useState(new Set());
   const [statusFilter, setStatusFilter] = useState('active');
@@ -63,9 +69,31 @@ function CompactOperationsDashboard() {
   const fetchTickets = useCallback(async () => {
     try {
       setLoading(true);
-      const response = viewMode === 'today' 
-        ? await get(`/tickets/daily/${selectedDate}`)
-        : await get(`/tickets/`);
+      let response;
+      if (viewMode === 'today') {
+        // Summary mode: list rows (with comment/task/time counts) in scheduled, unscheduled and overdue buckets
+        const base = `/tickets/daily/${selectedDate}?summary=true&limit=${DAILY_PAGE_SIZE}`;
+        const summary = await get(base);
+        const buckets = await Promise.all(Object.entries(summary?.buckets || {}).map(async ([name, bucket]) => {
+          const items = [...bucket.items];
+          const wanted = Math.min(bucket.total, DAILY_MAX_ROWS);
+          while (items.length < wanted) {
+            const next = await get(`${base}&bucket=${name}&skip=${items.length}`);
+            const page = next?.buckets?.[name]?.items || [];
+            if (!page.length) break;
+            items.push(...page);
+          }
+          return { name, items, total: bucket.total };
+        }));
+        // Rows can shift between pages while tickets change; keep each ticket once
+        const byId = new Map();
+        buckets.forEach(bucket => bucket.items.forEach(t => byId.set(t.ticket_id, t)));
+        response = Array.from(byId.values());
+        setBucketTotals(Object.fromEntries(buckets.map(bucket => [bucket.name, bucket.total])));
+      } else {
+        response = await get(`/tickets/`);
+        setBucketTotals(null);
+      }
       // Keep all tickets for stats calculation, but filter for display in categorizedTickets
       setTickets(response || []);
     } catch (err) {
@@ -108,16 +136,19 @@ function CompactOperationsDashboard() {
   }, [categorizedTickets, activeTab, statusFilter, tabs]);
 
   const stats = useMemo(() => {
-    const active = tickets.filter(t => t.status !== 'archived').length;
     const archived = tickets.filter(t => t.status === 'archived').length;
+    // On the daily board the bucket totals count every ticket, loaded or not
+    const boardTotal = bucketTotals ? Object.values(bucketTotals).reduce((sum, n) => sum + n, 0) : null;
     return {
-      total: active,
+      total: (boardTotal ?? tickets.length) - archived,
       archived: archived,
+      loaded: tickets.length,
+      boardTotal: boardTotal,
       inProgress: tickets.filter(t => ['in_progress', 'checked_in'].includes(t.status)).length,
       needsParts: categorizedTickets.needs_parts.length,
-      overdue: categorizedTickets.overdue.length
+      overdue: bucketTotals ? bucketTotals.overdue : categorizedTickets.overdue.length
     };
-  }, [tickets, categorizedTickets]);
+  }, [tickets, categorizedTickets, bucketTotals]);
 
   const handleSelectAll = (e) => {
     setSelectedTickets(e.target.checked ? new Set(activeTickets.map(t => t.ticket_id)) : new Set());
@@ -181,6 +212,9 @@ function CompactOperationsDashboard() {
             {/* Mini Stats */}
             <Chip label={`${stats.total} Active`} size="small" sx={{ bgcolor: 'rgba(76,175,80,0.3)', color: 'white' }} />
             <Chip label={`${stats.archived} Archived`} size="small" sx={{ bgcolor: 'rgba(255,255,255,0.2)', color: 'white' }} />
+            {stats.boardTotal !== null && stats.boardTotal > stats.loaded && (
+              <Chip label={`Showing ${stats.loaded} of ${stats.boardTotal}`} size="small" sx={{ bgcolor: 'rgba(255,255,255,0.2)', color: 'white' }} />
+            )}
             {stats.needsParts > 0 && <Chip label={`${stats.needsParts} Parts`} size="small" sx={{ bgcolor: '#f57c00', color: 'white' }} />}
             {stats.overdue > 0 && <Chip label={`${stats.overdue} Overdue`} size="small" sx={{ bgcolor: '#f44336', color: 'white' }} />}
             